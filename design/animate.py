@@ -0,0 +1,144 @@
+#!/usr/bin/env python3
+"""
+Observational Patience — Growth animation
+
+A plate, grown. Everything that does not grow (border, title, notation,
+quote, cell body) is drawn once and kept as the canvas's starting raster;
+each frame then draws only what grew since the last, a depth level of the
+dendrite or the next ring of filaments spreading through the cosmic web,
+onto the accumulated canvas. Frames go to a numbered PNG sequence,
+encoded in a thread pool while later ones render, or to an animated WebP.
+
+    python design/animate.py -o growth.webp --dpi 100
+    python design/animate.py -o frames/ --steps 3 --fps 8
+"""
+
+import argparse
+import importlib
+import math
+import os
+import sys
+import time
+from concurrent.futures import ThreadPoolExecutor
+from itertools import zip_longest
+from pathlib import Path
+
+import numpy as np
+
+DESIGN_DIR = Path(__file__).parent
+FPS = 6
+STEPS = 3           # frames per growth stage
+HOLD = 2.0          # seconds the finished plate stays up
+
+
+def _module(plate):
+    import matplotlib
+    matplotlib.use('Agg')
+    if str(DESIGN_DIR) not in sys.path:
+        sys.path.insert(0, str(DESIGN_DIR))
+    return importlib.import_module(f'create_{plate}')
+
+
+def schedule(growth, steps=STEPS):
+    """Batches to draw frame by frame: every structure's next stage together.
+
+    Each stage is cut into ``steps`` frames, every batch in it split into
+    that many pieces.
+    """
+    from scene import chunks
+    frames = []
+    for stages in zip_longest(*growth, fillvalue=[]):
+        parts = [[] for _ in range(steps)]
+        for batch in (b for stage in stages for b in stage):
+            for i, piece in enumerate(chunks(batch, max(1, math.ceil(len(batch) / steps)))):
+                parts[i].append(piece)
+        frames.extend(part for part in parts if part)
+    return frames
+
+
+def frames(plate='laboratory', dpi=100, steps=STEPS):
+    """RGB frames of ``plate`` growing: the static layers, then one per step"""
+    import lod
+    from scene import AxesSink
+    module = _module(plate)
+    growth = []
+    with lod.output_dpi(dpi):
+        fig = module.create_figure(growth=growth)
+    if not growth:
+        raise ValueError(f'the {plate} plate has nothing that grows')
+    fig.set_dpi(dpi)
+    canvas = fig.canvas
+    canvas.draw()
+    ax = fig.axes[0]
+    sink = AxesSink(ax)
+
+    def grab():
+        return np.asarray(canvas.buffer_rgba())[..., :3].copy()
+
+    yield grab()
+    for batches in schedule(growth, steps):
+        for batch in batches:
+            artist = sink.draw(batch)
+            if artist is not None:
+                ax.draw_artist(artist)
+        yield grab()
+
+
+def _save_frame(pixels, path):
+    from PIL import Image
+    Image.fromarray(pixels).save(path, compress_level=6)
+    return path
+
+
+def animate(plate, out, dpi=100, steps=STEPS, fps=FPS, hold=HOLD, jobs=None):
+    """Write the animation; a directory gets a PNG sequence, a .webp one file.
+
+    PNG frames are encoded in threads as they come, a few in flight at a
+    time. An animated WebP is muxed and encoded by Pillow in one pass.
+    """
+    from PIL import Image
+    out = Path(out)
+    if out.suffix.lower() == '.webp':
+        images = [Image.fromarray(pixels) for pixels in frames(plate, dpi, steps)]
+        durations = [round(1000 / fps)] * len(images)
+        durations[-1] += round(1000 * hold)
+        images[0].save(out, save_all=True, append_images=images[1:], duration=durations,
+                       loop=0, quality=85, method=4)
+        return len(images)
+
+    out.mkdir(parents=True, exist_ok=True)
+    jobs = jobs or os.cpu_count() or 1
+    written, pending = 0, []
+    with ThreadPoolExecutor(max_workers=jobs) as pool:
+        for i, pixels in enumerate(frames(plate, dpi, steps)):
+            pending.append(pool.submit(_save_frame, pixels, out / f'{plate}-{i:04d}.png'))
+            if len(pending) > 2 * jobs:
+                pending.pop(0).result()
+                written += 1
+        for future in pending:
+            future.result()
+            written += 1
+    return written
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description='Export a plate growing, frame by frame.')
+    parser.add_argument('plate', nargs='?', default='laboratory')
+    parser.add_argument('-o', '--output', help='a .webp file, or a directory for PNG frames '
+                                               '(default: <plate>-growth.webp)')
+    parser.add_argument('--dpi', type=int, default=100)
+    parser.add_argument('--steps', type=int, default=STEPS, help='frames per growth stage')
+    parser.add_argument('--fps', type=float, default=FPS)
+    parser.add_argument('--hold', type=float, default=HOLD,
+                        help='seconds to hold the last frame (WebP)')
+    parser.add_argument('-j', '--jobs', type=int, help='encoding threads (default: cores)')
+    args = parser.parse_args(argv)
+
+    out = args.output or f'{args.plate}-growth.webp'
+    start = time.perf_counter()
+    n = animate(args.plate, out, args.dpi, args.steps, args.fps, args.hold, args.jobs)
+    print(f"{n} frames of {args.plate} to {out} in {time.perf_counter() - start:.2f} s")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,199 @@
+#!/usr/bin/env python3
+"""
+Observational Patience — Sprite atlas
+
+Packs many small renders (claim glyphs, ornaments) into a few sprite
+sheets so a page loads a handful of images instead of one per sprite.
+Sprites are trimmed to their opaque bounds and packed onto fixed-width
+shelves; a JSON manifest gives each sprite's pixel rectangle, UVs and
+trim offset. Rebuilds are incremental: removed sprites free their slots,
+changed or new ones fill the best-fitting gap, and only the sheets they
+touch are re-encoded. A full repack happens once gaps outweigh sprites.
+
+    python design/atlas.py design/glyphs -o public/claims-demo/atlas
+"""
+
+import argparse
+import hashlib
+import json
+import time
+from pathlib import Path
+
+from PIL import Image
+
+SIZE = 2048             # sheet width, and the most a sheet may grow to
+PADDING = 2             # transparent gutter around each sprite, in pixels
+REPACK_WASTE = 0.3      # repack in full once this share of used area is gaps
+
+
+class Sheet:
+    """A fixed-width sprite sheet filled shelf by shelf"""
+
+    def __init__(self, size=SIZE, shelves=None, free=None):
+        self.size = size
+        self.shelves = shelves or []    # [y, height, next x]
+        self.free = free or []          # [x, y, w, h] slots left by removed sprites
+
+    @property
+    def height(self):
+        return max((y + h for y, h, _ in self.shelves), default=0)
+
+    def insert(self, w, h):
+        """Claim a slot for a w x h sprite; returns [x, y, w, h], or None if full.
+
+        A reused gap is claimed whole, so freeing the sprite restores it.
+        """
+        gaps = [s for s in self.free if s[2] >= w and s[3] >= h]
+        if gaps:
+            slot = min(gaps, key=lambda s: s[2] * s[3])
+            self.free.remove(slot)
+            return slot
+        shelves = [s for s in self.shelves if s[1] >= h and self.size - s[2] >= w]
+        if shelves:
+            shelf = min(shelves, key=lambda s: s[1] - h)
+        elif self.height + h <= self.size and w <= self.size:
+            shelf = [self.height, h, 0]
+            self.shelves.append(shelf)
+        else:
+            return None
+        shelf[2] += w
+        return [shelf[2] - w, shelf[0], w, h]
+
+    def to_json(self):
+        return {'shelves': self.shelves, 'free': self.free}
+
+
+def _digest(path):
+    return hashlib.sha256(Path(path).read_bytes()).hexdigest()[:16]
+
+
+def _trimmed(path):
+    """Sprite image cropped to its opaque bounds, and the crop box"""
+    image = Image.open(path).convert('RGBA')
+    box = image.getchannel('A').getbbox() or (0, 0, 1, 1)
+    return image.crop(box), box, image.size
+
+
+def collect_sprites(paths):
+    """Map sprite names (file stems) to PNG paths from files and directories"""
+    sprites = {}
+    for path in map(Path, paths):
+        for png in sorted(path.glob('*.png')) if path.is_dir() else [path]:
+            if png.stem in sprites:
+                raise ValueError(f'duplicate sprite name {png.stem!r}: {png}')
+            sprites[png.stem] = png
+    return sprites
+
+
+def build_atlas(sprites, out_dir, size=SIZE, padding=PADDING, full=False):
+    """Pack ``{name: png}`` into sheets under ``out_dir``; returns sprites placed"""
+    out_dir = Path(out_dir)
+    out_dir.mkdir(parents=True, exist_ok=True)
+    manifest_path = out_dir / 'atlas.json'
+    settings = {'size': size, 'padding': padding}
+    try:
+        manifest = json.loads(manifest_path.read_text())
+    except (FileNotFoundError, json.JSONDecodeError):
+        manifest = {}
+    hashes = {name: _digest(path) for name, path in sprites.items()}
+
+    old = manifest.get('sprites', {})
+    sheets = [Sheet(size, s['shelves'], s['free']) for s in manifest.get('sheets', [])]
+    gone = [n for n in old if n not in sprites or old[n]['hash'] != hashes[n]]
+    for name in gone:
+        sheets[old[name]['sheet']].free.append(old[name]['slot'])
+    placed = {n: e for n, e in old.items() if n not in gone}
+    pending = [n for n in sprites if n not in placed]
+
+    used = sum(e['slot'][2] * e['slot'][3] for e in placed.values())
+    waste = sum(s[2] * s[3] for sheet in sheets for s in sheet.free)
+    missing = any(not (out_dir / s['file']).exists() for s in manifest.get('sheets', []))
+    if (full or missing or manifest.get('settings') != settings
+            or waste > REPACK_WASTE * (used + waste)):
+        sheets, placed, pending = [], {}, list(sprites)
+        for stale in out_dir.glob('atlas-*.png'):
+            stale.unlink()
+    touched = {old[n]['sheet'] for n in gone} if sheets else set()
+
+    images = {name: _trimmed(sprites[name]) for name in pending}
+    pending.sort(key=lambda n: (-images[n][0].height, -images[n][0].width, n))
+    for name in pending:
+        crop, box, source = images[name]
+        w, h = crop.width + 2 * padding, crop.height + 2 * padding
+        for index, sheet in enumerate(sheets):
+            slot = sheet.insert(w, h)
+            if slot:
+                break
+        else:
+            sheets.append(Sheet(size))
+            index, slot = len(sheets) - 1, sheets[-1].insert(w, h)
+            if slot is None:
+                raise ValueError(f'sprite {name!r} ({w} x {h}) exceeds a {size} px sheet')
+        placed[name] = {
+            'sheet': index, 'hash': hashes[name], 'slot': slot,
+            'rect': [slot[0] + padding, slot[1] + padding, crop.width, crop.height],
+            'trim': [box[0], box[1], *source],
+        }
+        touched.add(index)
+
+    for index in sorted(touched):
+        _paint(out_dir, index, sheets[index], placed, images)
+    for stale in out_dir.glob('atlas-*.png'):
+        if int(stale.stem.split('-')[1]) >= len(sheets):
+            stale.unlink()
+
+    files = [f'atlas-{i}.png' for i in range(len(sheets))]
+    for entry in placed.values():
+        x, y, w, h = entry['rect']
+        sheet = sheets[entry['sheet']]
+        entry['file'] = files[entry['sheet']]
+        entry['uv'] = [x / size, y / sheet.height, (x + w) / size, (y + h) / sheet.height]
+    manifest = {
+        'settings': settings,
+        'sheets': [{'file': f, 'width': size, 'height': s.height, **s.to_json()}
+                   for f, s in zip(files, sheets)],
+        'sprites': dict(sorted(placed.items())),
+    }
+    manifest_path.write_text(json.dumps(manifest, indent=1))
+    return len(pending)
+
+
+def _paint(out_dir, index, sheet, placed, images):
+    """Redraw one sheet: clear its gaps, paste its new sprites, re-encode"""
+    path = out_dir / f'atlas-{index}.png'
+    canvas = Image.new('RGBA', (sheet.size, sheet.height), (0, 0, 0, 0))
+    if path.exists():
+        previous = Image.open(path).convert('RGBA')
+        canvas.paste(previous.crop((0, 0, sheet.size, min(previous.height, sheet.height))))
+    for x, y, w, h in sheet.free:
+        canvas.paste((0, 0, 0, 0), (x, y, x + w, y + h))
+    for name, entry in placed.items():
+        if entry['sheet'] == index and name in images:
+            x, y, w, h = entry['slot']
+            canvas.paste((0, 0, 0, 0), (x, y, x + w, y + h))
+            canvas.paste(images[name][0], tuple(entry['rect'][:2]))
+    canvas.save(path)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description='Pack sprites into atlas sheets.')
+    parser.add_argument('sources', nargs='+', help='PNG files or directories of them')
+    parser.add_argument('-o', '--output', required=True, help='atlas directory')
+    parser.add_argument('--size', type=int, default=SIZE, help='sheet width in pixels')
+    parser.add_argument('--padding', type=int, default=PADDING)
+    parser.add_argument('--full', action='store_true', help='repack every sprite')
+    args = parser.parse_args(argv)
+
+    start = time.perf_counter()
+    try:
+        sprites = collect_sprites(args.sources)
+    except ValueError as err:
+        parser.error(str(err))
+    packed = build_atlas(sprites, args.output, args.size, args.padding, args.full)
+    sheets = len(list(Path(args.output).glob('atlas-*.png')))
+    print(f"{packed} of {len(sprites)} sprites packed into {sheets} sheet(s) "
+          f"in {time.perf_counter() - start:.2f} s")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,295 @@
+#!/usr/bin/env python3
+"""
+Observational Patience — Benchmarks
+
+Times and memory-profiles the drawing primitives at several element
+counts and dpis, and the full plates, then appends the run to a JSON
+history keyed by commit, .cache/bench-history.jsonl. Each primitive is
+measured in two phases: building the artists and rasterizing them with
+Agg. From the sweep come scaling exponents (the slope of log time
+against log count), artists per element and seconds per thousand
+stipple dots.
+
+    python design/bench.py                      # everything, saved
+    python design/bench.py dendrite -n 1 10 100 --dpi 300
+    python design/bench.py --compare HEAD~3     # against an earlier run
+"""
+
+import argparse
+import gc
+import importlib
+import io
+import json
+import platform
+import subprocess
+import sys
+import time
+import tracemalloc
+from importlib import metadata
+from pathlib import Path
+
+import numpy as np
+
+import lod
+from cache import CACHE_DIR
+from instrument import census
+
+DESIGN_DIR = Path(__file__).parent
+HISTORY = CACHE_DIR / 'bench-history.jsonl'
+COUNTS = (1, 10, 100)
+DPIS = (100, 300)
+REGRESSION = 1.15   # flag timings this much slower than the baseline
+
+
+def _place(i):
+    """A reproducible spot on the 14 x 10 plate for the i-th element"""
+    rng = np.random.default_rng(i)
+    return rng.uniform(1, 13), rng.uniform(1, 9), rng
+
+
+# Primitive name -> (plate module, draw call for the i-th element)
+CASES = {
+    'dendrite': ('laboratory', lambda m, ax, i, x, y, rng: m.draw_dendrite(
+        ax, (x, y), rng.uniform(0, 2 * np.pi), 0.5, seed=i)),
+    'filament': ('laboratory', lambda m, ax, i, x, y, rng: m.draw_filament(
+        ax, (x, y), (x + rng.uniform(0.5, 2), y + rng.uniform(-1, 1)))),
+    'cluster': ('laboratory', lambda m, ax, i, x, y, rng: m.draw_cluster(
+        ax, x, y, size=rng.uniform(0.1, 0.3))),
+    'constellation': ('illuminated', lambda m, ax, i, x, y, rng: m.draw_constellation(
+        ax, x, y, r=0.8)),
+    'celestial_border': ('illuminated', lambda m, ax, i, x, y, rng: m.draw_celestial_border(
+        ax, x - 0.5, y - 0.5, 1.0, 1.0)),
+    'confidence_bar': ('blended', lambda m, ax, i, x, y, rng: m.draw_confidence_bar(
+        ax, x, y, 1.5, rng.uniform(0, 1), f'claim {i}')),
+    'dag_edge': ('blended', lambda m, ax, i, x, y, rng: m.draw_dag_edge(
+        ax, (x, y), (x + rng.uniform(-1, 1), y - 1))),
+    'tree_ring_node': ('blended', lambda m, ax, i, x, y, rng: m.draw_tree_ring_nodes(
+        ax, [(x, y)], [i])),
+}
+PLATES = ('laboratory', 'illuminated', 'blended')
+
+
+def _module(plate):
+    if str(DESIGN_DIR) not in sys.path:
+        sys.path.insert(0, str(DESIGN_DIR))
+    return importlib.import_module(f'create_{plate}')
+
+
+def _axes():
+    import matplotlib.pyplot as plt
+    fig = plt.figure(figsize=(14, 10))
+    ax = fig.add_axes([0, 0, 1, 1])
+    ax.set_xlim(0, 14)
+    ax.set_ylim(0, 10)
+    ax.set_aspect('equal')
+    ax.axis('off')
+    return fig, ax
+
+
+def _counts(ax):
+    """Artists, path vertices and stipple dots currently on ``ax``"""
+    children = ax.get_children()
+    return (len(children), *census(children))
+
+
+def _run(draw, dpi):
+    """Build, then rasterize; returns (build s, render s, census)"""
+    import matplotlib.pyplot as plt
+    fig, ax = _axes()
+    baseline = _counts(ax)
+    start = time.perf_counter()
+    draw(ax)
+    built = time.perf_counter()
+    fig.set_dpi(dpi)
+    fig.canvas.draw()
+    rendered = time.perf_counter()
+    counts = tuple(a - b for a, b in zip(_counts(ax), baseline))
+    plt.close(fig)
+    return built - start, rendered - built, counts
+
+
+def _peak_mb(fn):
+    """Peak traced allocation of ``fn()``, in MB"""
+    gc.collect()
+    tracemalloc.start()
+    try:
+        fn()
+        return tracemalloc.get_traced_memory()[1] / 2**20
+    finally:
+        tracemalloc.stop()
+
+
+def bench_primitive(name, n, dpi, repeat=3):
+    """Best-of-``repeat`` timings and peak memory for ``n`` elements"""
+    plate, call = CASES[name]
+    module = _module(plate)
+
+    def draw(ax):
+        for i in range(n):
+            x, y, rng = _place(i)
+            call(module, ax, i, x, y, rng)
+
+    runs = [_run(draw, dpi) for _ in range(repeat)]
+    artists, vertices, dots = runs[0][2]
+    return {
+        'case': name, 'n': n, 'dpi': dpi,
+        'build_s': min(r[0] for r in runs), 'render_s': min(r[1] for r in runs),
+        'peak_mb': _peak_mb(lambda: _run(draw, dpi)),
+        'artists': artists, 'vertices': vertices, 'dots': dots,
+    }
+
+
+def bench_plate(plate, dpi, repeat=3):
+    """Best-of-``repeat`` timing of a whole plate: figure plus savefig"""
+    import matplotlib.pyplot as plt
+    module = _module(plate)
+
+    def render():
+        with lod.output_dpi(dpi):
+            fig = module.create_figure()
+        fig.savefig(io.BytesIO(), format='png', dpi=dpi, bbox_inches='tight',
+                    facecolor=fig.get_facecolor())
+        plt.close(fig)
+
+    times = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        render()
+        times.append(time.perf_counter() - start)
+    return {'case': f'plate:{plate}', 'n': 1, 'dpi': dpi, 'total_s': min(times),
+            'peak_mb': _peak_mb(render)}
+
+
+def scaling(results):
+    """Per case and dpi: log-log time exponent, artists per element, s per 1k dots"""
+    summary = {}
+    for key in sorted({(r['case'], r['dpi']) for r in results if 'build_s' in r}):
+        rows = sorted((r for r in results if (r['case'], r['dpi']) == key),
+                      key=lambda r: r['n'])
+        n = np.array([r['n'] for r in rows], float)
+        t = np.array([r['build_s'] + r['render_s'] for r in rows])
+        top = rows[-1]
+        entry = {
+            'exponent': float(np.polyfit(np.log(n), np.log(t), 1)[0]) if len(rows) > 1 else None,
+            'artists_per_element': top['artists'] / top['n'],
+        }
+        if top['dots']:
+            entry['s_per_1k_dots'] = (top['build_s'] + top['render_s']) / top['dots'] * 1000
+        summary[f'{key[0]}@{key[1]}'] = entry
+    return summary
+
+
+def _git(*args):
+    return subprocess.run(['git', *args], cwd=DESIGN_DIR, capture_output=True,
+                          text=True).stdout.strip()
+
+
+def _commit(history=HISTORY):
+    """Short HEAD commit and whether the design directory has local changes.
+
+    The ``history`` file, wherever it is kept, is not a change.
+    """
+    paths = ['.']
+    try:
+        paths.append(f':(exclude){Path(history).resolve().relative_to(DESIGN_DIR.resolve())}')
+    except ValueError:
+        pass                # outside the design directory
+    dirty = bool(_git('status', '--porcelain', '--', *paths))
+    return _git('rev-parse', '--short', 'HEAD') or None, dirty
+
+
+def load_history(path=HISTORY):
+    try:
+        return [json.loads(line) for line in Path(path).read_text().splitlines() if line]
+    except FileNotFoundError:
+        return []
+
+
+def compare(run, baseline):
+    """Lines describing timing ratios against ``baseline``, regressions flagged"""
+    def timing(r):
+        return r.get('total_s', r.get('build_s', 0) + r.get('render_s', 0))
+
+    before = {(r['case'], r['n'], r['dpi']): timing(r) for r in baseline['results']}
+    lines = []
+    for r in run['results']:
+        key = (r['case'], r['n'], r['dpi'])
+        if before.get(key):
+            ratio = timing(r) / before[key]
+            flag = '  REGRESSION' if ratio > REGRESSION else ''
+            lines.append(f"{r['case']:<20} n={r['n']:<5} {r['dpi']:>4} dpi  "
+                         f"{before[key]:8.4f} -> {timing(r):8.4f} s  x{ratio:.2f}{flag}")
+    return lines
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description='Benchmark the drawing primitives.')
+    parser.add_argument('cases', nargs='*', help=f"primitives (default: all of {', '.join(CASES)})")
+    parser.add_argument('-n', '--counts', type=int, nargs='+', default=COUNTS)
+    parser.add_argument('--dpi', type=int, nargs='+', default=DPIS)
+    parser.add_argument('--repeat', type=int, default=3)
+    parser.add_argument('--no-plates', action='store_true', help='skip the full plates')
+    parser.add_argument('--compare', nargs='?', const='', metavar='COMMIT',
+                        help='compare with the latest run at COMMIT (default: previous run)')
+    parser.add_argument('--no-save', action='store_true', help='do not append to the history')
+    parser.add_argument('--history', default=HISTORY)
+    args = parser.parse_args(argv)
+
+    unknown = set(args.cases) - set(CASES)
+    if unknown:
+        parser.error(f"unknown case(s): {', '.join(sorted(unknown))}")
+    import matplotlib
+    matplotlib.use('Agg')
+
+    results = []
+    for name in args.cases or CASES:
+        for dpi in args.dpi:
+            for n in args.counts:
+                r = bench_primitive(name, n, dpi, args.repeat)
+                results.append(r)
+                print(f"{name:<20} n={n:<5} {dpi:>4} dpi  build {r['build_s']:.4f} s  "
+                      f"render {r['render_s']:.4f} s  {r['peak_mb']:6.1f} MB  "
+                      f"{r['artists']} artists, {r['dots']} dots")
+    if not args.no_plates and not args.cases:
+        for plate in PLATES:
+            for dpi in args.dpi:
+                r = bench_plate(plate, dpi, args.repeat)
+                results.append(r)
+                print(f"{r['case']:<20} {dpi:>12} dpi  total {r['total_s']:.4f} s  "
+                      f"{r['peak_mb']:6.1f} MB")
+
+    commit, dirty = _commit(args.history)
+    run = {
+        'commit': commit, 'dirty': dirty, 'time': time.strftime('%Y-%m-%dT%H:%M:%S'),
+        'machine': {'python': platform.python_version(), 'platform': platform.platform(),
+                    'matplotlib': metadata.version('matplotlib'),
+                    'numpy': metadata.version('numpy')},
+        'results': results, 'scaling': scaling(results),
+    }
+    print()
+    for key, entry in run['scaling'].items():
+        exponent = f"{entry['exponent']:.2f}" if entry['exponent'] is not None else '-'
+        per_dot = f"  {entry['s_per_1k_dots']:.4f} s/1k dots" if 's_per_1k_dots' in entry else ''
+        print(f"{key:<24} exponent {exponent}  "
+              f"{entry['artists_per_element']:.1f} artists/element{per_dot}")
+
+    if args.compare is not None:
+        history = load_history(args.history)
+        if args.compare:
+            ref = _git('rev-parse', '--short', args.compare) or args.compare
+            history = [h for h in history if (h['commit'] or '').startswith(ref)]
+        if history:
+            baseline = history[-1]
+            print(f"\nAgainst {baseline['commit']} ({baseline['time']}):")
+            print('\n'.join(compare(run, baseline)) or 'no matching cases')
+        else:
+            print('\nNo earlier run to compare against', file=sys.stderr)
+
+    if not args.no_save:
+        Path(args.history).parent.mkdir(parents=True, exist_ok=True)
+        with open(args.history, 'a') as f:
+            f.write(json.dumps(run) + '\n')
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,106 @@
+#!/usr/bin/env python3
+"""
+Observational Patience — Build
+
+Renders every plate (each ``create_*.py`` beside this file) concurrently,
+one worker process per plate, and reports per-plate timing and failures.
+Plates whose render cache key is unchanged are restored without rendering.
+
+    python design                 # all plates
+    python design laboratory -j 2 # a subset, two workers
+    python design --force         # ignore the render cache
+    python design --responsive    # also derive the site's size/format variants
+"""
+
+import argparse
+import importlib
+import os
+import sys
+import time
+import traceback
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from pathlib import Path
+
+from cache import RenderCache, plate_key, plate_output
+
+DESIGN_DIR = Path(__file__).parent
+
+
+def discover_plates():
+    """Plate names, from the create_*.py scripts in the design directory"""
+    return sorted(p.stem[len('create_'):] for p in DESIGN_DIR.glob('create_*.py'))
+
+
+def render_plate(name):
+    """Render one plate in this process; returns (name, seconds, error)"""
+    import matplotlib
+    matplotlib.use('Agg')
+    if str(DESIGN_DIR) not in sys.path:
+        sys.path.insert(0, str(DESIGN_DIR))
+    start = time.perf_counter()
+    try:
+        importlib.import_module(f'create_{name}').create_canvas()
+    except Exception:
+        return name, time.perf_counter() - start, traceback.format_exc()
+    return name, time.perf_counter() - start, None
+
+
+def build(names=None, jobs=None, force=False):
+    """Render plates in a process pool; returns {name: (seconds, error)}"""
+    names = names or discover_plates()
+    cache = RenderCache()
+    keys = {name: plate_key(name) for name in names}
+    results = {}
+    for name in names:
+        start = time.perf_counter()
+        if not force and cache.fetch(keys[name], plate_output(name)):
+            results[name] = (time.perf_counter() - start, None)
+            print(f"{name:<12} {results[name][0]:6.2f} s  cached")
+    stale = [name for name in names if name not in results]
+    if not stale:
+        return results
+
+    jobs = min(jobs or os.cpu_count() or 1, len(stale))
+    with ProcessPoolExecutor(max_workers=jobs) as pool:
+        futures = [pool.submit(render_plate, name) for name in stale]
+        for future in as_completed(futures):
+            name, seconds, error = future.result()
+            results[name] = (seconds, error)
+            if not error:
+                cache.store(keys[name], plate_output(name), name)
+            print(f"{name:<12} {seconds:6.2f} s  {'FAILED' if error else 'ok'}")
+    return results
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description='Render the design plates.')
+    parser.add_argument('plates', nargs='*', help='plate names (default: all)')
+    parser.add_argument('-j', '--jobs', type=int, help='worker processes (default: cores)')
+    parser.add_argument('--force', action='store_true', help='re-render cached plates')
+    parser.add_argument('--responsive', action='store_true',
+                        help='derive resized AVIF/WebP/PNG variants and srcset.json')
+    args = parser.parse_args(argv)
+
+    unknown = set(args.plates) - set(discover_plates())
+    if unknown:
+        parser.error(f"unknown plate(s): {', '.join(sorted(unknown))}")
+
+    start = time.perf_counter()
+    results = build(args.plates, args.jobs, args.force)
+    failed = {name: err for name, (_, err) in results.items() if err}
+    if args.responsive:
+        from responsive import derive, warn_unsupported, write_manifest
+        warn_unsupported()
+        built = sorted(set(results) - set(failed))
+        write_manifest({name: derive(name, plate_output(name), jobs=args.jobs)
+                        for name in built})
+        print(f"Derived responsive variants for {len(built)} plate(s)")
+    print(f"\n{len(results) - len(failed)}/{len(results)} plates in "
+          f"{time.perf_counter() - start:.2f} s")
+    for name, err in sorted(failed.items()):
+        print(f"\n--- {name} failed ---\n{err}", file=sys.stderr)
+    return 1 if failed else 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
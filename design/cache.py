@@ -0,0 +1,198 @@
+"""
+Observational Patience — Render cache
+
+Content-addressed store for rendered plates. A plate's key hashes its
+drawing code (the script and every design module it imports), its COLORS
+palette, its seeds and its output options. The key is read from source
+with ``ast``, so checking a plate never imports matplotlib. Artifacts live
+under ``.cache/`` with a JSON manifest and are evicted least recently used
+once the cache outgrows its size bound.
+"""
+
+import ast
+import hashlib
+import json
+import os
+import shutil
+import time
+from importlib import metadata
+from pathlib import Path
+
+DESIGN_DIR = Path(__file__).parent
+CACHE_DIR = DESIGN_DIR / '.cache'
+MAX_BYTES = 256 * 2**20
+
+
+def _local_sources(name, seen=None):
+    """Sources of a design module and the design modules it imports at top level"""
+    seen = {} if seen is None else seen
+    path = DESIGN_DIR / f'{name}.py'
+    if name in seen or not path.exists():
+        return seen
+    tree = ast.parse(path.read_text())
+    seen[name] = (path, tree)
+    for node in tree.body:
+        if isinstance(node, ast.Import):
+            for alias in node.names:
+                _local_sources(alias.name.split('.')[0], seen)
+        elif isinstance(node, ast.ImportFrom) and node.module and not node.level:
+            _local_sources(node.module.split('.')[0], seen)
+    return seen
+
+
+def _constants(tree):
+    """Module-level literal assignments, e.g. COLORS, OUTPUT, DPI"""
+    found = {}
+    for node in tree.body:
+        if isinstance(node, ast.Assign) and len(node.targets) == 1:
+            target = node.targets[0]
+            if isinstance(target, ast.Name) and target.id.isupper():
+                try:
+                    found[target.id] = ast.literal_eval(node.value)
+                except ValueError:
+                    pass
+    return found
+
+
+def _seeds(tree):
+    """Integer literals passed as seeds, positionally or as seed=..."""
+    seeds = []
+    for node in ast.walk(tree):
+        if not isinstance(node, ast.Call):
+            continue
+        func = node.func
+        if getattr(func, 'attr', getattr(func, 'id', None)) == 'seed':
+            seeds += [ast.literal_eval(a) for a in node.args if isinstance(a, ast.Constant)]
+        seeds += [kw.value.value for kw in node.keywords
+                  if kw.arg == 'seed' and isinstance(kw.value, ast.Constant)]
+    return seeds
+
+
+def data_path(value):
+    """An input file named by a plate constant: relative paths are to design/"""
+    return DESIGN_DIR / value
+
+
+def _data_files(constants):
+    """Size and mtime of input files named by string constants, e.g. a CATALOG"""
+    found = {}
+    for name, value in constants.items():
+        if isinstance(value, str) and value and name != 'OUTPUT':
+            path = data_path(value)
+            if path.is_file():
+                stat = path.stat()
+                found[name] = [stat.st_size, stat.st_mtime_ns]
+    return found
+
+
+def design_imports(module):
+    """Names of a design module and every design module it imports"""
+    return set(_local_sources(module))
+
+
+def code_digest(module):
+    """Hash of a design module's source and the design modules it imports"""
+    sources = _local_sources(module)
+    blob = ''.join(f'{name}:{hashlib.sha256(path.read_bytes()).hexdigest()}\n'
+                   for name, (path, _) in sorted(sources.items()))
+    return hashlib.sha256(blob.encode()).hexdigest()
+
+
+def plate_key(plate, **options):
+    """Hash identifying a plate render; ``options`` override DPI and format"""
+    sources = _local_sources(f'create_{plate}')
+    _, tree = sources[f'create_{plate}']
+    constants = _constants(tree)
+    output = Path(constants.get('OUTPUT', f'{plate}.png'))
+    spec = {
+        'plate': plate,
+        'code': {n: hashlib.sha256(p.read_bytes()).hexdigest()
+                 for n, (p, _) in sorted(sources.items())},
+        'colors': constants.get('COLORS'),
+        'seeds': _seeds(tree),
+        'data': _data_files(constants),
+        'dpi': options.get('dpi', constants.get('DPI')),
+        'format': options.get('format', output.suffix[1:]),
+        'versions': [metadata.version('matplotlib'), metadata.version('numpy')],
+    }
+    blob = json.dumps(spec, sort_keys=True, ensure_ascii=False).encode()
+    return hashlib.sha256(blob).hexdigest()[:20]
+
+
+def plate_output(plate):
+    """Default output path of a plate, from its OUTPUT constant"""
+    _, tree = _local_sources(f'create_{plate}')[f'create_{plate}']
+    return DESIGN_DIR / _constants(tree).get('OUTPUT', f'{plate}.png')
+
+
+def _digest(path):
+    return hashlib.sha256(Path(path).read_bytes()).hexdigest()
+
+
+class RenderCache:
+    """Artifacts keyed by plate_key, with an on-disk manifest"""
+
+    def __init__(self, root=CACHE_DIR, max_bytes=MAX_BYTES):
+        self.root = Path(root)
+        self.max_bytes = max_bytes
+        self.manifest_path = self.root / 'manifest.json'
+        try:
+            self.manifest = json.loads(self.manifest_path.read_text())
+        except (FileNotFoundError, json.JSONDecodeError):
+            self.manifest = {'entries': {}}
+
+    def _save(self):
+        self.root.mkdir(parents=True, exist_ok=True)
+        tmp = self.manifest_path.with_suffix('.tmp')
+        tmp.write_text(json.dumps(self.manifest, indent=1, sort_keys=True))
+        os.replace(tmp, self.manifest_path)
+
+    def fetch(self, key, dest):
+        """Bring ``dest`` up to date from the cache; False on a miss"""
+        entry = self.manifest['entries'].get(key)
+        artifact = self.root / entry['file'] if entry else None
+        if artifact is None or not artifact.exists():
+            return False
+        dest = Path(dest)
+        if not dest.exists() or _digest(dest) != entry['sha256']:
+            shutil.copyfile(artifact, dest)
+        entry['last_used'] = time.time()
+        self._save()
+        return True
+
+    def store(self, key, src, plate=None):
+        """Copy a fresh render into the cache, then evict down to size"""
+        src = Path(src)
+        artifact = Path('objects') / f'{key}{src.suffix}'
+        (self.root / 'objects').mkdir(parents=True, exist_ok=True)
+        shutil.copyfile(src, self.root / artifact)
+        now = time.time()
+        self.manifest['entries'][key] = {
+            'plate': plate, 'file': str(artifact), 'sha256': _digest(src),
+            'bytes': src.stat().st_size, 'created': now, 'last_used': now,
+        }
+        self.evict()
+
+    def evict(self):
+        """Drop least recently used artifacts until under max_bytes"""
+        entries = self.manifest['entries']
+        total = sum(e['bytes'] for e in entries.values())
+        for key in sorted(entries, key=lambda k: entries[k]['last_used']):
+            if total <= self.max_bytes:
+                break
+            total -= entries[key]['bytes']
+            (self.root / entries.pop(key)['file']).unlink(missing_ok=True)
+        self._save()
+
+
+def cached_render(plate, create_canvas, force=False, cache=None):
+    """Render a plate through the cache; returns True on a cache hit"""
+    cache = cache or RenderCache()
+    key = plate_key(plate)
+    output = plate_output(plate)
+    if not force and cache.fetch(key, output):
+        print(f"Cached {output.name}")
+        return True
+    create_canvas()
+    cache.store(key, output, plate)
+    return False
@@ -0,0 +1,198 @@
+#!/usr/bin/env python3
+"""
+Observational Patience — Catalog density
+
+Survey-scale stippling. A binary galaxy catalog (an ``.npy`` structured or
+(n, 2) array, or raw records with a given dtype) is memory-mapped, never
+loaded: worker processes each take a range of rows and bin it, one chunk
+at a time, into a density grid, and the grids are summed. Dots are then
+drawn cell by cell in proportion to density and streamed to a scene sink
+in bounded batches. Grids are cached under ``.cache/density`` by the
+catalog's size and modification time, so a plate re-bins only when its
+catalog changes.
+
+    python design/catalog.py survey.npy --fields ra dec --shape 1024 768
+"""
+
+import argparse
+import hashlib
+import json
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor
+from pathlib import Path
+
+import numpy as np
+
+import lod
+from cache import CACHE_DIR
+from scene import Dots
+
+CHUNK = 1 << 22     # catalog rows per binning pass
+DOT_CHUNK = 200_000 # dots per emitted batch
+SHAPE = (512, 512)  # density grid, (x cells, y cells)
+
+
+def open_catalog(path, dtype=None):
+    """The catalog as a read-only memory map"""
+    if dtype is not None:
+        return np.memmap(path, dtype=np.dtype(dtype), mode='r')
+    return np.load(path, mmap_mode='r')
+
+
+def _columns(block, fields):
+    """x and y of a block of rows, by field name or column index"""
+    if block.dtype.names:
+        return (np.asarray(block[fields[0]], dtype=float),
+                np.asarray(block[fields[1]], dtype=float))
+    return (np.asarray(block[:, int(fields[0])], dtype=float),
+            np.asarray(block[:, int(fields[1])], dtype=float))
+
+
+def _bounds(task):
+    path, dtype, fields, lo, hi = task
+    data = open_catalog(path, dtype)
+    bounds = np.array([np.inf, -np.inf, np.inf, -np.inf])
+    for start in range(lo, hi, CHUNK):
+        x, y = _columns(data[start:min(start + CHUNK, hi)], fields)
+        if np.isfinite(x).any() and np.isfinite(y).any():
+            bounds = np.array([min(bounds[0], np.nanmin(x)), max(bounds[1], np.nanmax(x)),
+                               min(bounds[2], np.nanmin(y)), max(bounds[3], np.nanmax(y))])
+    return bounds
+
+
+def _bin(task):
+    path, dtype, fields, lo, hi, extent, shape = task
+    data = open_catalog(path, dtype)
+    x0, x1, y0, y1 = extent
+    nx, ny = shape
+    counts = np.zeros(nx * ny, dtype=np.int64)
+    for start in range(lo, hi, CHUNK):
+        x, y = _columns(data[start:min(start + CHUNK, hi)], fields)
+        ix = np.floor((x - x0) * (nx / (x1 - x0)))
+        iy = np.floor((y - y0) * (ny / (y1 - y0)))
+        # The top and right edges belong to the last cells; NaNs fall out here
+        ix[x == x1] = nx - 1
+        iy[y == y1] = ny - 1
+        keep = (ix >= 0) & (ix < nx) & (iy >= 0) & (iy < ny)
+        counts += np.bincount(iy[keep].astype(np.int64) * nx + ix[keep].astype(np.int64),
+                              minlength=nx * ny)
+    return counts
+
+
+def _spread(fn, tasks, jobs):
+    """Map over row ranges, in worker processes when there is more than one"""
+    if jobs == 1 or len(tasks) == 1:
+        return [fn(task) for task in tasks]
+    with ProcessPoolExecutor(max_workers=min(jobs, len(tasks))) as pool:
+        return list(pool.map(fn, tasks))
+
+
+def _ranges(rows, jobs):
+    """Row ranges: a few per worker, none shorter than a chunk"""
+    parts = max(1, min(jobs * 4, -(-rows // CHUNK)))
+    edges = np.linspace(0, rows, parts + 1).astype(int)
+    return list(zip(edges[:-1], edges[1:]))
+
+
+def _key(path, fields, shape, extent, dtype):
+    stat = Path(path).stat()
+    spec = {'path': str(Path(path).resolve()), 'size': stat.st_size,
+            'mtime': stat.st_mtime_ns, 'fields': list(map(str, fields)),
+            'shape': list(shape), 'extent': extent and list(map(float, extent)),
+            'dtype': dtype and str(np.dtype(dtype))}
+    return hashlib.sha256(json.dumps(spec, sort_keys=True).encode()).hexdigest()[:20]
+
+
+def density_grid(path, fields=('ra', 'dec'), shape=SHAPE, extent=None, dtype=None,
+                 jobs=None, cache=True):
+    """Counts of catalog rows per cell, as a (ny, nx) array, and the extent binned.
+
+    ``extent`` (x0, x1, y0, y1) defaults to the catalog's bounds, found in
+    a first streaming pass.
+    """
+    cached = CACHE_DIR / 'density' / f'{_key(path, fields, shape, extent, dtype)}.npz'
+    if cache and cached.exists():
+        stored = np.load(cached)
+        return stored['grid'], tuple(stored['extent'])
+
+    jobs = jobs or os.cpu_count() or 1
+    rows = len(open_catalog(path, dtype))
+    ranges = _ranges(rows, jobs)
+    if extent is None:
+        bounds = np.array(_spread(_bounds, [(path, dtype, fields, lo, hi)
+                                            for lo, hi in ranges], jobs))
+        extent = (bounds[:, 0].min(), bounds[:, 1].max(), bounds[:, 2].min(), bounds[:, 3].max())
+    extent = tuple(float(e) for e in extent)
+    counts = sum(_spread(_bin, [(path, dtype, fields, lo, hi, extent, tuple(shape))
+                                for lo, hi in ranges], jobs))
+    grid = counts.reshape(shape[1], shape[0])
+    if cache:
+        cached.parent.mkdir(parents=True, exist_ok=True)
+        np.savez(cached, grid=grid, extent=extent)
+    return grid, extent
+
+
+def place(extent, box):
+    """The largest window inside ``box`` with the aspect of ``extent``, centred"""
+    x0, x1, y0, y1 = extent
+    bx0, bx1, by0, by1 = box
+    scale = min((bx1 - bx0) / (x1 - x0), (by1 - by0) / (y1 - y0))
+    w, h = (x1 - x0) * scale, (y1 - y0) * scale
+    cx, cy = (bx0 + bx1) / 2, (by0 + by1) / 2
+    return (cx - w / 2, cx + w / 2, cy - h / 2, cy + h / 2)
+
+
+def density_batches(grid, window, n_dots, color, alpha=0.5, sizes=(0.2, 0.6),
+                    gamma=0.5, seed=0, chunk=DOT_CHUNK):
+    """Stipple dots over ``window``, cell counts following ``grid ** gamma``.
+
+    A ``gamma`` below one lifts sparse regions so filaments read beside
+    clusters. Dots come out in batches of about ``chunk``.
+    """
+    rng = np.random.default_rng(seed)
+    weights = np.asarray(grid, dtype=float).ravel() ** gamma
+    if not weights.sum():
+        return
+    n_dots, alpha = lod.stipple(n_dots, alpha)
+    per_cell = rng.multinomial(n_dots, weights / weights.sum())
+    cells = np.flatnonzero(per_cell)
+    ny, nx = grid.shape
+    x0, x1, y0, y1 = window
+    cw, ch = (x1 - x0) / nx, (y1 - y0) / ny
+    # Cut the occupied cells into runs of about ``chunk`` dots
+    bounds = np.searchsorted(np.cumsum(per_cell[cells]), np.arange(chunk, n_dots, chunk))
+    for run in np.split(cells, bounds + 1):
+        if not len(run):
+            continue
+        owner = np.repeat(run, per_cell[run])
+        n = len(owner)
+        yield Dots(x0 + (owner % nx + rng.uniform(0, 1, n)) * cw,
+                   y0 + (owner // nx + rng.uniform(0, 1, n)) * ch,
+                   rng.uniform(*sizes, n), color, alpha)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description='Bin a galaxy catalog into a density grid.')
+    parser.add_argument('catalog')
+    parser.add_argument('--fields', nargs=2, default=('ra', 'dec'),
+                        help='x and y field names, or column indices')
+    parser.add_argument('--shape', type=int, nargs=2, default=SHAPE, metavar=('NX', 'NY'))
+    parser.add_argument('--extent', type=float, nargs=4, metavar=('X0', 'X1', 'Y0', 'Y1'))
+    parser.add_argument('--dtype', help='record dtype of a raw binary catalog')
+    parser.add_argument('-j', '--jobs', type=int)
+    parser.add_argument('-o', '--output', help='also save the grid here (.npy)')
+    args = parser.parse_args(argv)
+
+    start = time.perf_counter()
+    grid, extent = density_grid(args.catalog, args.fields, args.shape, args.extent,
+                                args.dtype, args.jobs)
+    print(f"{grid.sum():,} rows in {grid.shape[1]} x {grid.shape[0]} cells over "
+          f"x {extent[0]:g}..{extent[1]:g}, y {extent[2]:g}..{extent[3]:g} "
+          f"in {time.perf_counter() - start:.2f} s")
+    if args.output:
+        np.save(args.output, grid)
+
+
+if __name__ == '__main__':
+    main()
@@ -9,10 +9,16 @@ illuminated thresholds.
 
 import matplotlib.pyplot as plt
 import matplotlib.patches as patches
-from matplotlib.patches import Circle, Rectangle, FancyBboxPatch
+from matplotlib.colors import to_rgba_array
+from matplotlib.patches import Circle, FancyBboxPatch
 import numpy as np
 from pathlib import Path
-from scipy import interpolate
+
+import lod
+from dag import layout
+from glyphs import claim_seed
+from noise import RING_SCALES, rings
+from scene import AxesSink, Lines, Polygons, Text, render
 
 plt.rcParams['font.family'] = 'serif'
 plt.rcParams['font.serif'] = ['EB Garamond', 'Garamond', 'Times New Roman']
@@ -34,6 +40,13 @@ COLORS = {
     'red': '#A87070',
 }
 
+OUTPUT = 'blended-mode.png'
+DPI = 300
+
+STRAND_FAN = 0.35                       # radians between an edge's strands
+THRESHOLDS = (0.5, 0.7)                 # solidity above these turns yellow, then green
+BAR_HEIGHT = 0.22
+
 
 def draw_small_drop_cap(ax, letter, x, y, size=1.2):
     """Smaller illuminated initial - threshold marker"""
@@ -49,32 +62,57 @@ def draw_small_drop_cap(ax, letter, x, y, size=1.2):
             fontfamily='serif', style='italic')
 
 
-def draw_confidence_bar(ax, x, y, width, confidence, label):
-    """Epistemic confidence bar"""
-    bar_height = 0.22
+def solidity_colors(solidity):
+    """Threshold colors, (n, 4): green above 0.7, yellow above 0.5, red otherwise"""
+    stops = to_rgba_array([COLORS['red'], COLORS['yellow'], COLORS['green']])
+    return stops[np.searchsorted(THRESHOLDS, np.asarray(solidity, dtype=float).ravel())]
+
+
+def status_bars(solidity, x, y, width, bar_height=BAR_HEIGHT):
+    """Confidence bars as one Polygons batch: every wash track, then every fill.
+
+    ``x`` and ``y`` (the bar's middle) are one value or one per bar.
+    """
+    solidity = np.asarray(solidity, dtype=float).ravel()
+    n = len(solidity)
+    x, y = (np.broadcast_to(np.asarray(v, dtype=float), (n,)) for v in (x, y))
+    lo, hi = y - bar_height / 2, y + bar_height / 2
+
+    def boxes(w):
+        return np.stack([np.column_stack(c) for c in ((x, lo), (x + w, lo), (x + w, hi), (x, hi))],
+                        axis=1)
+
+    fill = solidity_colors(solidity)
+    fill[:, 3] = 0.6
+    track = np.tile(to_rgba_array(COLORS['wash'], alpha=0.5), (n, 1))
+    return Polygons(list(np.concatenate([boxes(width), boxes(width * solidity)])),
+                    facecolor=np.concatenate([track, fill]), alpha=None)
 
-    # Background
-    ax.add_patch(Rectangle((x, y - bar_height/2), width, bar_height,
-                           facecolor=COLORS['wash'], alpha=0.5))
 
-    # Fill based on confidence
-    if confidence > 0.7:
-        fill_color = COLORS['green']
-    elif confidence > 0.5:
-        fill_color = COLORS['yellow']
-    else:
-        fill_color = COLORS['red']
+def status_labels(solidity, labels, x, y, width):
+    """Each bar's value to its left and label to its right, as Text batches"""
+    for value, label, xi, yi in zip(np.ravel(solidity), labels, *np.broadcast_arrays(x, y)):
+        yield Text(xi - 0.12, yi, f'{value:.2f}',
+                   dict(fontsize=7, va='center', ha='right', color=COLORS['ink_mid'],
+                        fontfamily='monospace'))
+        yield Text(xi + width + 0.15, yi, label,
+                   dict(fontsize=8, va='center', color=COLORS['ink_light'], fontfamily='monospace'))
 
-    ax.add_patch(Rectangle((x, y - bar_height/2), width * confidence, bar_height,
-                           facecolor=fill_color, alpha=0.6))
 
-    # Value
-    ax.text(x - 0.12, y, f'{confidence:.2f}', fontsize=7, va='center', ha='right',
-            color=COLORS['ink_mid'], fontfamily='monospace')
+def draw_status_panel(ax, solidity, labels, x, top, width, pitch=0.6):
+    """Epistemic status: a bar per claim, ``pitch`` apart down from ``top``.
 
-    # Label
-    ax.text(x + width + 0.15, y, label, fontsize=8, va='center',
-            color=COLORS['ink_light'], fontfamily='monospace')
+    The bars are one collection; labels are text, fine for a plate's few
+    claims. A whole project's go on status sheets (status.py).
+    """
+    y = top - np.arange(len(labels)) * pitch
+    render([status_bars(solidity, x, y, width), *status_labels(solidity, labels, x, y, width)],
+           AxesSink(ax))
+
+
+def draw_confidence_bar(ax, x, y, width, confidence, label):
+    """Epistemic confidence bar"""
+    draw_status_panel(ax, [confidence], [label], x, y, width)
 
 
 def draw_branching_structure(ax, x, y, scale=1.0):
@@ -89,7 +127,7 @@ def draw_branching_structure(ax, x, y, scale=1.0):
         # Bezier curve
         mid = ((start[0] + end[0])/2 + np.random.uniform(-0.1, 0.1),
                (start[1] + end[1])/2 + np.random.uniform(-0.1, 0.1))
-        t = np.linspace(0, 1, 20)
+        t = np.linspace(0, 1, lod.samples(20, length))
         bx = (1-t)**2 * start[0] + 2*(1-t)*t * mid[0] + t**2 * end[0]
         by = (1-t)**2 * start[1] + 2*(1-t)*t * mid[1] + t**2 * end[1]
 
@@ -105,24 +143,108 @@ def draw_branching_structure(ax, x, y, scale=1.0):
     branch((x, y), -np.pi/2, 0.4 * scale, 1)
 
 
-def draw_dag_node(ax, x, y, label, size=0.18):
+def draw_dag_nodes(ax, centres, labels, size=0.18, rings=False):
+    """DAG nodes, the label at the heart of each.
+
+    Nodes are cream discs edged in the accent; with ``rings``, organic
+    tree rings seeded by each claim's label instead.
+    """
+    if rings:
+        draw_tree_ring_nodes(ax, centres, [claim_seed(label) for label in labels], radius=size)
+    for (x, y), label in zip(centres, labels):
+        if not rings:
+            ax.add_patch(Circle((x, y), size, facecolor=COLORS['cream'],
+                                edgecolor=COLORS['accent'], linewidth=1.2))
+        ax.text(x, y, label, fontsize=9, ha='center', va='center',
+                color=COLORS['ink_mid'], style='italic')
+
+
+def draw_dag_node(ax, x, y, label, size=0.18, rings=False):
     """DAG node"""
-    ax.add_patch(Circle((x, y), size, facecolor=COLORS['cream'],
-                        edgecolor=COLORS['accent'], linewidth=1.2))
-    ax.text(x, y, label, fontsize=9, ha='center', va='center',
-            color=COLORS['ink_mid'], style='italic')
+    draw_dag_nodes(ax, [(x, y)], [label], size, rings)
+
+
+def tree_ring_batches(centres, seeds, radius=0.18, color=None, aspect=1.0, zorder=3):
+    """Organic tree-ring DAG nodes: ring fills painted outside-in, then every stroke.
+
+    ``seeds`` pick each node's outlines (``glyphs.claim_seed`` of its
+    claim, say); ``color`` is one color or one per node. Ring strokes
+    fade outward, the core a little subtler, as in the claims demo.
+    """
+    centres = np.asarray(centres, dtype=float).reshape(-1, 2)
+    shapes = centres[:, None, None] + radius * rings(seeds, aspect=aspect)
+    rgba = to_rgba_array(COLORS['accent'] if color is None else color)
+    k = len(RING_SCALES)
+    for i in reversed(range(k)):
+        yield Polygons(list(shapes[:, i]), facecolor=rgba if len(rgba) > 1 else rgba[0],
+                       alpha=0.06 + (k - 1 - i) * 0.04, zorder=zorder)
+    ring = np.tile(np.arange(k), len(centres))
+    closed = np.concatenate([shapes, shapes[:, :, :1]], axis=2)
+    yield Lines(closed.reshape(-1, *closed.shape[2:]), widths=np.where(ring == 0, 0.8, 0.5),
+                color=np.repeat(rgba, k, axis=0) if len(rgba) > 1 else rgba[0],
+                alpha=0.5 * (1 - ring / k) * np.where(ring == 0, 0.7, 1),
+                joinstyle='round', zorder=zorder)
+
+
+def draw_tree_ring_nodes(ax, centres, seeds, **style):
+    """Tree-ring nodes; ``style`` as for ``tree_ring_batches``"""
+    render(tree_ring_batches(centres, seeds, **style), AxesSink(ax))
+
+
+def strand_counts(confidence):
+    """Strands per connector, one to four, from confidence in [0, 1]"""
+    return np.clip(np.ceil(np.asarray(confidence, dtype=float) * 4), 1, 4).astype(int)
+
+
+def dag_edge_lines(starts, ends, strands=1, radius=0.0, color=None, alpha=0.6,
+                   width=1.0, lift=0.2):
+    """Every DAG edge, strand by strand, as quadratic beziers in one pass.
+
+    Edge e runs from ``starts[e]`` to ``ends[e]`` in ``strands`` (one
+    count, or one per edge) strands. Strand i plugs into ring i of nodes
+    of ``radius``, fanned about the chord, and fades and thins as the
+    rings do; the core strand takes ``alpha`` and ``width`` as given.
+    ``color`` is one color or one per edge, the target's correctness.
+    Returns one Lines batch, colored and faded strand by strand.
+    """
+    starts = np.asarray(starts, dtype=float).reshape(-1, 2)
+    ends = np.asarray(ends, dtype=float).reshape(-1, 2)
+    count = np.broadcast_to(np.asarray(strands, dtype=int), (len(starts),))
+    edge = np.repeat(np.arange(len(starts)), count)
+    ring = np.arange(len(edge)) - np.repeat(np.cumsum(count) - count, count)
+
+    chord = ends[edge] - starts[edge]
+    heading = np.arctan2(chord[:, 1], chord[:, 0])
+    # Fan about the chord, mirrored at the far end so strands never cross
+    fan = (ring - (count[edge] - 1) / 2) * STRAND_FAN
+    r = radius * np.asarray(RING_SCALES)[ring]
+    a = starts[edge] + (r * [np.cos(heading + fan), np.sin(heading + fan)]).T
+    b = ends[edge] - (r * [np.cos(heading - fan), np.sin(heading - fan)]).T
+    mid = (a + b) / 2 + [0, lift]
+
+    longest = np.hypot(*chord.T).max() if len(edge) else 0
+    t = np.linspace(0, 1, lod.samples(30, longest))[None, :, None]
+    paths = (1-t)**2 * a[:, None] + 2*(1-t)*t * mid[:, None] + t**2 * b[:, None]
+
+    # Ring factor 1 - 0.3 i, as the spec's ring opacities, relative to the core
+    loss = ring * 0.3
+    rgba = to_rgba_array(COLORS['wash'] if color is None else color)
+    return Lines(paths, widths=width * (1 - loss / 1.4), alpha=alpha * (1 - loss * 0.75 / 0.9),
+                 color=rgba[edge] if len(rgba) > 1 else rgba[0],
+                 capstyle='projecting', joinstyle='round')
+
+
+def draw_dag_edges(ax, starts, ends, **style):
+    """DAG edges as one collection; ``style`` as for ``dag_edge_lines``"""
+    render([dag_edge_lines(starts, ends, **style)], AxesSink(ax))
 
 
 def draw_dag_edge(ax, start, end):
     """DAG edge with bezier curve"""
-    mid_y = (start[1] + end[1]) / 2 + 0.2
-    t = np.linspace(0, 1, 30)
-    bx = (1-t)**2 * start[0] + 2*(1-t)*t * ((start[0]+end[0])/2) + t**2 * end[0]
-    by = (1-t)**2 * start[1] + 2*(1-t)*t * mid_y + t**2 * end[1]
-    ax.plot(bx, by, color=COLORS['wash'], linewidth=1, alpha=0.6)
+    draw_dag_edges(ax, [start], [end])
 
 
-def create_canvas():
+def create_figure():
     fig = plt.figure(figsize=(14, 10), facecolor=COLORS['bg'])
     ax = fig.add_axes([0, 0, 1, 1])
     ax.set_xlim(0, 14)
@@ -161,24 +283,25 @@ def create_canvas():
         (0.55, 'distributional shift'),
     ]
 
-    for i, (conf, label) in enumerate(claims):
-        draw_confidence_bar(ax, 1.5, 6.1 - i * 0.6, 3.0, conf, label)
+    draw_status_panel(ax, *zip(*claims), x=1.5, top=6.1, width=3.0)
 
     # === REASONING DAG (center) ===
-    nodes = [
-        (7, 5.5, 'α'), (8.5, 6.2, 'β'), (8.5, 4.8, 'γ'),
-        (10, 5.5, 'δ'), (10, 6.5, 'ε')
+    reasoning = [
+        {'id': 'α'}, {'id': 'β', 'depends_on': ['α']}, {'id': 'γ', 'depends_on': ['α']},
+        {'id': 'δ', 'depends_on': ['β', 'γ']}, {'id': 'ε', 'depends_on': ['β', 'δ']},
     ]
-    edges = [(0, 1), (0, 2), (1, 3), (2, 3), (1, 4), (3, 4)]
+    nodes = {c: (7 + x, 5.5 + y) for c, (x, y) in layout(reasoning, dx=1.0, dy=1.4).items()}
 
-    for i, j in edges:
-        draw_dag_edge(ax, (nodes[i][0], nodes[i][1]), (nodes[j][0], nodes[j][1]))
+    links = [(nodes[parent], nodes[claim['id']])
+             for claim in reasoning for parent in claim.get('depends_on', [])]
+    draw_dag_edges(ax, *zip(*links))
 
-    for x, y, label in nodes:
-        draw_dag_node(ax, x, y, label)
+    draw_dag_nodes(ax, list(nodes.values()), list(nodes))
 
-    ax.text(8.5, 4.0, 'reasoning structure', fontsize=8, color=COLORS['ink_faint'],
-            ha='center', fontfamily='monospace')
+    # Centred under the graph, wherever the layout puts its nodes
+    xs, ys = zip(*nodes.values())
+    ax.text((min(xs) + max(xs)) / 2, min(ys) - 0.8, 'reasoning structure', fontsize=8,
+            color=COLORS['ink_faint'], ha='center', fontfamily='monospace')
 
     # === BRANCHING STRUCTURE (right) ===
     draw_branching_structure(ax, 12, 5.5, scale=1.8)
@@ -205,11 +328,20 @@ def create_canvas():
     # Decorative line separator
     ax.plot([1, 6], [3.0, 3.0], color=COLORS['wash'], linewidth=0.5)
 
-    plt.savefig(Path(__file__).parent / 'blended-mode.png', format='png',
-                bbox_inches='tight', facecolor=fig.get_facecolor(), dpi=300)
+    return fig
+
+
+def create_canvas(path=None, dpi=DPI):
+    with lod.output_dpi(dpi):
+        fig = create_figure()
+    path = Path(path) if path else Path(__file__).parent / OUTPUT
+    plt.savefig(path, format=path.suffix[1:],
+                bbox_inches='tight', facecolor=fig.get_facecolor(), dpi=dpi)
     plt.close()
-    print("Created blended-mode.png")
+    print(f"Created {path.name}")
 
 
 if __name__ == '__main__':
-    create_canvas()
+    import sys
+    from cache import cached_render
+    cached_render('blended', create_canvas, force='--force' in sys.argv[1:])
@@ -12,6 +12,8 @@ from matplotlib.patches import Circle, Rectangle, FancyBboxPatch, Wedge
 import numpy as np
 from pathlib import Path
 
+from raster import RasterLayer
+
 plt.rcParams['font.family'] = 'serif'
 plt.rcParams['font.serif'] = ['EB Garamond', 'Garamond', 'Times New Roman']
 
@@ -28,6 +30,10 @@ COLORS = {
     'accent': '#5A7B7B',
 }
 
+OUTPUT = 'illuminated-mode.png'
+DPI = 300
+RASTER = False      # splat constellation stars into a NumPy raster layer
+
 
 def draw_drop_cap(ax, letter, x, y, size=1.8):
     """Illuminated initial letter"""
@@ -99,7 +105,7 @@ def draw_moon(ax, x, y, r=0.4):
                      color='#E8E4DC', alpha=0.8)
 
 
-def draw_constellation(ax, x, y, r=1.0):
+def draw_constellation(ax, x, y, r=1.0, raster=None):
     """Small constellation diagram"""
     ax.add_patch(Circle((x, y), r, facecolor=COLORS['cream'],
                         edgecolor=COLORS['gold_light'], linewidth=0.8, alpha=0.5))
@@ -113,7 +119,13 @@ def draw_constellation(ax, x, y, r=1.0):
         sy = y + dist * np.sin(angle)
         size = np.random.uniform(2, 5)
         stars.append((sx, sy, size))
-        ax.plot(sx, sy, '*', color=COLORS['gold'], markersize=size, alpha=0.8)
+        if raster is None:
+            ax.plot(sx, sy, '*', color=COLORS['gold'], markersize=size, alpha=0.8)
+    if raster is not None:
+        # A '*' marker of size s reaches s / 2 and is stroked 1 pt wide
+        sx, sy, size = np.array(stars).T
+        edge = plt.rcParams['lines.markeredgewidth']
+        raster.dots(sx, sy, size / 2, COLORS['gold'], 0.8, shape='star', stroke=edge)
 
     # Connect some stars
     for i in range(0, min(8, len(stars) - 1), 2):
@@ -132,7 +144,7 @@ def draw_sun(ax, x, y, r=0.25):
                color=COLORS['gold'], linewidth=0.8)
 
 
-def create_canvas():
+def create_figure(raster_dpi=None):
     fig = plt.figure(figsize=(14, 10), facecolor=COLORS['bg'])
     ax = fig.add_axes([0, 0, 1, 1])
     ax.set_xlim(0, 14)
@@ -140,6 +152,7 @@ def create_canvas():
     ax.set_aspect('equal')
     ax.axis('off')
     ax.set_facecolor(COLORS['bg'])
+    layer = RasterLayer.for_axes(ax, raster_dpi) if raster_dpi else None
 
     # Celestial border
     draw_celestial_border(ax, 0.4, 0.4, 13.2, 9.2)
@@ -176,7 +189,7 @@ def create_canvas():
                    color=COLORS['ink_light'], fontfamily='serif')
 
     # Constellation
-    draw_constellation(ax, 11.5, 5.5, r=1.2)
+    draw_constellation(ax, 11.5, 5.5, r=1.2, raster=layer)
     ax.text(11.5, 4.0, 'Celestial Map', fontsize=8, color=COLORS['ink_faint'],
             ha='center', style='italic')
 
@@ -221,11 +234,21 @@ def create_canvas():
     ax.text(13.3, 0.6, 'Plate II', fontsize=8, color=COLORS['ink_light'],
             ha='right', style='italic')
 
-    plt.savefig(Path(__file__).parent / 'illuminated-mode.png', format='png',
-                bbox_inches='tight', facecolor=fig.get_facecolor(), dpi=300)
+    if layer is not None:
+        layer.draw(ax)
+    return fig
+
+
+def create_canvas(path=None, dpi=DPI):
+    fig = create_figure(raster_dpi=dpi if RASTER else None)
+    path = Path(path) if path else Path(__file__).parent / OUTPUT
+    plt.savefig(path, format=path.suffix[1:],
+                bbox_inches='tight', facecolor=fig.get_facecolor(), dpi=dpi)
     plt.close()
-    print("Created illuminated-mode.png")
+    print(f"Created {path.name}")
 
 
 if __name__ == '__main__':
-    create_canvas()
+    import sys
+    from cache import cached_render
+    cached_render('illuminated', create_canvas, force='--force' in sys.argv[1:])
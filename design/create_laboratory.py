@@ -11,7 +11,16 @@ import matplotlib.patches as patches
 from matplotlib.patches import Circle, Ellipse, FancyBboxPatch
 import numpy as np
 from pathlib import Path
-from scipy import interpolate
+
+import lod
+from cache import data_path
+from catalog import density_batches, density_grid, place
+from dendrite import arbor_levels, arbor_lines, grow_dendrite
+from raster import RasterLayer
+from scene import AxesSink, Dots, Lines, RasterSink, merge, render
+from splines import smooth_curve
+from stipple import Stipple
+from web import build_web, control_points, fit, growth_order, voronoi_halos
 
 plt.rcParams['font.family'] = 'serif'
 plt.rcParams['font.serif'] = ['EB Garamond', 'Garamond', 'Times New Roman']
@@ -27,57 +36,37 @@ COLORS = {
     'accent': '#4A5A5A',
 }
 
+OUTPUT = 'laboratory-mode.png'
+DPI = 300
+RASTER = False      # splat stipples and dendrites into a NumPy raster layer
+HALOS = None        # derive the cosmic web from this many simulated halos, or an .npy
+                    # (data paths are relative to design/)
+WEB_EXTENT = (5.8, 11.8, 3.6, 7.4)
+CATALOG = None      # .npy galaxy catalog to stipple by density behind the cosmic web
+CATALOG_FIELDS = ('ra', 'dec')
+CATALOG_DOTS = 60_000
+
+
+def dendrite_batches(start, angle, length, max_depth=4, base_width=1.2, seed=None,
+                     levels=False):
+    """Branching structure; several roots when ``angle`` is a sequence.
+
+    With ``levels``, one batch per depth level, roots first.
+    """
+    arbor = grow_dendrite(start, angle, length, max_depth=max_depth,
+                          base_width=base_width, seed=seed,
+                          n_smooth=lod.samples(30, length))
+    if levels:
+        yield from arbor_levels(arbor, COLORS['ink_mid'])
+    else:
+        yield arbor_lines(arbor, COLORS['ink_mid'])
 
-def smooth_curve(points, n_smooth=80):
-    """Smooth curve through points"""
-    if len(points) < 3:
-        return points[:, 0], points[:, 1]
-    t = np.linspace(0, 1, len(points))
-    t_smooth = np.linspace(0, 1, n_smooth)
-    try:
-        cs_x = interpolate.CubicSpline(t, points[:, 0], bc_type='natural')
-        cs_y = interpolate.CubicSpline(t, points[:, 1], bc_type='natural')
-        return cs_x(t_smooth), cs_y(t_smooth)
-    except:
-        return points[:, 0], points[:, 1]
-
-
-def draw_dendrite(ax, start, angle, length, depth=0, max_depth=4, base_width=1.2):
-    """Recursive branching structure"""
-    if depth > max_depth or length < 0.08:
-        return
-
-    np.random.seed(int(start[0] * 1000 + start[1] * 100 + depth * 10))
-    width = base_width * (0.7 ** depth)
-
-    # Curved path
-    curve = np.random.uniform(-0.3, 0.3)
-    end = (start[0] + length * np.cos(angle), start[1] + length * np.sin(angle))
-    mid = (start[0] + length * 0.5 * np.cos(angle + curve),
-           start[1] + length * 0.5 * np.sin(angle + curve))
-
-    points = np.array([start, mid, end])
-    x, y = smooth_curve(points, 30)
-    ax.plot(x, y, color=COLORS['ink_mid'], linewidth=width, alpha=0.85,
-            solid_capstyle='round')
-
-    # Dendritic spines
-    if depth > 1 and np.random.random() > 0.4:
-        for _ in range(np.random.randint(2, 4)):
-            t = np.random.uniform(0.3, 0.7)
-            idx = int(t * (len(x) - 1))
-            spine_angle = angle + np.random.choice([-1, 1]) * np.pi/2
-            spine_len = 0.04
-            ax.plot([x[idx], x[idx] + spine_len * np.cos(spine_angle)],
-                   [y[idx], y[idx] + spine_len * np.sin(spine_angle)],
-                   color=COLORS['ink_mid'], linewidth=0.3, alpha=0.5)
-
-    # Branch
-    if depth < max_depth:
-        for _ in range(np.random.randint(1, 3)):
-            new_angle = angle + np.random.uniform(-0.7, 0.7)
-            new_length = length * np.random.uniform(0.5, 0.75)
-            draw_dendrite(ax, end, new_angle, new_length, depth + 1, max_depth, base_width)
+
+def draw_dendrite(ax, start, angle, length, max_depth=4, base_width=1.2, seed=None,
+                  raster=None):
+    """Dendrite drawn on ``ax``, or stroked into a RasterLayer"""
+    sink = RasterSink(raster) if raster is not None else AxesSink(ax)
+    render(dendrite_batches(start, angle, length, max_depth, base_width, seed), sink)
 
 
 def draw_cell_body(ax, x, y, size=0.2):
@@ -91,52 +80,127 @@ def draw_cell_body(ax, x, y, size=0.2):
     ax.plot(x, y, '.', color=COLORS['ink'], markersize=2)
 
 
-def draw_filament(ax, start, end, thickness=0.8):
-    """Cosmic filament with stippling"""
+def filament_batches(start, end, thickness=0.8, density=12, via=None):
+    """Cosmic filament with stippling; through control points ``via`` if given"""
     np.random.seed(int(start[0] * 100 + end[1] * 50))
 
-    n_ctrl = np.random.randint(3, 5)
-    t_ctrl = np.sort(np.concatenate([[0], np.random.uniform(0.2, 0.8, n_ctrl - 2), [1]]))
-
     dx, dy = end[0] - start[0], end[1] - start[1]
     length = np.sqrt(dx**2 + dy**2)
     perp_x, perp_y = -dy / length, dx / length
 
-    ctrl_pts = []
-    for t in t_ctrl:
-        disp = np.random.uniform(-0.2, 0.2) * length * 0.3
-        ctrl_pts.append([start[0] + t * dx + disp * perp_x,
-                        start[1] + t * dy + disp * perp_y])
+    if via is not None:
+        ctrl_pts = np.asarray(via)
+        length = np.hypot(*np.diff(ctrl_pts, axis=0).T).sum()
+    else:
+        n_ctrl = np.random.randint(3, 5)
+        t_ctrl = np.sort(np.concatenate([[0], np.random.uniform(0.2, 0.8, n_ctrl - 2), [1]]))
+        ctrl_pts = []
+        for t in t_ctrl:
+            disp = np.random.uniform(-0.2, 0.2) * length * 0.3
+            ctrl_pts.append([start[0] + t * dx + disp * perp_x,
+                            start[1] + t * dy + disp * perp_y])
+
+    x, y = smooth_curve(np.array(ctrl_pts), lod.samples(60, length))
+
+    # Three strands, stroked as ax.plot would
+    offsets = np.linspace(-0.01, 0.01, 3) * thickness
+    strands = np.stack([np.column_stack([x + o * perp_x, y + o * perp_y]) for o in offsets])
+    yield Lines(strands, thickness * (1 - np.abs(offsets) * 30), COLORS['ink_mid'], 0.5,
+                capstyle='projecting', joinstyle='round')
 
-    x, y = smooth_curve(np.array(ctrl_pts), 60)
+    # Stippling
+    n_dots = int(length * density * thickness)
+    idx = (np.random.uniform(0, 1, n_dots) * (len(x) - 1)).astype(int)
+    offset = np.random.normal(0, 0.015 * thickness, n_dots)
+    sizes = np.random.uniform(0.2, 0.5, n_dots)
+    keep, alpha = lod.stipple(n_dots, 0.4)
+    yield Dots(x[idx[:keep]] + offset[:keep] * perp_x, y[idx[:keep]] + offset[:keep] * perp_y,
+               sizes[:keep], COLORS['ink_mid'], alpha)
 
-    for offset in np.linspace(-0.01, 0.01, 3) * thickness:
-        lw = thickness * (1 - abs(offset) * 30)
-        ax.plot(x + offset * perp_x, y + offset * perp_y,
-               color=COLORS['ink_mid'], linewidth=lw, alpha=0.5)
 
-    # Stippling
-    n_dots = int(length * 12 * thickness)
-    for _ in range(n_dots):
-        t = np.random.uniform(0, 1)
-        idx = int(t * (len(x) - 1))
-        offset = np.random.normal(0, 0.015 * thickness)
-        ax.plot(x[idx] + offset * perp_x, y[idx] + offset * perp_y,
-               '.', color=COLORS['ink_mid'], markersize=np.random.uniform(0.2, 0.5), alpha=0.4)
+def draw_filament(ax, start, end, thickness=0.8, density=12, stipple=None):
+    """Filament drawn on ``ax``; its dots go into ``stipple`` if given"""
+    render(filament_batches(start, end, thickness, density), AxesSink(ax, stipple))
 
 
-def draw_cluster(ax, x, y, size=0.12):
+def cluster_batches(x, y, size=0.12, density=40):
     """Galaxy cluster node"""
     np.random.seed(int(x * 1000 + y * 100))
-    for _ in range(int(40 * size)):
-        r = np.random.exponential(size * 0.4)
-        theta = np.random.uniform(0, 2 * np.pi)
-        dot_size = np.random.uniform(0.3, 1.2) * (1 - r / (size * 2))
-        ax.plot(x + r * np.cos(theta), y + r * np.sin(theta),
-               '.', color=COLORS['ink'], markersize=max(0.2, dot_size), alpha=0.6)
+    n_dots = int(density * size)
+    r = np.random.exponential(size * 0.4, n_dots)
+    theta = np.random.uniform(0, 2 * np.pi, n_dots)
+    dot_size = np.random.uniform(0.3, 1.2, n_dots) * (1 - r / (size * 2))
+    keep, alpha = lod.stipple(n_dots, 0.6)
+    r, theta = r[:keep], theta[:keep]
+    yield Dots(x + r * np.cos(theta), y + r * np.sin(theta),
+               np.maximum(0.2, dot_size[:keep]), COLORS['ink'], alpha)
+
+
+def draw_cluster(ax, x, y, size=0.12, density=40, stipple=None):
+    """Cluster drawn on ``ax``; its dots go into ``stipple`` if given"""
+    render(cluster_batches(x, y, size, density), AxesSink(ax, stipple))
+
+
+def cosmic_web(nodes, edges, thickness=0.6):
+    """Filaments along ``edges``, then a cluster on every node"""
+    for _, batches in _cosmic_web_items(nodes, edges, thickness):
+        yield from batches
+
+
+def _cosmic_web_items(nodes, edges, thickness):
+    for k, (i, j) in enumerate(edges):
+        yield ('edge', k), filament_batches(nodes[i], nodes[j], thickness=thickness)
+    for i, (x, y) in enumerate(nodes):
+        yield ('node', i), cluster_batches(x, y, size=np.random.uniform(0.08, 0.15))
+
 
+def cosmic_web_parts(nodes, edges, thickness=0.6):
+    """Each filament's batches, then each cluster's, keyed ('edge', k) or ('node', i)"""
+    return {key: list(batches) for key, batches in _cosmic_web_items(nodes, edges, thickness)}
 
-def create_canvas():
+
+def web_batches(web, thickness=0.6):
+    """Filaments along a derived Web's halo chains, then its clusters"""
+    for _, batches in _web_items(web, thickness):
+        yield from batches
+
+
+def _web_items(web, thickness):
+    for k, ((i, j), path) in enumerate(zip(web.edges, web.paths)):
+        yield ('edge', k), filament_batches(web.nodes[i], web.nodes[j], thickness=thickness,
+                                            via=control_points(path))
+    for i, ((x, y), size) in enumerate(zip(web.nodes, web.sizes)):
+        yield ('node', i), cluster_batches(x, y, size=size)
+
+
+def web_parts(web, thickness=0.6):
+    """A derived Web's batches keyed as by ``cosmic_web_parts``"""
+    return {key: list(batches) for key, batches in _web_items(web, thickness)}
+
+
+def web_stages(parts, n, edges):
+    """Batches of ``parts`` grouped by when they grow, spreading from the first node"""
+    node_stage, edge_stage = growth_order(n, edges)
+    stages = [[] for _ in range(max(node_stage.max(initial=0), edge_stage.max(initial=0)) + 1)]
+    # A filament is laid down before the cluster it reaches
+    for (kind, i), batches in sorted(parts.items(), key=lambda item: item[0][0]):
+        stages[(edge_stage if kind == 'edge' else node_stage)[i]].extend(batches)
+    return stages
+
+
+def halo_field(halos, extent=WEB_EXTENT):
+    """Halo positions for the plate: simulated if ``halos`` is a count, else loaded"""
+    if isinstance(halos, int):
+        return voronoi_halos(halos, extent, seed=42)
+    return fit(np.load(data_path(halos)), extent)
+
+
+def create_figure(raster_dpi=None, growth=None):
+    """The plate; with a ``growth`` list, the growing structures are left off.
+
+    The dendrite and the cosmic web then go into ``growth`` instead, each
+    as a list of stages of scene batches, for animate.py to draw in turn.
+    """
     fig = plt.figure(figsize=(14, 10), facecolor=COLORS['bg'])
     ax = fig.add_axes([0, 0, 1, 1])
     ax.set_xlim(0, 14)
@@ -144,6 +208,7 @@ def create_canvas():
     ax.set_aspect('equal')
     ax.axis('off')
     ax.set_facecolor(COLORS['bg'])
+    layer = RasterLayer.for_axes(ax, raster_dpi) if raster_dpi else None
 
     # Title
     ax.text(7, 9.3, 'Laboratory Mode', fontsize=28, color=COLORS['ink'],
@@ -154,8 +219,12 @@ def create_canvas():
 
     # === NEURAL STRUCTURE (left) ===
     draw_cell_body(ax, 2.5, 5.0, size=0.25)
-    for angle in [np.pi/2 - 0.3, np.pi/2, np.pi/2 + 0.3]:
-        draw_dendrite(ax, (2.5, 5.2), angle, 0.7, max_depth=5)
+    arbor = ((2.5, 5.2), [np.pi/2 - 0.3, np.pi/2, np.pi/2 + 0.3], 0.7)
+    if growth is None:
+        draw_dendrite(ax, *arbor, max_depth=5, seed=45, raster=layer)
+    else:
+        growth.append([[level] for level in dendrite_batches(*arbor, max_depth=5, seed=45,
+                                                             levels=True)])
     # Axon
     axon_y = np.linspace(4.75, 3.2, 30)
     axon_x = 2.5 + 0.03 * np.sin(axon_y * 8)
@@ -171,15 +240,25 @@ def create_canvas():
     nodes = [(6, 6), (7.5, 5), (9, 6.5), (8, 4), (10, 5), (11, 6),
              (6.5, 4.5), (9.5, 4), (10.5, 4.5), (7, 7), (11.5, 5.5)]
 
-    # Filaments
     edges = [(0, 1), (1, 2), (1, 3), (2, 4), (4, 5), (3, 4), (0, 6),
              (3, 7), (4, 8), (0, 9), (5, 10), (2, 5)]
-    for i, j in edges:
-        draw_filament(ax, nodes[i], nodes[j], thickness=0.6)
-
-    # Clusters
-    for x, y in nodes:
-        draw_cluster(ax, x, y, size=np.random.uniform(0.08, 0.15))
+    # Filaments, then clusters; every dot in one stippling
+    stipple = Stipple()
+    sink = RasterSink(layer) if layer else AxesSink(ax, stipple)
+    if CATALOG:
+        grid, extent = density_grid(data_path(CATALOG), CATALOG_FIELDS)
+        render(density_batches(grid, place(extent, WEB_EXTENT), CATALOG_DOTS,
+                               COLORS['ink_light'], alpha=0.3), sink)
+    web = build_web(halo_field(HALOS)) if HALOS else None
+    if growth is None:
+        render(merge(web_batches(web)) if web is not None else cosmic_web(nodes, edges), sink)
+    else:
+        if web is not None:
+            parts, n, links = web_parts(web), len(web.nodes), web.edges
+        else:
+            parts, n, links = cosmic_web_parts(nodes, edges), len(nodes), edges
+        growth.append([list(merge(stage)) for stage in web_stages(parts, n, links)])
+    stipple.draw(ax)
 
     # Void indication
     ax.add_patch(Ellipse((8, 5.5), 1.2, 0.8, facecolor=COLORS['bg'],
@@ -211,11 +290,22 @@ def create_canvas():
                                 facecolor='none', edgecolor=COLORS['wash'],
                                 linewidth=0.5, alpha=0.5))
 
-    plt.savefig(Path(__file__).parent / 'laboratory-mode.png', format='png',
-                bbox_inches='tight', facecolor=fig.get_facecolor(), dpi=300)
+    if layer is not None:
+        layer.draw(ax)
+    return fig
+
+
+def create_canvas(path=None, dpi=DPI):
+    with lod.output_dpi(dpi):
+        fig = create_figure(raster_dpi=dpi if RASTER else None)
+    path = Path(path) if path else Path(__file__).parent / OUTPUT
+    plt.savefig(path, format=path.suffix[1:],
+                bbox_inches='tight', facecolor=fig.get_facecolor(), dpi=dpi)
     plt.close()
-    print("Created laboratory-mode.png")
+    print(f"Created {path.name}")
 
 
 if __name__ == '__main__':
-    create_canvas()
+    import sys
+    from cache import cached_render
+    cached_render('laboratory', create_canvas, force='--force' in sys.argv[1:])
@@ -0,0 +1,294 @@
+#!/usr/bin/env python3
+"""
+Observational Patience — Claims DAG layout
+
+Left-to-right tiered layout of claims from their ``depends_on`` lists, as
+in the epistemic-claims design: premises in tier 0, every claim one tier
+beyond its deepest dependency. Tiers come from a linear-time topological
+sort; within tiers, alternating barycenter sweeps order claims to reduce
+edge crossings, keeping the best ordering seen; a claim then sits at the
+mean height of its dependencies, spread to a minimum spacing.
+
+A ``DagLayout`` keeps its state between updates. When claims change, only
+the changed claims and their descendants are re-tiered and re-ordered,
+and only the tiers they occupy are re-spaced; everything else keeps its
+place.
+
+    python design/dag.py claims.json -o layout.json
+    python design/dag.py --random 20000        # timing on a synthetic DAG
+"""
+
+import argparse
+import json
+import sys
+import time
+from collections import defaultdict, deque
+from pathlib import Path
+
+import numpy as np
+
+SWEEPS = 4          # down-and-up barycenter passes
+
+
+def inversions(values):
+    """Pairs out of order in ``values``, by a vectorized bottom-up merge sort"""
+    values = np.asarray(values)
+    n = len(values)
+    if n < 2:
+        return 0
+    ranks = np.unique(values, return_inverse=True)[1].ravel()
+    size = 1 << (n - 1).bit_length()
+    # Padding sorts last and is never greater than what follows it
+    arr = np.concatenate([ranks, np.full(size - n, n)])
+    total, width = 0, 1
+    while width < size:
+        blocks = arr.reshape(-1, 2, width)
+        left, right = blocks[:, 0], blocks[:, 1]
+        row = np.arange(len(blocks))[:, None] * (n + 1)
+        keys = (left + row).ravel()
+        below = np.searchsorted(keys, (right + row).ravel(), side='right')
+        total += int((width - (below - (row // (n + 1) * width).repeat(width, axis=1).ravel()))
+                     .sum())
+        arr = np.sort(blocks.reshape(-1, 2 * width), axis=1).ravel()
+        width *= 2
+    return total
+
+
+class DagLayout:
+    """Tiers, in-tier order and coordinates of a claims DAG.
+
+    ``dx`` is the spacing between tiers and ``dy`` the least spacing
+    within one. Dependencies on unknown claims are ignored; an update
+    that would make a cycle raises ValueError and leaves the layout as it
+    was.
+    """
+
+    def __init__(self, dx=1.0, dy=0.6, sweeps=SWEEPS):
+        self.dx, self.dy, self.sweeps = dx, dy, sweeps
+        self.parents = {}                   # id -> tuple of known dependency ids
+        self.declared = {}                  # id -> depends_on as given
+        self.children = defaultdict(set)
+        self.tier = {}
+        self.tiers = defaultdict(list)      # tier -> ids, top to bottom
+        self.y = {}
+
+    def __len__(self):
+        return len(self.parents)
+
+    @property
+    def positions(self):
+        """id -> (x, y), tier by tier from the top"""
+        return {c: (t * self.dx, self.y[c]) for t in sorted(self.tiers) for c in self.tiers[t]}
+
+    def update(self, claims):
+        """Bring the layout up to date with ``claims``; returns the ids re-laid out"""
+        declared = {c['id']: tuple(c.get('depends_on') or ()) for c in claims}
+        changed = {c for c in declared if self.declared.get(c) != declared[c]}
+        removed = set(self.declared) - set(declared)
+        # A claim appearing or vanishing changes which dependencies are known
+        come_and_gone = removed | (set(declared) - set(self.declared))
+        if come_and_gone:
+            changed |= {d for d, deps in declared.items() if not come_and_gone.isdisjoint(deps)}
+        changed -= removed
+        parents = {c: tuple(d for d in declared[c] if d in declared and d != c) for c in changed}
+        order = self._sort(parents, removed)
+        for c in removed:
+            self._detach(c)
+            t = self.tier.pop(c)
+            self.tiers[t].remove(c)
+            del self.y[c], self.declared[c]
+            self.children.pop(c, None)
+        for c in changed:
+            self._detach(c)
+            self.declared[c] = declared[c]
+            self.parents[c] = parents[c]
+            for d in parents[c]:
+                self.children[d].add(c)
+        affected = set(order)
+        if affected:
+            touched = self._retier(order)
+            self._order(affected, touched)
+            self._place(touched)
+        return affected
+
+    def _detach(self, c):
+        for d in self.parents.pop(c, ()):
+            self.children[d].discard(c)
+
+    def _sort(self, parents, removed):
+        """Claims downstream of the changes, in topological order.
+
+        ``parents`` are the changed claims' new dependencies and
+        ``removed`` the claims going away. Nothing is modified yet, so a
+        cycle raises ValueError with the layout as it was.
+        """
+        gained = defaultdict(set)
+        for c, deps in parents.items():
+            for d in deps:
+                gained[d].add(c)
+
+        def children(c):
+            kept = (k for k in self.children.get(c, ()) if k not in parents and k not in removed)
+            return [*kept, *gained.get(c, ())]
+
+        below, queue = set(parents), deque(parents)
+        while queue:
+            for child in children(queue.popleft()):
+                if child not in below:
+                    below.add(child)
+                    queue.append(child)
+        waiting = {c: sum(p in below for p in parents.get(c, self.parents.get(c, ())))
+                   for c in below}
+        order = [c for c, n in waiting.items() if n == 0]
+        for c in order:
+            for child in children(c):
+                waiting[child] -= 1
+                if waiting[child] == 0:
+                    order.append(child)
+        if len(order) < len(below):
+            stuck = sorted(c for c, n in waiting.items() if n)
+            raise ValueError(f"claims form a cycle through {', '.join(map(str, stuck[:8]))}")
+        return order
+
+    def _retier(self, order):
+        """Tiers for ``order``, topologically sorted, other tiers held fixed"""
+        touched = set()
+        for c in order:
+            if c in self.tier:
+                touched.add(self.tier[c])
+                self.tiers[self.tier[c]].remove(c)
+            self.tier[c] = max((self.tier[p] + 1 for p in self.parents[c]), default=0)
+            touched.add(self.tier[c])
+        return sorted(touched)
+
+    def _rank(self, t):
+        """Position of each id in tier ``t``, scaled into [0, 1]"""
+        ids = self.tiers[t]
+        scale = 1 / max(len(ids) - 1, 1)
+        return {c: i * scale for i, c in enumerate(ids)}
+
+    def _order(self, affected, touched):
+        """Barycenter sweeps over the touched tiers, keeping the fewest crossings"""
+        for c in sorted(affected, key=str):
+            self.tiers[self.tier[c]].append(c)
+        pos = {}
+        for t in self.tiers:
+            pos.update(self._rank(t))
+        best = (self._crossings(touched), {t: list(self.tiers[t]) for t in touched})
+        for sweep in range(2 * self.sweeps):
+            down = sweep % 2 == 0
+            before = [list(self.tiers[t]) for t in touched]
+            for t in (touched if down else reversed(touched)):
+                keys = {}
+                for c in self.tiers[t]:
+                    near = self.parents[c] if down else self.children.get(c, ())
+                    # Only new or moved claims move; the rest hold their order
+                    if c in affected and near:
+                        keys[c] = sum(pos[n] for n in near) / len(near)
+                    else:
+                        keys[c] = pos[c]
+                self.tiers[t].sort(key=keys.__getitem__)
+                pos.update(self._rank(t))
+            if sweep and before == [self.tiers[t] for t in touched]:
+                break
+            crossings = self._crossings(touched)
+            if crossings < best[0]:
+                best = (crossings, {t: list(self.tiers[t]) for t in touched})
+        for t, ids in best[1].items():
+            self.tiers[t] = ids
+        for t in [t for t in touched if not self.tiers[t]]:
+            del self.tiers[t]
+
+    def _crossings(self, touched):
+        """Crossings among edges between adjacent tiers, next to the touched ones"""
+        pairs = sorted({p for t in touched for p in (t - 1, t) if p >= 0})
+        return sum(self._tier_crossings(t) for t in pairs)
+
+    def _tier_crossings(self, t):
+        upper, lower = self.tiers.get(t, ()), self.tiers.get(t + 1, ())
+        if not upper or not lower:
+            return 0
+        at = {c: i for i, c in enumerate(lower)}
+        edges = [(i, at[child]) for i, c in enumerate(upper)
+                 for child in self.children.get(c, ()) if child in at]
+        if len(edges) < 2:
+            return 0
+        edges.sort()
+        return inversions([b for _, b in edges])
+
+    def _place(self, touched):
+        """Heights for the touched tiers, in tier order: parents' mean, spread apart"""
+        for t in touched:
+            ids = self.tiers.get(t)
+            if not ids:
+                continue
+            rank = np.arange(len(ids))
+            default = ((len(ids) - 1) / 2 - rank) * self.dy
+            want = np.array([np.mean([self.y[p] for p in self.parents[c]])
+                             if self.parents[c] else self.y.get(c, default[i])
+                             for i, c in enumerate(ids)])
+            # Top to bottom is decreasing y: push each below the one above
+            y = np.minimum.accumulate(want + rank * self.dy) - rank * self.dy
+            y += np.mean(want - y)
+            self.y.update(zip(ids, y.tolist()))
+
+    def crossings(self):
+        """Crossings among edges between adjacent tiers, over the whole layout"""
+        return sum(self._tier_crossings(t) for t in list(self.tiers))
+
+
+def layout(claims, dx=1.0, dy=0.6):
+    """id -> (x, y) for ``claims``, from scratch"""
+    dag = DagLayout(dx, dy)
+    dag.update(claims)
+    return dag.positions
+
+
+def random_claims(n, parents=2, span=30, seed=0):
+    """A synthetic DAG: each claim depends on up to ``parents`` of the ``span`` before it"""
+    rng = np.random.default_rng(seed)
+    claims = []
+    for i in range(n):
+        k = min(i, rng.integers(0, parents + 1))
+        deps = rng.choice(np.arange(max(0, i - span), i), size=k, replace=False) if k else []
+        claims.append({'id': f'c{i}', 'depends_on': [f'c{d}' for d in deps]})
+    return claims
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description='Lay out a claims DAG in tiers.')
+    parser.add_argument('claims', nargs='?', help='claims JSON (a list, or {"claims": [...]})')
+    parser.add_argument('-o', '--output', help='write {id: {tier, x, y}} here')
+    parser.add_argument('--dx', type=float, default=1.0)
+    parser.add_argument('--dy', type=float, default=0.6)
+    parser.add_argument('--random', type=int, metavar='N', help='time a synthetic DAG of N claims')
+    args = parser.parse_args(argv)
+
+    if args.random:
+        claims = random_claims(args.random)
+    elif args.claims:
+        data = json.loads(Path(args.claims).read_text())
+        claims = data['claims'] if isinstance(data, dict) else data
+    else:
+        parser.error('a claims file or --random is required')
+
+    dag = DagLayout(args.dx, args.dy)
+    start = time.perf_counter()
+    dag.update(claims)
+    built = time.perf_counter() - start
+    print(f"{len(dag)} claims in {len(dag.tiers)} tiers, {dag.crossings()} crossings, "
+          f"laid out in {built:.2f} s", file=sys.stderr)
+    if args.random:
+        # Re-point one claim midway to time an incremental relayout
+        edited = dict(claims[len(claims) // 2], depends_on=[])
+        start = time.perf_counter()
+        moved = dag.update(claims[:len(claims) // 2] + [edited] + claims[len(claims) // 2 + 1:])
+        print(f"one edit re-laid out {len(moved)} claims in "
+              f"{time.perf_counter() - start:.3f} s", file=sys.stderr)
+    if args.output:
+        out = {c: {'tier': dag.tier[c], 'x': x, 'y': y} for c, (x, y) in dag.positions.items()}
+        Path(args.output).write_text(json.dumps(out, indent=1) + '\n')
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,143 @@
+"""
+Observational Patience — Dendrites
+
+Branching trees grown breadth-first, one depth level at a time, as flat
+segment arrays. The whole arbor is then emitted as a single LineCollection
+with per-segment widths and alphas, so deep arbors and many cells cost one
+artist rather than one per branch and spine.
+"""
+
+from dataclasses import dataclass
+
+import numpy as np
+
+from scene import AxesSink, Lines, RasterSink
+from splines import smooth_curves
+
+
+@dataclass
+class Arbor:
+    """Dendritic tree as arrays: one row per branch, one row per spine"""
+    paths: np.ndarray     # (n, k, 2) smoothed branch polylines
+    widths: np.ndarray    # (n,) line widths
+    alphas: np.ndarray    # (n,)
+    depth: np.ndarray     # (n,) branching level, 0 at the roots
+    parent: np.ndarray    # (n,) index of the parent branch, -1 at the roots
+    spines: np.ndarray    # (m, 2, 2) spine segments
+    spine_depth: np.ndarray = None  # (m,) level of the branch each spine grows on
+    spine_width: float = 0.3
+    spine_alpha: float = 0.5
+
+    def __len__(self):
+        return len(self.paths) + len(self.spines)
+
+    @property
+    def tips(self):
+        """End points of the terminal branches, those with no children"""
+        terminal = np.ones(len(self.paths), dtype=bool)
+        terminal[self.parent[self.parent >= 0]] = False
+        return self.paths[terminal, -1]
+
+
+def grow_dendrite(start, angle, length, max_depth=4, base_width=1.2, seed=None,
+                  n_smooth=30, min_length=0.08, spread=0.7, taper=0.7, alpha=0.85,
+                  fade=1.0, spines=True):
+    """Grow one or more arbors level by level.
+
+    ``angle`` and ``length`` may be arrays, giving several roots from
+    ``start`` (or from an (r, 2) array of starts) grown together.
+    ``base_width`` may also vary per root. Widths shrink by ``taper`` and
+    alphas by ``fade`` at each level.
+    """
+    angles = np.atleast_1d(np.asarray(angle, dtype=float))
+    lengths = np.broadcast_to(np.asarray(length, dtype=float), angles.shape).copy()
+    starts = np.broadcast_to(np.asarray(start, dtype=float), angles.shape + (2,)).copy()
+    widths = np.broadcast_to(np.asarray(base_width, dtype=float), angles.shape).copy()
+    parents = np.full(angles.shape, -1)
+    if seed is None:
+        seed = int(abs(starts[0, 0] * 1000 + starts[0, 1] * 100))
+    rng = np.random.default_rng(seed)
+
+    paths, depths, links, line_widths, spine_segments, spine_depths = [], [], [], [], [], []
+    offset = 0
+    for depth in range(max_depth + 1):
+        keep = lengths >= min_length
+        starts, angles, lengths = starts[keep], angles[keep], lengths[keep]
+        widths, parents = widths[keep], parents[keep]
+        n = len(angles)
+        if n == 0:
+            break
+
+        # Curved path
+        curve = rng.uniform(-0.3, 0.3, n)
+        ends = starts + lengths[:, None] * np.column_stack([np.cos(angles), np.sin(angles)])
+        mids = starts + 0.5 * lengths[:, None] * np.column_stack(
+            [np.cos(angles + curve), np.sin(angles + curve)])
+        level = smooth_curves(np.stack([starts, mids, ends], axis=1), n_smooth)
+        paths.append(level)
+        depths.append(np.full(n, depth))
+        links.append(parents)
+        line_widths.append(widths * taper ** depth)
+
+        # Dendritic spines
+        if spines and depth > 1:
+            counts = np.where(rng.random(n) > 0.4, rng.integers(2, 4, n), 0)
+            owner = np.repeat(np.arange(n), counts)
+            idx = (rng.uniform(0.3, 0.7, len(owner)) * (n_smooth - 1)).astype(int)
+            base = level[owner, idx]
+            spine_angle = angles[owner] + rng.choice([-1, 1], len(owner)) * np.pi / 2
+            tips = base + 0.04 * np.column_stack([np.cos(spine_angle), np.sin(spine_angle)])
+            spine_segments.append(np.stack([base, tips], axis=1))
+            spine_depths.append(np.full(len(owner), depth))
+
+        # Branch
+        if depth == max_depth:
+            break
+        parent = np.repeat(np.arange(n), rng.integers(1, 3, n))
+        starts, widths = ends[parent], widths[parent]
+        angles = angles[parent] + rng.uniform(-spread, spread, len(parent))
+        lengths = lengths[parent] * rng.uniform(0.5, 0.75, len(parent))
+        parents = offset + parent
+        offset += n
+
+    depth = np.concatenate(depths) if depths else np.zeros(0, dtype=int)
+    return Arbor(
+        paths=np.concatenate(paths) if paths else np.zeros((0, n_smooth, 2)),
+        widths=np.concatenate(line_widths) if line_widths else np.zeros(0),
+        alphas=alpha * fade ** depth,
+        depth=depth,
+        parent=np.concatenate(links) if links else np.zeros(0, dtype=int),
+        spines=np.concatenate(spine_segments) if spine_segments else np.zeros((0, 2, 2)),
+        spine_depth=(np.concatenate(spine_depths) if spine_depths
+                     else np.zeros(0, dtype=int)),
+    )
+
+
+def arbor_lines(arbor, color, zorder=2):
+    """The arbor, branches and spines together, as one scene Lines batch"""
+    n_spines = len(arbor.spines)
+    return Lines(list(arbor.paths) + list(arbor.spines),
+                 np.concatenate([arbor.widths, np.full(n_spines, arbor.spine_width)]),
+                 color, np.concatenate([arbor.alphas, np.full(n_spines, arbor.spine_alpha)]),
+                 capstyle='round', zorder=zorder)
+
+
+def arbor_levels(arbor, color, zorder=2):
+    """The arbor one depth level at a time, each level's spines with it, as Lines"""
+    for depth in range(int(arbor.depth.max()) + 1 if len(arbor.depth) else 0):
+        rows = np.flatnonzero(arbor.depth == depth)
+        spines = arbor.spines[arbor.spine_depth == depth]
+        yield Lines(list(arbor.paths[rows]) + list(spines),
+                    np.concatenate([arbor.widths[rows], np.full(len(spines), arbor.spine_width)]),
+                    color,
+                    np.concatenate([arbor.alphas[rows], np.full(len(spines), arbor.spine_alpha)]),
+                    capstyle='round', zorder=zorder)
+
+
+def draw_arbor(ax, arbor, color, zorder=2, raster=None):
+    """Emit an arbor, branches and spines together, as one LineCollection.
+
+    With a RasterLayer, the arbor is stroked into it instead.
+    """
+    sink = RasterSink(raster) if raster is not None else AxesSink(ax)
+    return sink.draw(arbor_lines(arbor, color, zorder))
@@ -0,0 +1,214 @@
+#!/usr/bin/env python3
+"""
+Observational Patience — Claim glyphs
+
+One dendrite per epistemic claim, after epistemic-dendrites.md. The claim
+ID seeds the structure; dependencies set the number of primary branches,
+confidence the recursion depth and line weight, correctness the colour and
+spread, and evidence the stippling at the terminals.
+
+Glyphs are rendered in a process pool and cached by claim ID plus a hash
+of the claim's epistemic fields, so only changed claims are redrawn.
+
+    python design/glyphs.py claims.json -o design/glyphs
+"""
+
+import argparse
+import hashlib
+import json
+import os
+import re
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor
+from pathlib import Path
+
+import numpy as np
+
+from cache import code_digest
+from dendrite import draw_arbor, grow_dendrite
+from stipple import Stipple
+
+# Correctness runs rust -> amber -> green, as in the blended palette
+COLORS = {
+    'ink': '#2A2520',
+    'red': '#A87070',
+    'yellow': '#C4A86A',
+    'green': '#6B8B6B',
+}
+
+GLYPH_INCHES = 1.0
+GLYPH_DPI = 200
+EPISTEMIC_FIELDS = ('kind', 'solidity', 'confidence', 'correctness',
+                    'depends_on', 'evidence')
+
+
+def load_claims(path):
+    """Claims from a JSON file: a list, or an object with a 'claims' list"""
+    data = json.loads(Path(path).read_text())
+    return data['claims'] if isinstance(data, dict) else data
+
+
+def claim_seed(claim_id):
+    """Deterministic seed from a claim ID"""
+    return int.from_bytes(hashlib.sha256(claim_id.encode()).digest()[:8], 'big')
+
+
+def claim_hash(claim):
+    """Hash of the fields that shape a claim's glyph"""
+    fields = {k: claim.get(k) for k in EPISTEMIC_FIELDS}
+    blob = json.dumps(fields, sort_keys=True, ensure_ascii=False).encode()
+    return hashlib.sha256(blob).hexdigest()[:16]
+
+
+def _scale(claim, key):
+    """A legacy 1-5 score, falling back on solidity (0-1)"""
+    if claim.get(key) is not None:
+        return float(claim[key])
+    return 1 + 4 * float(claim.get('solidity', 0.5))
+
+
+def correctness_color(correctness):
+    """Interpolate red -> yellow -> green over the 1-5 scale"""
+    from matplotlib.colors import to_rgb
+    stops = np.array([to_rgb(COLORS[c]) for c in ('red', 'yellow', 'green')])
+    t = np.clip((correctness - 1) / 4, 0, 1) * 2
+    i = min(int(t), 1)
+    return tuple(stops[i] + (t - i) * (stops[i + 1] - stops[i]))
+
+
+def draw_glyph(ax, claim, stipple=None):
+    """Draw one claim's dendrite centred on the origin, within the unit disc"""
+    confidence = _scale(claim, 'confidence')
+    correctness = _scale(claim, 'correctness')
+    seed = claim_seed(claim['id'])
+    rng = np.random.default_rng(seed)
+
+    # Branching: 3 + 2 per dependency, spread around the origin
+    n = 3 + 2 * len(claim.get('depends_on') or [])
+    angles = (np.arange(n) + rng.uniform(-0.25, 0.25, n)) * 2 * np.pi / n
+    arbor = grow_dendrite(
+        (0, 0), angles, 0.36, seed=seed,
+        max_depth=2 + int(confidence // 2),
+        base_width=0.3 + 0.3 * confidence,
+        spread=0.3 + 0.1 * correctness,
+        taper=0.65, fade=0.8, alpha=0.9, min_length=0.02, spines=False,
+    )
+    draw_arbor(ax, arbor, correctness_color(correctness))
+
+    # Evidence stippling at the terminals
+    n_evidence = len(claim.get('evidence') or {})
+    if n_evidence:
+        tips = np.repeat(arbor.tips, 3 * n_evidence, axis=0)
+        r = 0.015 * n_evidence * np.sqrt(rng.uniform(0, 1, len(tips)))
+        theta = rng.uniform(0, 2 * np.pi, len(tips))
+        own = stipple is None
+        stipple = Stipple() if own else stipple
+        stipple.add(tips[:, 0] + r * np.cos(theta), tips[:, 1] + r * np.sin(theta),
+                    rng.uniform(0.2, 0.6, len(tips)), 0.6, COLORS['ink'])
+        if own:
+            stipple.draw(ax)
+    return arbor
+
+
+_canvas = None
+
+
+def _glyph_axes():
+    """A reusable transparent glyph figure, one per worker process"""
+    global _canvas
+    if _canvas is None:
+        import matplotlib
+        matplotlib.use('Agg')
+        import matplotlib.pyplot as plt
+        fig = plt.figure(figsize=(GLYPH_INCHES, GLYPH_INCHES))
+        _canvas = fig, fig.add_axes([0, 0, 1, 1])
+    fig, ax = _canvas
+    ax.cla()
+    ax.set_xlim(-1, 1)
+    ax.set_ylim(-1, 1)
+    ax.set_aspect('equal')
+    ax.axis('off')
+    return fig, ax
+
+
+def render_glyphs(jobs):
+    """Render (claim, path) pairs in this process; returns any failures"""
+    failed = []
+    for claim, path in jobs:
+        fig, ax = _glyph_axes()
+        try:
+            draw_glyph(ax, claim)
+            fig.savefig(path, dpi=GLYPH_DPI, transparent=True)
+        except Exception as err:
+            failed.append((claim['id'], repr(err)))
+    return failed
+
+
+def glyph_filename(claim_id):
+    """Filesystem-safe name; unsafe IDs get a short hash to stay unique"""
+    slug = re.sub(r'[^\w.-]', '_', claim_id)
+    if slug != claim_id:
+        slug += '-' + hashlib.sha256(claim_id.encode()).hexdigest()[:6]
+    return f'{slug}.png'
+
+
+def build_glyphs(claims, out_dir, jobs=None, force=False):
+    """Render every changed claim's glyph into ``out_dir``.
+
+    Returns the number of glyphs drawn. A manifest beside the glyphs
+    records each claim's hash; glyphs of claims no longer present are
+    removed.
+    """
+    out_dir = Path(out_dir)
+    out_dir.mkdir(parents=True, exist_ok=True)
+    manifest_path = out_dir / 'glyphs.json'
+    version = {'code': code_digest('glyphs'), 'inches': GLYPH_INCHES, 'dpi': GLYPH_DPI}
+    try:
+        manifest = json.loads(manifest_path.read_text())
+    except (FileNotFoundError, json.JSONDecodeError):
+        manifest = {}
+    if force or manifest.get('version') != version:
+        manifest = {'version': version, 'glyphs': {}}
+    known = manifest['glyphs']
+
+    wanted = {c['id']: {'hash': claim_hash(c), 'file': glyph_filename(c['id'])}
+              for c in claims}
+    stale = [c for c in claims
+             if known.get(c['id']) != wanted[c['id']]
+             or not (out_dir / wanted[c['id']]['file']).exists()]
+    for claim_id in set(known) - set(wanted):
+        (out_dir / known[claim_id]['file']).unlink(missing_ok=True)
+
+    failed = []
+    if stale:
+        work = [(c, out_dir / wanted[c['id']]['file']) for c in stale]
+        workers = min(jobs or os.cpu_count() or 1, len(work))
+        batches = [work[i::workers * 4] for i in range(workers * 4)]
+        with ProcessPoolExecutor(max_workers=workers) as pool:
+            for result in pool.map(render_glyphs, [b for b in batches if b]):
+                failed += result
+    bad = {claim_id for claim_id, _ in failed}
+    manifest['glyphs'] = {k: v for k, v in wanted.items() if k not in bad}
+    manifest_path.write_text(json.dumps(manifest, indent=1, sort_keys=True))
+    for claim_id, err in failed:
+        print(f"glyph {claim_id} failed: {err}", file=sys.stderr)
+    return len(stale) - len(failed)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description='Render claim glyphs.')
+    parser.add_argument('claims', help='claims JSON file')
+    parser.add_argument('-o', '--output', default=Path(__file__).parent / 'glyphs')
+    parser.add_argument('-j', '--jobs', type=int, help='worker processes (default: cores)')
+    parser.add_argument('--force', action='store_true', help='redraw every glyph')
+    args = parser.parse_args(argv)
+
+    start = time.perf_counter()
+    claims = load_claims(args.claims)
+    drawn = build_glyphs(claims, args.output, args.jobs, args.force)
+    print(f"{drawn} of {len(claims)} glyphs drawn in {time.perf_counter() - start:.2f} s")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,215 @@
+#!/usr/bin/env python3
+"""
+Observational Patience — Golden images
+
+Visual regression checks for the plates. Each plate is rendered, in a
+worker process, at a modest comparison dpi and compared with its stored
+golden image by multi-scale structural similarity: both images are
+reduced into a pyramid of 2 x 2 box averages, local means, variances and
+covariance come from integral images at every level, and the per-level
+similarities are combined with the usual MS-SSIM weights. A change of
+tone, a moved element or lost detail all register; antialiasing noise
+does not. Wherever similarity drops, the regions are reported and a
+heatmap over the golden image is written.
+
+Goldens are not tracked: text is rasterized with whatever fonts the
+machine has (EB Garamond, else a fallback serif), so renders from two
+machines differ even when the code does not. Store them with --update
+from a known-good checkout before changing anything, then check against
+them as you work; refresh them after an intended visual change.
+
+    python design/golden.py --update            # store the current renders
+    python design/golden.py                     # check every plate
+    python design/golden.py blended --dpi 150 --heatmaps diffs/
+"""
+
+import argparse
+import contextlib
+import importlib
+import io
+import os
+import sys
+import tempfile
+import time
+from concurrent.futures import ProcessPoolExecutor
+from pathlib import Path
+
+import numpy as np
+
+from build import discover_plates
+
+DESIGN_DIR = Path(__file__).parent
+GOLDEN_DIR = DESIGN_DIR / 'golden'
+HEATMAP_DIR = DESIGN_DIR / '.cache' / 'golden'
+DPI = 100
+WEIGHTS = (0.0448, 0.2856, 0.3001, 0.2363, 0.1333)   # finest scale first
+WINDOW = 7          # similarity window, in pixels of each level
+THRESHOLD = 0.999   # least MS-SSIM that passes
+REGION = 0.05       # local dissimilarity that marks a region as changed
+C1, C2 = 0.01 ** 2, 0.03 ** 2
+
+
+def golden_path(plate, dpi=DPI):
+    return GOLDEN_DIR / f'{plate}-{dpi}.png'
+
+
+def render(plate, path, dpi=DPI):
+    """Render ``plate`` to ``path`` in this process, quietly"""
+    import matplotlib
+    matplotlib.use('Agg')
+    if str(DESIGN_DIR) not in sys.path:
+        sys.path.insert(0, str(DESIGN_DIR))
+    module = importlib.import_module(f'create_{plate}')
+    with contextlib.redirect_stdout(io.StringIO()):
+        module.create_canvas(path, dpi=dpi)
+    return path
+
+
+def load(path):
+    """An image as (3, h, w) floats in [0, 1], one plane per channel"""
+    from PIL import Image
+    with Image.open(path) as image:
+        rgb = np.asarray(image.convert('RGB'))
+    return np.ascontiguousarray(rgb.transpose(2, 0, 1), dtype=np.float32) / 255
+
+
+def _reduce(a):
+    """Average 2 x 2 blocks, dropping an odd last row or column"""
+    h, w = a.shape[-2] // 2 * 2, a.shape[-1] // 2 * 2
+    a = a[..., :h, :w]
+    return (a[..., 0::2, 0::2] + a[..., 1::2, 0::2] + a[..., 0::2, 1::2]
+            + a[..., 1::2, 1::2]) / 4
+
+
+def _box(a, size=WINDOW):
+    """Mean over every size x size window of each plane ('valid' region), by integral image"""
+    s = np.zeros(a.shape[:-2] + (a.shape[-2] + 1, a.shape[-1] + 1))
+    np.cumsum(a, axis=-2, dtype=np.float64, out=s[..., 1:, 1:])
+    np.cumsum(s[..., 1:, 1:], axis=-1, out=s[..., 1:, 1:])
+    box = s[..., size:, size:] - s[..., :-size, size:] - s[..., size:, :-size]
+    box += s[..., :-size, :-size]
+    return (box / size ** 2).astype(np.float32)
+
+
+def _ssim(x, y):
+    """Luminance and contrast-structure maps, averaged over color channels"""
+    mx, my = _box(x), _box(y)
+    vx = _box(x * x) - mx * mx
+    vy = _box(y * y) - my * my
+    cov = _box(x * y) - mx * my
+    luminance = (2 * mx * my + C1) / (mx * mx + my * my + C1)
+    structure = (2 * cov + C2) / (vx + vy + C2)
+    return luminance.mean(axis=0), structure.mean(axis=0)
+
+
+def compare(a, b, weights=WEIGHTS):
+    """MS-SSIM of two images and a dissimilarity heatmap at ``a``'s size.
+
+    The heatmap takes, at each pixel, the worst weighted dissimilarity of
+    any level, each level's map spread back over the pixels it covers.
+    """
+    h, w = a.shape[-2:]
+    score, heat = 1.0, np.zeros((h, w), dtype=np.float32)
+    levels = len(weights)
+    for level, weight in enumerate(weights):
+        if min(a.shape[-2:]) < WINDOW:
+            break
+        luminance, structure = _ssim(a, b)
+        # Contrast-structure at every scale, luminance at the coarsest only
+        sim = structure * luminance if level == levels - 1 else structure
+        score *= max(float(sim.mean()), 1e-6) ** weight
+        loss = np.clip(1 - sim, 0, None) * weight / max(weights)
+        up = np.repeat(np.repeat(loss, 2 ** level, 0), 2 ** level, 1)
+        pad = (WINDOW // 2) * 2 ** level
+        region = heat[pad:pad + up.shape[0], pad:pad + up.shape[1]]
+        np.maximum(region, up[:region.shape[0], :region.shape[1]], out=region)
+        a, b = _reduce(a), _reduce(b)
+    return score, heat
+
+
+def regions(heat, threshold=REGION):
+    """Bounding boxes (x0, y0, x1, y1) of connected areas over ``threshold``, largest first"""
+    from scipy import ndimage
+    labels, n = ndimage.label(heat > threshold)
+    boxes = [(s[1].start, s[0].start, s[1].stop, s[0].stop)
+             for s in ndimage.find_objects(labels)]
+    return sorted(boxes, key=lambda b: (b[2] - b[0]) * (b[3] - b[1]), reverse=True)
+
+
+def save_heatmap(golden, heat, path, boxes=()):
+    """The golden image in grey, dissimilarity in red over it, regions outlined"""
+    from PIL import Image, ImageDraw
+    grey = golden.mean(axis=0)[..., None] * 0.6 + 0.4
+    strength = np.clip(heat / REGION, 0, 1)[..., None]
+    rgb = grey * (1 - strength) + np.array([0.85, 0.1, 0.1]) * strength
+    image = Image.fromarray((rgb * 255).astype(np.uint8))
+    draw = ImageDraw.Draw(image)
+    for x0, y0, x1, y1 in boxes[:50]:
+        draw.rectangle((x0 - 3, y0 - 3, x1 + 3, y1 + 3), outline=(200, 0, 0))
+    path.parent.mkdir(parents=True, exist_ok=True)
+    image.save(path)
+    return path
+
+
+def check(plate, rendered, dpi=DPI, heatmaps=HEATMAP_DIR, threshold=THRESHOLD):
+    """Compare a render with its golden; returns (passed, score, regions, message)"""
+    golden = golden_path(plate, dpi)
+    if not golden.exists():
+        return False, 0.0, [], 'no golden image; store one with --update'
+    a, b = load(golden), load(rendered)
+    if a.shape != b.shape:
+        return False, 0.0, [], f'size {b.shape[2]}x{b.shape[1]}, golden {a.shape[2]}x{a.shape[1]}'
+    score, heat = compare(a, b)
+    boxes = regions(heat)
+    passed = score >= threshold and not boxes
+    message = f'MS-SSIM {score:.5f}, {len(boxes)} changed region(s)'
+    if not passed and heatmaps:
+        message += f' -> {save_heatmap(a, heat, Path(heatmaps) / f"{plate}-{dpi}.png", boxes)}'
+    return passed, score, boxes, message
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(
+        description='Check plates against golden images.',
+        epilog='Goldens live in design/golden/ and are not tracked, since renders depend on '
+               'the installed fonts: store them with --update from a known-good checkout, '
+               'and again after an intended visual change.')
+    parser.add_argument('plates', nargs='*', help='plate names (default: all)')
+    parser.add_argument('--dpi', type=int, default=DPI)
+    parser.add_argument('--update', action='store_true', help='store renders as the goldens')
+    parser.add_argument('--threshold', type=float, default=THRESHOLD)
+    parser.add_argument('--heatmaps', default=HEATMAP_DIR, help='where to write heatmaps')
+    parser.add_argument('-j', '--jobs', type=int, help='worker processes (default: cores)')
+    args = parser.parse_args(argv)
+
+    plates = args.plates or discover_plates()
+    unknown = set(plates) - set(discover_plates())
+    if unknown:
+        parser.error(f"unknown plate(s): {', '.join(sorted(unknown))}")
+
+    start = time.perf_counter()
+    failed = []
+    with tempfile.TemporaryDirectory() as tmp:
+        if args.update:
+            GOLDEN_DIR.mkdir(exist_ok=True)
+        out = {p: golden_path(p, args.dpi) if args.update else Path(tmp) / f'{p}.png'
+               for p in plates}
+        jobs = min(args.jobs or os.cpu_count() or 1, len(plates))
+        with ProcessPoolExecutor(max_workers=jobs) as pool:
+            rendered = list(pool.map(render, plates, [out[p] for p in plates],
+                                     [args.dpi] * len(plates)))
+        for plate, path in zip(plates, rendered):
+            if args.update:
+                print(f"{plate:<12} golden stored: {path}")
+                continue
+            passed, _, _, message = check(plate, path, args.dpi, args.heatmaps, args.threshold)
+            print(f"{plate:<12} {'ok' if passed else 'CHANGED':<8} {message}")
+            if not passed:
+                failed.append(plate)
+    print(f"\n{len(plates) - len(failed)}/{len(plates)} plates match in "
+          f"{time.perf_counter() - start:.2f} s")
+    return 1 if failed else 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
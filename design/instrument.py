@@ -0,0 +1,293 @@
+#!/usr/bin/env python3
+"""
+Observational Patience — Instrumentation
+
+Opt-in accounting of where a plate's time goes. While a plate is built,
+every design-module function in its namespace (the ``draw_*`` primitives,
+``grow_dendrite``, ``Stipple`` methods and the like) and the Axes methods
+that create artists are wrapped to record wall time and the artists,
+vertices and stipple dots each call adds. During ``savefig`` every artist's
+draw is timed and charged back to the call that made it, so rasterization
+shows up per primitive, with text layout and encoding left as overhead.
+
+The report is an indented flame-style tree; ``--trace`` writes the same
+frames as JSON for ``--diff``, and ``--folded`` writes folded stacks for
+flamegraph tools.
+
+    python design/instrument.py laboratory --trace lab.json
+    python design/instrument.py --diff before.json after.json
+"""
+
+import argparse
+import functools
+import importlib
+import inspect
+import io
+import json
+import sys
+import time
+from collections import defaultdict
+from pathlib import Path
+
+import lod
+
+DESIGN_DIR = Path(__file__).parent
+AXES_METHODS = ('plot', 'scatter', 'fill', 'fill_between', 'fill_betweenx', 'text',
+                'annotate', 'imshow', 'add_patch', 'add_collection')
+BAR = 24
+
+
+def census(artists):
+    """(vertices, stipple dots) drawn by ``artists``"""
+    from matplotlib.collections import Collection
+    from matplotlib.lines import Line2D
+    vertices = dots = 0
+    for artist in artists:
+        if isinstance(artist, Line2D):
+            vertices += len(artist.get_xdata())
+        elif isinstance(artist, Collection):
+            offsets = artist.get_offsets()
+            if len(offsets) > 1 or not artist.get_paths():
+                dots += len(offsets)
+            else:
+                vertices += sum(len(p.vertices) for p in artist.get_paths())
+        elif hasattr(artist, 'get_path'):
+            vertices += len(artist.get_path().vertices)
+    return vertices, dots
+
+
+class Recorder:
+    """Call tree of wrapped functions, with the artists each call added"""
+
+    def __init__(self):
+        self.events = []
+        self.stack = []
+        self.render = defaultdict(float)    # id(artist) -> seconds in draw
+        self.owner = {}                     # id(artist) -> deepest event adding it
+        self.kinds = defaultdict(float)     # artist type -> seconds in draw
+
+    def wrap(self, name, fn):
+        from matplotlib.axes import Axes
+
+        @functools.wraps(fn)
+        def recorded(*args, **kwargs):
+            ax = next((a for a in args if isinstance(a, Axes)), None)
+            before = {id(a) for a in ax.get_children()} if ax is not None else None
+            event = {'id': len(self.events), 'name': name, 'depth': len(self.stack),
+                     'parent': self.stack[-1]['id'] if self.stack else None,
+                     'artists': []}
+            self.events.append(event)
+            self.stack.append(event)
+            start = time.perf_counter()
+            try:
+                return fn(*args, **kwargs)
+            finally:
+                event['wall_s'] = time.perf_counter() - start
+                self.stack.pop()
+                if ax is not None:
+                    event['artists'] = [a for a in ax.get_children() if id(a) not in before]
+                    for artist in event['artists']:
+                        self.owner.setdefault(id(artist), event)
+        return recorded
+
+    def time_draws(self, figure, artists):
+        """Time each artist's draw during the final render, by instance attribute.
+
+        A tight bounding box makes savefig draw ``figure`` twice; every
+        figure draw starts the timings over, so only the last one counts.
+        """
+        def draw_figure(renderer, _draw=figure.draw):
+            self.render.clear()
+            self.kinds.clear()
+            return _draw(renderer)
+        figure.draw = draw_figure
+        for artist in artists:
+            def draw(renderer, _draw=artist.draw, _artist=artist):
+                start = time.perf_counter()
+                try:
+                    return _draw(renderer)
+                finally:
+                    seconds = time.perf_counter() - start
+                    self.render[id(_artist)] += seconds
+                    self.kinds[type(_artist).__name__] += seconds
+            artist.draw = draw
+
+    def frames(self):
+        """Events aggregated by call stack, inclusive and self"""
+        paths, children = {}, defaultdict(float)
+        for event in self.events:
+            parent = self.events[event['parent']] if event['parent'] is not None else None
+            paths[event['id']] = (paths[parent['id']] + ';' if parent else '') + event['name']
+            if parent:
+                children[parent['id']] += event['wall_s']
+        frames = {}
+        for event in self.events:
+            frame = frames.setdefault(paths[event['id']], {
+                'stack': paths[event['id']], 'calls': 0, 'wall_s': 0.0, 'self_s': 0.0,
+                'render_s': 0.0, 'artists': 0, 'vertices': 0, 'dots': 0})
+            owned = [a for a in event['artists'] if self.owner.get(id(a)) is event]
+            vertices, dots = census(event['artists'])
+            frame['calls'] += 1
+            frame['wall_s'] += event['wall_s']
+            frame['self_s'] += event['wall_s'] - children[event['id']]
+            frame['render_s'] += sum(self.render[id(a)] for a in owned)
+            frame['artists'] += len(event['artists'])
+            frame['vertices'] += vertices
+            frame['dots'] += dots
+        return [frames[k] for k in sorted(frames, key=lambda k: k.split(';'))]
+
+
+def _instrumentable(module):
+    """Design-module functions and classes visible in ``module``"""
+    for name, obj in vars(module).items():
+        if not (inspect.isfunction(obj) or inspect.isclass(obj)):
+            continue
+        try:
+            source = Path(inspect.getsourcefile(obj)).resolve()
+        except TypeError:
+            continue
+        if source.parent == DESIGN_DIR.resolve() and not name.startswith('_'):
+            yield name, obj
+
+
+def instrument_plate(plate, dpi=None):
+    """Build and save a plate under a Recorder; returns the trace dict"""
+    import matplotlib
+    matplotlib.use('Agg')
+    import matplotlib.pyplot as plt
+    from matplotlib.axes import Axes
+    if str(DESIGN_DIR) not in sys.path:
+        sys.path.insert(0, str(DESIGN_DIR))
+    module = importlib.import_module(f'create_{plate}')
+    dpi = dpi or module.DPI
+    recorder = Recorder()
+    undo = []
+
+    def patch(owner, name, label):
+        original = inspect.getattr_static(owner, name)
+        setattr(owner, name, recorder.wrap(label, getattr(owner, name)))
+        undo.append((owner, name, original))
+
+    for name, obj in _instrumentable(module):
+        if inspect.isfunction(obj) and name != 'create_canvas':
+            patch(module, name, name)
+        elif inspect.isclass(obj):
+            for attr, value in vars(obj).items():
+                if inspect.isfunction(value) and not attr.startswith('_'):
+                    patch(obj, attr, f'{name}.{attr}')
+    for name in AXES_METHODS:
+        patch(Axes, name, f'ax.{name}')
+
+    try:
+        start = time.perf_counter()
+        with lod.output_dpi(dpi):
+            fig = module.create_figure()
+        built = time.perf_counter() - start
+        artists = [a for ax in fig.axes for a in ax.get_children()] + list(fig.texts)
+        recorder.time_draws(fig, artists)
+        start = time.perf_counter()
+        fig.savefig(io.BytesIO(), format='png', dpi=dpi, bbox_inches='tight',
+                    facecolor=fig.get_facecolor())
+        saved = time.perf_counter() - start
+        plt.close(fig)
+    finally:
+        for owner, name, original in reversed(undo):
+            setattr(owner, name, original)
+
+    drawn = sum(recorder.render.values())
+    return {
+        'plate': plate, 'dpi': dpi,
+        'phases': {'build_s': built, 'savefig_s': saved, 'artist_draw_s': drawn,
+                   'other_s': saved - drawn},
+        'draw_by_type': dict(sorted(recorder.kinds.items())),
+        'frames': recorder.frames(),
+    }
+
+
+def report(trace, out=sys.stdout):
+    """Flame-style tree: one line per call stack, indented by depth"""
+    phases = trace['phases']
+    print(f"{trace['plate']} @ {trace['dpi']} dpi: build {phases['build_s']:.3f} s, "
+          f"savefig {phases['savefig_s']:.3f} s (artist draws {phases['artist_draw_s']:.3f} s, "
+          f"background, tight bbox and encoding {phases['other_s']:.3f} s)", file=out)
+    kinds = ', '.join(f'{k} {v:.3f}' for k, v in
+                      sorted(trace['draw_by_type'].items(), key=lambda kv: -kv[1]))
+    print(f"draws by type: {kinds}\n", file=out)
+    total = phases['build_s'] + phases['savefig_s']
+    rendered = defaultdict(float)
+    for frame in trace['frames']:
+        parts = frame['stack'].split(';')
+        for i in range(len(parts)):
+            rendered[';'.join(parts[:i + 1])] += frame['render_s']
+    print(f"{'':<38}{'calls':>6}{'incl ms':>10}{'self ms':>10}{'draw ms':>10}"
+          f"{'artists':>9}{'vertices':>10}{'dots':>8}", file=out)
+    for frame in trace['frames']:
+        parts = frame['stack'].split(';')
+        label = '  ' * (len(parts) - 1) + parts[-1]
+        share = (frame['wall_s'] + rendered[frame['stack']]) / total if total else 0
+        print(f"{label[:37]:<38}{frame['calls']:>6}{frame['wall_s'] * 1e3:>10.1f}"
+              f"{frame['self_s'] * 1e3:>10.1f}{rendered[frame['stack']] * 1e3:>10.1f}"
+              f"{frame['artists']:>9}{frame['vertices']:>10}{frame['dots']:>8}  "
+              f"{'█' * round(share * BAR)}", file=out)
+
+
+def folded(trace):
+    """Folded stacks in microseconds: build self time, plus a [draw] leaf"""
+    lines = []
+    for frame in trace['frames']:
+        if frame['self_s'] > 0:
+            lines.append(f"{frame['stack']} {round(frame['self_s'] * 1e6)}")
+        if frame['render_s'] > 0:
+            lines.append(f"{frame['stack']};[draw] {round(frame['render_s'] * 1e6)}")
+    overhead = trace['phases']['other_s']
+    lines.append(f"savefig;[background+bbox+encode] {round(max(overhead, 0) * 1e6)}")
+    return '\n'.join(lines) + '\n'
+
+
+def diff(before, after, out=sys.stdout):
+    """Per-stack changes between two traces, largest time change first"""
+    old = {f['stack']: f for f in before['frames']}
+    new = {f['stack']: f for f in after['frames']}
+    empty = {'wall_s': 0.0, 'render_s': 0.0, 'artists': 0, 'vertices': 0, 'dots': 0, 'calls': 0}
+    rows = []
+    for stack in sorted(set(old) | set(new)):
+        a, b = old.get(stack, empty), new.get(stack, empty)
+        delta = (b['wall_s'] + b['render_s']) - (a['wall_s'] + a['render_s'])
+        rows.append((delta, stack, a, b))
+    for key in ('build_s', 'savefig_s', 'other_s'):
+        print(f"{key:<16} {before['phases'].get(key, 0):8.3f} -> "
+              f"{after['phases'].get(key, 0):8.3f} s",
+              file=out)
+    print(file=out)
+    for delta, stack, a, b in sorted(rows, key=lambda r: -abs(r[0])):
+        counts = ''.join(f"  {k} {a[k]}->{b[k]}" for k in ('calls', 'artists', 'vertices', 'dots')
+                         if a[k] != b[k])
+        print(f"{delta * 1e3:+9.1f} ms  {stack}{counts}", file=out)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description='Instrument a plate build.')
+    parser.add_argument('plate', nargs='?')
+    parser.add_argument('--dpi', type=int, help="render dpi (default: the plate's DPI)")
+    parser.add_argument('--trace', help='write the JSON trace here')
+    parser.add_argument('--folded', help='write folded stacks here')
+    parser.add_argument('--diff', nargs=2, metavar=('BEFORE', 'AFTER'),
+                        help='compare two JSON traces instead of rendering')
+    args = parser.parse_args(argv)
+
+    if args.diff:
+        before, after = (json.loads(Path(p).read_text()) for p in args.diff)
+        diff(before, after)
+        return
+    if not args.plate:
+        parser.error('a plate name is required unless --diff is given')
+    trace = instrument_plate(args.plate, args.dpi)
+    report(trace)
+    if args.trace:
+        Path(args.trace).write_text(json.dumps(trace, indent=1, sort_keys=True) + '\n')
+    if args.folded:
+        Path(args.folded).write_text(folded(trace))
+
+
+if __name__ == '__main__':
+    main()
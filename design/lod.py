@@ -0,0 +1,69 @@
+"""
+Observational Patience — Level of detail
+
+Curve sampling and stipple counts chosen from what each element spans on
+the final output. Plates keep the counts they were tuned with at the
+reference 300 dpi; inside ``output_dpi(dpi)`` a curve is sampled to about
+one vertex every few output pixels, within bounds scaled from that count,
+and stippling below the reference thins out with alpha raised to hold its
+tone. Thumbnails get cheaper, long curves on posters get smoother, and
+the reference render is unchanged.
+"""
+
+from contextlib import contextmanager
+
+import numpy as np
+
+REFERENCE_DPI = 300
+SEGMENT_PX = 4      # target curve segment length, in output pixels
+MIN_SAMPLES = 4
+
+_dpi = REFERENCE_DPI
+
+
+@contextmanager
+def output_dpi(dpi):
+    """Choose detail for output at ``dpi`` while building a figure"""
+    global _dpi
+    previous, _dpi = _dpi, dpi or REFERENCE_DPI
+    try:
+        yield
+    finally:
+        _dpi = previous
+
+
+def current_dpi():
+    return _dpi
+
+
+def pixels(length, inches=1.0):
+    """Output pixels spanned by ``length`` data units of ``inches`` each"""
+    return length * inches * _dpi
+
+
+def samples(base, length, inches=1.0):
+    """Vertices for a curve sampled with ``base`` points at the reference dpi.
+
+    The count follows the curve's pixel length, but never drops below
+    ``base`` (scaled down, for small output) nor exceeds it (scaled up,
+    for large output), so at the reference dpi it is exactly ``base``.
+    """
+    scale = _dpi / REFERENCE_DPI
+    lo = min(base, max(MIN_SAMPLES, round(base * scale)))
+    hi = max(base, round(base * scale))
+    return int(np.clip(np.ceil(pixels(length, inches) / SEGMENT_PX), lo, hi))
+
+
+def stipple(n, alpha):
+    """How many of ``n`` dots to draw, and the alpha that keeps their tone.
+
+    Dots are sized in points, so above the reference they need no more;
+    below it the same dots cover fewer pixels, and a thinner stippling at
+    higher alpha lays down the same ink. Callers draw the first ``count``
+    of their dots so the random stream, and the dots kept, do not change.
+    """
+    scale = min(1.0, _dpi / REFERENCE_DPI)
+    if n == 0 or scale == 1:
+        return n, alpha
+    count = min(n, max(1, int(np.ceil(n * scale ** 2)), int(np.ceil(n * alpha))))
+    return count, alpha * n / count
@@ -0,0 +1,119 @@
+"""
+Observational Patience — Gradient noise
+
+Two-dimensional gradient (Perlin) noise for organic outlines, after the
+tree-ring nodes of epistemic-dendrites.md. Permutation and gradient
+tables are built once per table seed; noise is then sampled for whole
+arrays of points at a time. A node's rings are ellipses displaced
+radially by the noise at each point of their circumference, every ring
+reading its own region of the field, and outlines are kept in an LRU
+cache keyed by seed, ring scale and resolution, so a DAG that repeats its
+claims, or a plate rendered again, reuses them.
+"""
+
+from collections import OrderedDict
+from functools import lru_cache
+
+import numpy as np
+
+PERIOD = 256            # lattice cells before the field repeats
+RING_SCALES = (1.0, 1.15, 1.3, 1.45)
+RESOLUTION = 0.08       # noise cells per reference pixel of outline
+AMPLITUDE = 0.07        # largest radial displacement, as a fraction
+POINTS = 64             # vertices per outline
+NODE_PX = 52            # node half-width, in pixels, the spec was tuned at
+SHAPES = 4096           # outlines kept in the cache
+
+_shapes = OrderedDict()
+
+
+@lru_cache(maxsize=8)
+def tables(seed=0):
+    """Doubled permutation table, and unit gradients by hashed lattice corner.
+
+    The gradients come already looked up through the permutation, so a
+    corner's hash indexes them directly.
+    """
+    rng = np.random.default_rng(seed)
+    perm = np.tile(rng.permutation(PERIOD), 2)
+    angles = rng.uniform(0, 2 * np.pi, PERIOD)[perm]
+    gx, gy = np.cos(angles), np.sin(angles)
+    for table in (perm, gx, gy):
+        table.flags.writeable = False
+    return perm, gx, gy
+
+
+def _fade(t):
+    return t * t * t * (t * (t * 6 - 15) + 10)
+
+
+def noise2d(x, y, seed=0):
+    """Gradient noise at points ``x``, ``y`` (arrays of one shape), in about [-1, 1]"""
+    perm, gx, gy = tables(seed)
+    x, y = np.asarray(x, dtype=float), np.asarray(y, dtype=float)
+    x0, y0 = np.floor(x), np.floor(y)
+    fx, fy = x - x0, y - y0
+    xi, yi = x0.astype(np.int64) & (PERIOD - 1), y0.astype(np.int64) & (PERIOD - 1)
+
+    left, right = perm[xi] + yi, perm[xi + 1] + yi
+
+    def corner(column, dx, dy):
+        h = column + dy
+        return gx[h] * (fx - dx) + gy[h] * (fy - dy)
+
+    u, v = _fade(fx), _fade(fy)
+    a = corner(left, 0, 0)
+    bottom = a + u * (corner(right, 1, 0) - a)
+    b = corner(left, 0, 1)
+    top = b + u * (corner(right, 1, 1) - b)
+    # Unit gradients reach at most sqrt(1/2) in two dimensions
+    return (bottom + v * (top - bottom)) * np.sqrt(2)
+
+
+def _offsets(seeds, scales):
+    """Where in the field each (seed, ring scale) reads, hashed apart"""
+    h = (np.asarray(seeds, dtype=np.uint64) * np.uint64(0x9E3779B97F4A7C15)
+         + np.round(np.asarray(scales) * 1000).astype(np.uint64) * np.uint64(0xBF58476D1CE4E5B9))
+    h ^= h >> np.uint64(31)
+    lo = (h & np.uint64(0xFFFF)).astype(float)
+    hi = ((h >> np.uint64(16)) & np.uint64(0xFFFF)).astype(float)
+    return np.column_stack([lo, hi]) / 0x10000 * PERIOD
+
+
+def outlines(seeds, scales, aspect=1.0, resolution=RESOLUTION, amplitude=AMPLITUDE,
+             points=POINTS, field=0):
+    """Noise-displaced ellipses, one per (seed, scale) pair, as (n, points, 2).
+
+    Outlines are for a node of unit half-width and ``aspect`` height to
+    width; scale and translate them into place. Only pairs not already
+    in the cache are computed, all in one noise pass.
+    """
+    seeds = np.asarray(seeds, dtype=np.uint64).ravel()
+    scales = np.broadcast_to(np.asarray(scales, dtype=float), seeds.shape)
+    keys = [(int(s), float(k), resolution, aspect, amplitude, points, field)
+            for s, k in zip(seeds, scales)]
+    missing = list(dict.fromkeys(k for k in keys if k not in _shapes))
+    if missing:
+        theta = np.linspace(0, 2 * np.pi, points, endpoint=False)
+        unit = np.column_stack([np.cos(theta), aspect * np.sin(theta)])
+        ring = np.array([k[1] for k in missing])[:, None, None] * unit
+        at = ring * resolution * NODE_PX + _offsets([k[0] for k in missing],
+                                                    [k[1] for k in missing])[:, None]
+        shapes = ring * (1 + amplitude * noise2d(at[..., 0], at[..., 1], field))[..., None]
+        for key, shape in zip(missing, shapes):
+            shape.flags.writeable = False
+            _shapes[key] = shape
+    for key in keys:
+        _shapes.move_to_end(key)
+    out = np.stack([_shapes[key] for key in keys]) if keys else np.empty((0, points, 2))
+    while len(_shapes) > SHAPES:
+        _shapes.popitem(last=False)
+    return out
+
+
+def rings(seeds, scales=RING_SCALES, **shape):
+    """Every ring of every node: (nodes, rings, points, 2), for ``outlines``"""
+    seeds = np.asarray(seeds, dtype=np.uint64).ravel()
+    n, k = len(seeds), len(scales)
+    flat = outlines(np.repeat(seeds, k), np.tile(scales, n), **shape)
+    return flat.reshape(n, k, *flat.shape[1:])
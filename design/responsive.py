@@ -0,0 +1,145 @@
+#!/usr/bin/env python3
+"""
+Observational Patience — Responsive images
+
+Derives every size and format the site needs from a single render. The
+plate is rasterized once at full resolution (or restored from the render
+cache), downsampled into a width pyramid, and each level is encoded as
+AVIF, WebP and PNG concurrently; Pillow releases the GIL while encoding,
+so a thread pool keeps every core busy. A ``srcset.json`` manifest lists
+the variants per plate for the Astro pages.
+
+    python design/responsive.py laboratory illuminated
+"""
+
+import argparse
+import json
+import os
+import sys
+import time
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+
+from PIL import Image, features
+
+from cache import cached_render, plate_output
+
+DESIGN_DIR = Path(__file__).parent
+OUT_DIR = DESIGN_DIR.parent / 'public' / 'plates'
+WIDTHS = (2400, 1600, 800, 400)
+FORMATS = ('avif', 'webp', 'png')
+ENCODE = {
+    'avif': dict(quality=60, speed=6),
+    'webp': dict(quality=85, method=4),
+    'png': dict(compress_level=9),
+}
+MIME = {'avif': 'image/avif', 'webp': 'image/webp', 'png': 'image/png'}
+
+
+def available_formats(formats=FORMATS):
+    """Formats this Pillow build can encode; AVIF needs Pillow 11.2+"""
+    return [f for f in formats if f == 'png' or features.check(f)]
+
+
+def warn_unsupported(formats=FORMATS):
+    """Say on stderr which of ``formats`` will be skipped"""
+    missing = [f for f in formats if f not in available_formats(formats)]
+    if missing:
+        print(f"Skipping {', '.join(sorted(missing))}: not supported by this Pillow",
+              file=sys.stderr)
+
+
+def pyramid(master, widths=WIDTHS):
+    """Downsampled copies of ``master`` at each width it can supply.
+
+    A master narrower than every width is its own single level.
+    """
+    levels = {}
+    for width in sorted(widths, reverse=True):
+        if width > master.width:
+            continue
+        height = round(master.height * width / master.width)
+        levels[width] = master.resize((width, height), Image.LANCZOS, reducing_gap=3.0)
+    return levels or {master.width: master}
+
+
+def _encode(image, path, fmt):
+    image.save(path, format=fmt.upper(), **ENCODE[fmt])
+    return path, path.stat().st_size
+
+
+def derive(plate, master_path, out_dir=OUT_DIR, widths=WIDTHS, formats=FORMATS,
+           jobs=None, base='/plates/'):
+    """Write the plate's size/format variants; returns its srcset entry"""
+    out_dir = Path(out_dir)
+    out_dir.mkdir(parents=True, exist_ok=True)
+    master = Image.open(master_path)
+    master = master.convert('RGBA' if 'A' in master.getbands() else 'RGB')
+    levels = pyramid(master, widths)
+    formats = available_formats(formats)
+
+    tasks = [(levels[w], out_dir / f'{plate}-{w}.{fmt}', fmt) for fmt in formats for w in levels]
+    with ThreadPoolExecutor(max_workers=jobs or os.cpu_count() or 1) as pool:
+        sizes = dict(pool.map(lambda task: _encode(*task), tasks))
+
+    def srcset(fmt):
+        return ', '.join(f'{base}{plate}-{w}.{fmt} {w}w' for w in sorted(levels))
+
+    largest = max(levels)
+    return {
+        'width': master.width, 'height': master.height,
+        'sources': [{'type': MIME[f], 'srcset': srcset(f)} for f in formats if f != 'png'],
+        'fallback': {'src': f'{base}{plate}-{largest}.png', 'srcset': srcset('png')},
+        'bytes': {p.name: n for p, n in sorted(sizes.items())},
+    }
+
+
+def write_manifest(entries, out_dir=OUT_DIR):
+    """Merge plate entries into ``srcset.json``"""
+    path = Path(out_dir) / 'srcset.json'
+    try:
+        manifest = json.loads(path.read_text())
+    except (FileNotFoundError, json.JSONDecodeError):
+        manifest = {}
+    manifest.update(entries)
+    path.write_text(json.dumps(dict(sorted(manifest.items())), indent=2) + '\n')
+    return path
+
+
+def render_master(plate, force=False):
+    """The plate's full-resolution PNG, rendered only if the cache misses"""
+    import importlib
+    import matplotlib
+    matplotlib.use('Agg')
+    if str(DESIGN_DIR) not in sys.path:
+        sys.path.insert(0, str(DESIGN_DIR))
+    module = importlib.import_module(f'create_{plate}')
+    cached_render(plate, module.create_canvas, force=force)
+    return plate_output(plate)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description='Derive responsive plate images.')
+    parser.add_argument('plates', nargs='+')
+    parser.add_argument('-o', '--output', default=OUT_DIR, help='variant directory')
+    parser.add_argument('--widths', type=int, nargs='+', default=WIDTHS)
+    parser.add_argument('--formats', nargs='+', default=FORMATS, choices=FORMATS)
+    parser.add_argument('--base', default='/plates/', help='URL prefix in srcset')
+    parser.add_argument('--force', action='store_true', help='re-render the masters')
+    args = parser.parse_args(argv)
+
+    warn_unsupported(args.formats)
+    entries = {}
+    for plate in args.plates:
+        start = time.perf_counter()
+        master = render_master(plate, args.force)
+        entries[plate] = derive(plate, master, args.output, args.widths, args.formats,
+                                base=args.base)
+        total = sum(entries[plate]['bytes'].values())
+        print(f"{plate}: {len(entries[plate]['bytes'])} variants, {total / 1024:.0f} KB "
+              f"in {time.perf_counter() - start:.2f} s")
+    write_manifest(entries, args.output)
+
+
+if __name__ == '__main__':
+    main()
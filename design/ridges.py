@@ -0,0 +1,159 @@
+#!/usr/bin/env python3
+"""
+Observational Patience — Ridge backgrounds
+
+The parallax ridges behind the site, synthesized rather than drawn. Each
+ridge follows the slope of the hand-drawn originals, down toward a valley
+left of centre and up again, roughened by fractal gradient noise: every
+ridge and octave is sampled in one vectorized pass, each ridge reading
+its own row of the field. Profiles are simplified to a pixel tolerance
+and written as relative path data, so a background of any aspect comes
+out in a few kilobytes, in milliseconds.
+
+    python design/ridges.py -o public/ridge-bg.svg
+    python design/ridges.py --palette color --size 2560 1080 --seed 7 -o wide.svg
+"""
+
+import argparse
+import sys
+import time
+from pathlib import Path
+
+import numpy as np
+
+from noise import noise2d
+from svg import compact_path
+
+SIZE = (1600, 900)
+BLEED = 50          # ridges overrun the canvas by this much, in pixels
+TOLERANCE = 1.0     # simplification tolerance, in pixels
+SPACING = 2         # pixels between samples along a ridge, well under the finest octave
+OCTAVES = 5
+
+# Back to front: (x, y) control points as fractions of the canvas, the
+# noise frequency (cycles across the width) and amplitude (of the height)
+RIDGES = [
+    {'profile': ((0, 0.311), (0.438, 0.367), (0.531, 0.361), (1, 0.322)),
+     'frequency': 2.5, 'amplitude': 0.018},
+    {'profile': ((0, 0.389), (0.375, 0.467), (0.512, 0.456), (1, 0.411)),
+     'frequency': 3.0, 'amplitude': 0.022},
+    {'profile': ((0, 0.478), (0.312, 0.578), (0.488, 0.561), (1, 0.511)),
+     'frequency': 3.5, 'amplitude': 0.026},
+    {'profile': ((0, 0.578), (0.281, 0.700), (0.469, 0.678), (1, 0.622)),
+     'frequency': 4.0, 'amplitude': 0.030},
+    {'profile': ((0, 0.689), (0.250, 0.844), (0.450, 0.817), (1, 0.756)),
+     'frequency': 4.5, 'amplitude': 0.034},
+]
+
+# Sky stops, then each ridge's (offset, color, opacity) stops, and the
+# paper grain's overlay opacity and per-dot opacity lift
+PALETTES = {
+    'muted': {
+        'sky': ((0, '#D8CCC0'), (25, '#D0C4B8'), (50, '#C8B8A8'), (75, '#C0B0A0'),
+                (100, '#B8A898')),
+        'ridges': (((0, '#8090A0', 0.18), (100, '#909898', 0.14)),
+                   ((0, '#8A7A9A', 0.22), (100, '#988890', 0.17)),
+                   ((0, '#607878', 0.26), (100, '#788080', 0.20)),
+                   ((0, '#7A6858', 0.30), (100, '#887868', 0.24)),
+                   ((0, '#6A5048', 0.35), (100, '#786058', 0.28))),
+        'grain': (0.1, 0.0),
+    },
+    'color': {
+        'sky': ((0, '#DED0C4'), (20, '#D4C4B4'), (45, '#C8B8A8'), (70, '#BCA898'),
+                (100, '#A89080')),
+        'ridges': (((0, '#A090A8', 0.30), (60, '#B0A0A8', 0.18), (100, '#C0B0B0', 0.06)),
+                   ((0, '#8878A0', 0.35), (60, '#988898', 0.22), (100, '#A898A0', 0.10)),
+                   ((0, '#706888', 0.42), (60, '#807880', 0.28), (100, '#908888', 0.14)),
+                   ((0, '#5A5878', 0.48), (60, '#686870', 0.32), (100, '#787878', 0.18)),
+                   ((0, '#4A4868', 0.52), (60, '#585860', 0.35), (100, '#686868', 0.20))),
+        'grain': (0.5, 0.02),
+    },
+}
+GRAIN = ((20, 30, 0.4, '#8A7A6A', 0.08), (60, 15, 0.3, '#7A6A5A', 0.06),
+         (85, 50, 0.35, '#9A8A7A', 0.07), (35, 70, 0.3, '#6A5A4A', 0.05),
+         (75, 85, 0.4, '#8A8075', 0.09))
+
+
+def fbm(x, rows, octaves=OCTAVES, gain=0.5):
+    """Fractal noise at ``x`` (ridges, samples), each ridge on its own row of the field"""
+    octave = np.arange(octaves)[:, None, None]
+    x = x[None] * 2.0 ** octave
+    # Octaves read rows apart too, so they do not share lattice corners
+    y = np.broadcast_to(np.asarray(rows, dtype=float)[None, :, None] + 17.0 * octave, x.shape)
+    weights = gain ** np.arange(octaves)
+    return np.tensordot(weights / weights.sum(), noise2d(x, y), axes=1)
+
+
+def profiles(width, height, seed=0, ridges=RIDGES, seeds=None):
+    """(ridges, samples, 2) pixel outlines of the ridge tops, ``SPACING`` apart.
+
+    ``seeds`` gives each ridge its own; by default they follow from ``seed``.
+    """
+    if seeds is None:
+        seeds = [seed * len(ridges) + i for i in range(len(ridges))]
+    x = np.append(np.arange(-BLEED, width + BLEED, SPACING, dtype=float), width + BLEED)
+    u = x / width
+    freq = np.array([r['frequency'] for r in ridges])[:, None]
+    amp = np.array([r['amplitude'] for r in ridges])[:, None]
+    base = np.stack([np.interp(u, *np.array(r['profile']).T) for r in ridges])
+    y = (base + amp * fbm(u * freq, np.asarray(seeds) * 7.31 + 0.5)) * height
+    return np.stack([np.broadcast_to(x, y.shape), y], axis=-1)
+
+
+def _stops(stops):
+    return ''.join(f"<stop offset='{o}%' stop-color='{c}'"
+                   + (f" stop-opacity='{a:.2f}'" if a is not None else '') + '/>'
+                   for o, c, *rest in stops for a in [rest[0] if rest else None])
+
+
+def ridge_svg(width=SIZE[0], height=SIZE[1], palette='muted', seed=0, seeds=None,
+              tolerance=TOLERANCE):
+    """The background as SVG text"""
+    colors = PALETTES[palette]
+    ridges = profiles(width, height, seed, seeds=seeds)
+    bottom = height + BLEED
+    grain, lift = colors['grain']
+    gradient = "<linearGradient id='{}' x2='0' y2='1'>{}</linearGradient>"
+    defs = [gradient.format('s', _stops(colors['sky']))]
+    defs += [gradient.format(f'r{i}', _stops(stops)) for i, stops in enumerate(colors['ridges'])]
+    dots = ''.join(f"<circle cx='{x}' cy='{y}' r='{r}' fill='{c}' opacity='{a + lift:.2f}'/>"
+                   for x, y, r, c, a in GRAIN)
+    defs.append(f"<pattern id='g' width='100' height='100' patternUnits='userSpaceOnUse'>"
+                f"{dots}</pattern>")
+    paths = []
+    for i, ridge in enumerate(ridges):
+        outline = np.vstack([ridge, [[ridge[-1, 0], bottom], [ridge[0, 0], bottom]]])
+        d = 'M' + ' L'.join(f'{x:.2f} {y:.2f}' for x, y in outline) + ' Z'
+        paths.append(f"<path fill='url(#r{i})' d='{compact_path(d, tolerance, 0)}'/>")
+    return (f"<svg xmlns='http://www.w3.org/2000/svg' width='{width}' height='{height}' "
+            f"viewBox='0 0 {width} {height}'><defs>{''.join(defs)}</defs>"
+            f"<rect fill='url(#s)' width='{width}' height='{height}'/>{''.join(paths)}"
+            f"<rect fill='url(#g)' width='{width}' height='{height}' opacity='{grain}'/>"
+            f"</svg>\n")
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description='Generate a parallax ridge background.')
+    parser.add_argument('-o', '--output', help='SVG file (default: stdout)')
+    parser.add_argument('--size', type=int, nargs=2, default=SIZE, metavar=('W', 'H'))
+    parser.add_argument('--palette', choices=sorted(PALETTES), default='muted')
+    parser.add_argument('--seed', type=int, default=0)
+    parser.add_argument('--seeds', type=int, nargs=len(RIDGES), metavar='S',
+                        help='one seed per ridge, back to front')
+    parser.add_argument('--tolerance', type=float, default=TOLERANCE,
+                        help='simplification tolerance, in pixels')
+    args = parser.parse_args(argv)
+
+    start = time.perf_counter()
+    svg = ridge_svg(*args.size, args.palette, args.seed, args.seeds, args.tolerance)
+    elapsed = time.perf_counter() - start
+    if args.output:
+        Path(args.output).write_text(svg)
+        print(f"{args.output}: {len(svg.encode()) / 1024:.1f} KB in {elapsed * 1000:.0f} ms",
+              file=sys.stderr)
+    else:
+        sys.stdout.write(svg)
+
+
+if __name__ == '__main__':
+    main()
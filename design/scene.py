@@ -0,0 +1,257 @@
+"""
+Observational Patience — Scene streams
+
+Geometry as data, apart from drawing. Primitives written as generators
+yield ``Lines``, ``Dots``, ``Polygons`` and ``Text`` batches — arrays plus
+one style — and a sink consumes them in bounded chunks: matplotlib axes,
+or a RasterLayer. Nothing upstream of a sink holds more than a batch, so
+the raster sink keeps memory flat however large the scene.
+
+Not every primitive is written this way. The laboratory plate's
+dendrites, filaments, clusters, catalog stippling and cosmic web are,
+and so are the blended plate's status panel, DAG edges and tree-ring
+nodes. The illuminated plate and the rest of the blended one still draw
+on the axes directly. SVG is exported from the finished figure by
+svg.py, so there is no SVG sink.
+"""
+
+from dataclasses import dataclass, field, fields, replace
+
+import matplotlib as mpl
+import numpy as np
+from matplotlib.collections import LineCollection, PolyCollection
+from matplotlib.colors import to_rgba_array
+
+from stipple import Stipple
+
+CHUNK = 50_000      # elements per chunk handed to a sink
+
+
+def _per_item(value, n):
+    if isinstance(value, list):
+        return len(value) == n
+    return np.ndim(value) > 0 and len(value) == n
+
+
+def _rgba(color, n):
+    """(n, 4) colors from one color or one per element"""
+    rgba = to_rgba_array(color)
+    return np.tile(rgba, (n, 1)) if len(rgba) == 1 else rgba
+
+
+@dataclass
+class Lines:
+    """Polylines: an (n, k, 2) array or a list of (k, 2) arrays.
+
+    ``widths`` (points), ``alpha`` and ``color`` are one value or one per
+    path; a ``joinstyle`` of None keeps matplotlib's default.
+    """
+    paths: object
+    widths: object = 1.0
+    color: object = 'k'
+    alpha: object = 1.0
+    capstyle: str = 'round'
+    joinstyle: str = None
+    zorder: float = 2
+
+    def __len__(self):
+        return len(self.paths)
+
+
+@dataclass
+class Dots:
+    """Stipple dots; ``sizes`` are marker sizes in points, as for Stipple"""
+    x: np.ndarray
+    y: np.ndarray
+    sizes: object = 1.0
+    color: object = 'k'
+    alpha: object = 1.0
+    zorder: float = 2
+
+    def __len__(self):
+        return len(self.x)
+
+
+@dataclass
+class Polygons:
+    """Filled outlines, a list of (k, 2) arrays; ``facecolor`` is one or one per outline.
+
+    An ``alpha`` of None keeps each facecolor's own.
+    """
+    verts: list
+    facecolor: object = 'k'
+    edgecolor: object = 'none'
+    linewidth: float = 0.0
+    alpha: float = 1.0
+    zorder: float = 1
+
+    def __len__(self):
+        return len(self.verts)
+
+
+@dataclass
+class Text:
+    """A single label; ``props`` are ``ax.text`` keyword arguments"""
+    x: float
+    y: float
+    s: str
+    props: dict = field(default_factory=dict)
+
+    def __len__(self):
+        return 1
+
+
+def chunks(batch, size=CHUNK):
+    """Split a batch into batches of at most ``size`` elements"""
+    n = len(batch)
+    if n <= size:
+        yield batch
+        return
+    for lo in range(0, n, size):
+        yield replace(batch, **{f.name: getattr(batch, f.name)[lo:lo + size]
+                                for f in fields(batch)
+                                if _per_item(getattr(batch, f.name), n)})
+
+
+_STYLE = {
+    Lines: ('color', 'capstyle', 'joinstyle', 'zorder'),
+    Dots: ('color', 'zorder'),
+    Polygons: ('facecolor', 'edgecolor', 'linewidth', 'alpha', 'zorder'),
+}
+
+
+def _style(batch):
+    key = [type(batch)]
+    for name in _STYLE[type(batch)]:
+        value = getattr(batch, name)
+        if 'color' in name and not (isinstance(value, str) and value == 'none'):
+            rgba = to_rgba_array(value)
+            # A batch colored element by element keeps to itself
+            value = tuple(rgba[0]) if len(rgba) == 1 else id(batch)
+        key.append(value)
+    return tuple(key)
+
+
+def merge(stream):
+    """Join batches of one kind and style, in order of first appearance.
+
+    Many small filaments become one collection. Text passes through as it
+    is. Unlike ``render``, this holds the whole stream until it ends.
+    """
+    groups = {}
+    for batch in stream:
+        key = id(batch) if isinstance(batch, Text) else _style(batch)
+        groups.setdefault(key, []).append(batch)
+    for group in groups.values():
+        first = group[0]
+        if len(group) == 1:
+            yield first
+        elif isinstance(first, Lines):
+            yield replace(first, paths=[p for b in group for p in b.paths],
+                          widths=_joined(group, 'widths'), alpha=_joined(group, 'alpha'))
+        elif isinstance(first, Dots):
+            yield replace(first, x=np.concatenate([b.x for b in group]),
+                          y=np.concatenate([b.y for b in group]),
+                          sizes=_joined(group, 'sizes'), alpha=_joined(group, 'alpha'))
+        else:
+            yield replace(first, verts=[v for b in group for v in b.verts])
+
+
+def _joined(group, name):
+    return np.concatenate([np.broadcast_to(np.asarray(getattr(b, name), dtype=float), (len(b),))
+                           for b in group])
+
+
+def render(stream, sink, size=CHUNK):
+    """Feed every batch of ``stream`` to ``sink`` in chunks; returns elements drawn"""
+    drawn = 0
+    for batch in stream:
+        for piece in chunks(batch, size):
+            sink.draw(piece)
+            drawn += len(piece)
+    return drawn
+
+
+class AxesSink:
+    """Batches become matplotlib artists on ``ax``, one collection per chunk.
+
+    Dots go into ``stipple`` when one is given, to be drawn with the rest
+    of a shared stippling. ``draw`` returns the artist it made, if any.
+    """
+
+    def __init__(self, ax, stipple=None):
+        self.ax, self.stipple = ax, stipple
+
+    def draw(self, batch):
+        if isinstance(batch, Lines):
+            rgba = _rgba(batch.color, len(batch)).copy()
+            rgba[:, 3] = batch.alpha
+            style = {'joinstyle': batch.joinstyle} if batch.joinstyle else {}
+            return self.ax.add_collection(LineCollection(
+                list(batch.paths), colors=rgba, linewidths=batch.widths,
+                capstyle=batch.capstyle, zorder=batch.zorder, **style), autolim=False)
+        elif isinstance(batch, Dots):
+            stipple = self.stipple if self.stipple is not None else Stipple()
+            stipple.add(batch.x, batch.y, batch.sizes, batch.alpha, batch.color)
+            if self.stipple is None:
+                return stipple.draw(self.ax, zorder=batch.zorder)
+        elif isinstance(batch, Polygons):
+            return self.ax.add_collection(PolyCollection(
+                batch.verts, facecolors=batch.facecolor, edgecolors=batch.edgecolor,
+                linewidths=batch.linewidth, alpha=batch.alpha, zorder=batch.zorder),
+                autolim=False)
+        elif isinstance(batch, Text):
+            return self.ax.text(batch.x, batch.y, batch.s, **batch.props)
+        return None
+
+
+class RasterSink:
+    """Lines and dots are splatted into a RasterLayer as they arrive.
+
+    Polygons and text, which the layer cannot draw, go to ``ax``.
+    """
+
+    def __init__(self, layer, ax=None):
+        self.layer, self.axes = layer, AxesSink(ax) if ax is not None else None
+
+    def draw(self, batch):
+        if isinstance(batch, Lines):
+            n = len(batch)
+            rgba = to_rgba_array(batch.color)
+            if len(rgba) == 1:
+                self._lines(batch.paths, batch.widths, batch.color, batch.alpha)
+                return self.layer
+            # Colors per path: one pass per color, in order of appearance
+            rgb = [tuple(c) for c in rgba[:, :3].tolist()]
+            for color in dict.fromkeys(rgb):
+                rows = np.flatnonzero([c == color for c in rgb])
+                paths = (batch.paths[rows] if isinstance(batch.paths, np.ndarray)
+                         else [batch.paths[i] for i in rows])
+                self._lines(paths, _take(batch.widths, rows, n), color,
+                            _take(batch.alpha, rows, n))
+            return self.layer
+        if isinstance(batch, Dots):
+            # A '.' marker of size s is a disc of diameter s / 2, stroked
+            edge = mpl.rcParams['lines.markeredgewidth']
+            self.layer.dots(batch.x, batch.y, np.asarray(batch.sizes) / 4, batch.color,
+                            batch.alpha, stroke=edge)
+            return self.layer
+        if self.axes is not None:
+            return self.axes.draw(batch)
+        raise TypeError(f'a raster layer cannot draw {type(batch).__name__}')
+
+    def _lines(self, paths, widths, color, alpha):
+        if isinstance(paths, np.ndarray):
+            self.layer.lines(paths, widths, color, alpha)
+            return
+        # Ragged paths: one pass per vertex count, in order of appearance
+        lengths = np.array([len(p) for p in paths])
+        for k in dict.fromkeys(lengths.tolist()):
+            rows = np.flatnonzero(lengths == k)
+            self.layer.lines(np.stack([paths[i] for i in rows]),
+                             _take(widths, rows, len(paths)), color,
+                             _take(alpha, rows, len(paths)))
+
+
+def _take(value, rows, n):
+    return np.asarray(value)[rows] if _per_item(value, n) else value
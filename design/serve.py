@@ -0,0 +1,129 @@
+#!/usr/bin/env python3
+"""
+Observational Patience — Render server
+
+A long-lived render loop for design iteration. matplotlib, numpy, every
+plate module and the serif font lookup are loaded once; the design
+directory is then polled, and on each save only the changed modules and
+the modules importing them are reloaded, and only the plates that depend
+on them re-rendered. With ``--dpi`` plates are drawn as quick previews
+under ``.cache/preview`` rather than through the render cache.
+
+    python design/serve.py                  # full renders through the cache
+    python design/serve.py --dpi 100        # fast previews
+"""
+
+import argparse
+import importlib
+import sys
+import time
+import traceback
+from pathlib import Path
+
+from build import discover_plates
+from cache import CACHE_DIR, cached_render, design_imports
+
+DESIGN_DIR = Path(__file__).parent
+PREVIEW_DIR = CACHE_DIR / 'preview'
+INTERVAL = 0.1      # seconds between polls
+SETTLE = 0.05       # wait for editors that save in several writes
+
+
+def warm(plates):
+    """Import matplotlib and the plates, and resolve their fonts, once"""
+    import matplotlib
+    matplotlib.use('Agg')
+    from matplotlib import font_manager
+    import matplotlib.pyplot as plt
+    if str(DESIGN_DIR) not in sys.path:
+        sys.path.insert(0, str(DESIGN_DIR))
+    for plate in plates:
+        importlib.import_module(f'create_{plate}')
+    for family in ('serif', 'monospace'):
+        for style in ('normal', 'italic'):
+            font_manager.findfont(font_manager.FontProperties(family=[family], style=style))
+    plt.close('all')
+
+
+def snapshot():
+    """Modification times of the design modules"""
+    return {p.stem: p.stat().st_mtime_ns for p in DESIGN_DIR.glob('*.py')}
+
+
+def affected(changed, plates):
+    """Loaded design modules to reload, and plates to re-render, after ``changed``"""
+    reload = []
+    for name, module in list(sys.modules.items()):
+        path = getattr(module, '__file__', None)
+        if path and Path(path).resolve().parent == DESIGN_DIR.resolve():
+            if changed & design_imports(name):
+                reload.append(name)
+    # Dependencies first: a module imports fewer design modules than its importers
+    reload.sort(key=lambda name: len(design_imports(name)))
+    stale = [p for p in plates if changed & design_imports(f'create_{p}')]
+    return reload, stale
+
+
+def render(plate, dpi=None, force=False):
+    """Render one plate in this warm process; returns seconds, or None on error"""
+    start = time.perf_counter()
+    try:
+        module = importlib.import_module(f'create_{plate}')
+        if dpi:
+            PREVIEW_DIR.mkdir(parents=True, exist_ok=True)
+            module.create_canvas(PREVIEW_DIR / module.OUTPUT, dpi=dpi)
+        else:
+            cached_render(plate, module.create_canvas, force=force)
+    except Exception:
+        traceback.print_exc()
+        return None
+    return time.perf_counter() - start
+
+
+def serve(plates=None, dpi=None, interval=INTERVAL, initial=False):
+    """Watch the design directory and re-render affected plates until interrupted"""
+    start = time.perf_counter()
+    warm(plates or discover_plates())
+    print(f"Warm in {time.perf_counter() - start:.2f} s; watching {DESIGN_DIR}")
+    if initial:
+        for plate in plates or discover_plates():
+            render(plate, dpi)
+    seen = snapshot()
+    while True:
+        time.sleep(interval)
+        now = snapshot()
+        if now == seen:
+            continue
+        time.sleep(SETTLE)
+        now = snapshot()
+        changed = {name for name in now if seen.get(name) != now[name]}
+        seen = now
+        try:
+            # A half-typed edit may not parse yet; the next save retries
+            reload, stale = affected(changed, plates or discover_plates())
+            for name in reload:
+                importlib.reload(sys.modules[name])
+        except Exception:
+            traceback.print_exc()
+            continue
+        for plate in stale:
+            seconds = render(plate, dpi)
+            status = 'FAILED' if seconds is None else f'{seconds:.2f} s'
+            print(f"{time.strftime('%H:%M:%S')}  {', '.join(sorted(changed))} -> "
+                  f"{plate} {status}", flush=True)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description='Re-render plates as their sources change.')
+    parser.add_argument('plates', nargs='*', help='plates to watch (default: all)')
+    parser.add_argument('--dpi', type=int, help='render previews at this dpi instead')
+    parser.add_argument('--initial', action='store_true', help='render once at startup')
+    args = parser.parse_args(argv)
+    try:
+        serve(args.plates or None, args.dpi, initial=args.initial)
+    except KeyboardInterrupt:
+        pass
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,233 @@
+#!/usr/bin/env python3
+"""
+Observational Patience — Epistemic status sheets
+
+The blended plate's confidence bars for a whole project's claims.
+Solidity values take their threshold colors in one pass, and a panel's
+tracks and fills are a single PolyCollection. Labels are not text
+artists: they are set from monospace glyph outlines, cached by
+character, into one compound path per page, clipped to their column by
+character count, so no label is ever measured. Claims fill a panel's
+rows, panels a page's columns, and pages follow in a PDF or as numbered
+PNGs; only the page being drawn is laid out.
+
+    python design/status.py claims.json -o status.pdf
+    python design/status.py --random 10000 -o sheets/
+"""
+
+import argparse
+import os
+import sys
+import time
+from concurrent.futures import ThreadPoolExecutor
+from functools import lru_cache
+from pathlib import Path
+
+import matplotlib.pyplot as plt
+import numpy as np
+from matplotlib.backends.backend_pdf import PdfPages
+from matplotlib.collections import PathCollection
+from matplotlib.font_manager import FontProperties
+from matplotlib.path import Path as MPath
+from matplotlib.textpath import text_to_path
+
+from create_blended import COLORS, status_bars
+from scene import AxesSink
+
+PAGE = (8.5, 11.0)      # inches, which are also the sheet's data units
+MARGIN = 0.5
+COLUMNS = 3             # panels per page
+PITCH = 0.12            # inches between rows
+BAR = (0.3, 0.9)        # a panel's value gutter and bar width, in inches
+FONTSIZE = 5
+DPI = 150
+FONT = FontProperties(family='monospace')
+ELLIPSIS = '…'
+
+
+@lru_cache(maxsize=None)
+def _glyph(char):
+    """A character's outline at one em, and its path codes"""
+    verts, codes = text_to_path.get_text_path(FONT, char)
+    return np.asarray(verts, dtype=float).reshape(-1, 2) / text_to_path.FONT_SCALE, np.asarray(
+        codes, dtype=np.uint8)
+
+
+@lru_cache(maxsize=None)
+def _metrics():
+    """Advance and figure height of the monospace face, in ems"""
+    width = text_to_path.get_text_width_height_descent('0' * 100, FONT, ismath=False)[0]
+    return width / 100 / FONT.get_size_in_points(), _glyph('0')[0][:, 1].max()
+
+
+def clip(labels, chars):
+    """Labels cut to ``chars`` characters, an ellipsis marking each cut"""
+    return [s if len(s) <= chars else s[:chars - 1] + ELLIPSIS for s in labels]
+
+
+def set_labels(labels, x, y, size, ha='left'):
+    """Labels as one compound Path: glyphs of ``size`` data units, centred on ``y``.
+
+    ``x`` is each label's left edge, or its right with ``ha='right'``.
+    Glyphs sit on a fixed advance, so every label is placed without
+    being measured.
+    """
+    advance, height = _metrics()
+    lengths = np.array([len(s) for s in labels])
+    x = np.broadcast_to(np.asarray(x, dtype=float), lengths.shape)
+    y = np.broadcast_to(np.asarray(y, dtype=float), lengths.shape)
+    if ha == 'right':
+        x = x - lengths * advance * size
+    glyphs = [_glyph(c) for s in labels for c in s]
+    if not glyphs:
+        return MPath(np.empty((0, 2)))
+    row = np.repeat(np.arange(len(labels)), lengths)
+    col = np.arange(len(row)) - np.repeat(np.cumsum(lengths) - lengths, lengths)
+    origin = np.column_stack([x[row] + col * advance * size, y[row] - height * size / 2])
+    counts = [len(v) for v, _ in glyphs]
+    verts = np.concatenate([v for v, _ in glyphs]) * size + np.repeat(origin, counts, axis=0)
+    return MPath(verts, np.concatenate([c for _, c in glyphs]))
+
+
+def pages(n, rows, columns=COLUMNS):
+    """(start, stop) claim ranges, one per page"""
+    per_page = rows * columns
+    return [(lo, min(lo + per_page, n)) for lo in range(0, n, per_page)]
+
+
+def rows_per_panel(pitch=PITCH):
+    return int((PAGE[1] - 2 * MARGIN - 0.5) / pitch)
+
+
+def page(solidity, labels, rows, columns=COLUMNS, pitch=PITCH, fontsize=FONTSIZE):
+    """A page's bars, as one Polygons batch, and its value and label paths.
+
+    Claims run down each panel's ``rows`` and on into the next panel.
+    """
+    gutter, bar = BAR
+    width = (PAGE[0] - 2 * MARGIN) / columns
+    i = np.arange(len(labels))
+    x = MARGIN + i // rows * width + gutter
+    y = PAGE[1] - MARGIN - 0.5 - i % rows * pitch
+    size = fontsize / 72
+    chars = int((width - gutter - bar - 0.1) / (_metrics()[0] * size))
+    bars = status_bars(solidity, x, y, bar, bar_height=pitch * 0.55)
+    values = set_labels([f'{v:.2f}' for v in solidity], x - 0.04, y, size * 0.9, ha='right')
+    names = set_labels(clip(labels, chars), x + bar + 0.05, y, size)
+    return bars, values, names
+
+
+def _page_axes():
+    fig = plt.figure(figsize=PAGE, facecolor=COLORS['bg'])
+    ax = fig.add_axes([0, 0, 1, 1])
+    ax.set_xlim(0, PAGE[0])
+    ax.set_ylim(0, PAGE[1])
+    ax.axis('off')
+    return fig, ax
+
+
+def _save_page(pixels, path):
+    from PIL import Image
+    Image.fromarray(pixels).save(path, compress_level=1)
+    return path
+
+
+def status_sheet(solidity, labels, out, columns=COLUMNS, pitch=PITCH, dpi=DPI, jobs=None):
+    """Write the claims' status pages; a .pdf gets them all, a directory one PNG each.
+
+    Returns the number of pages. One figure serves every page: the title
+    stays, and each page's bars and labels replace the last's. PNG pages
+    are encoded in threads while the next is drawn; in a PDF the label
+    glyphs are rasterized at ``dpi``, which keeps it to the size of the
+    PNGs.
+    """
+    solidity = np.asarray(solidity, dtype=float)
+    out = Path(out)
+    rows = rows_per_panel(pitch)
+    ranges = pages(len(labels), rows, columns)
+
+    fig, ax = _page_axes()
+    fig.set_dpi(dpi)
+    ax.text(MARGIN, PAGE[1] - MARGIN, 'epistemic status', fontsize=9,
+            color=COLORS['ink_faint'], fontfamily='monospace', va='top')
+    folio = ax.text(PAGE[0] - MARGIN, PAGE[1] - MARGIN, '', fontsize=7,
+                    color=COLORS['ink_faint'], fontfamily='monospace', va='top', ha='right')
+    sink = AxesSink(ax)
+    pdf = PdfPages(out) if out.suffix.lower() == '.pdf' else None
+    if pdf is None:
+        out.mkdir(parents=True, exist_ok=True)
+    jobs = jobs or os.cpu_count() or 1
+    pending = []
+    try:
+        with ThreadPoolExecutor(max_workers=jobs) as pool:
+            for number, (lo, hi) in enumerate(ranges, 1):
+                bars, values, names = page(solidity[lo:hi], labels[lo:hi], rows, columns,
+                                           pitch)
+                artists = [sink.draw(bars), ax.add_collection(PathCollection(
+                    [values, names], facecolors=[COLORS['ink_mid'], COLORS['ink_light']],
+                    edgecolors='none', zorder=3, rasterized=pdf is not None), autolim=False)]
+                folio.set_text(f'{lo + 1}–{hi} of {len(labels)} · page {number}/{len(ranges)}')
+                if pdf is not None:
+                    pdf.savefig(fig, facecolor=fig.get_facecolor(), dpi=dpi)
+                else:
+                    fig.canvas.draw()
+                    pixels = np.asarray(fig.canvas.buffer_rgba())[..., :3].copy()
+                    pending.append(pool.submit(_save_page, pixels,
+                                               out / f'status-{number:04d}.png'))
+                    if len(pending) > 2 * jobs:
+                        pending.pop(0).result()
+                for artist in artists:
+                    artist.remove()
+            for future in pending:
+                future.result()
+    finally:
+        if pdf is not None:
+            pdf.close()
+        plt.close(fig)
+    return len(ranges)
+
+
+def claim_solidity(claim):
+    """A claim's solidity, from the legacy 1-5 confidence when it has none"""
+    if claim.get('solidity') is not None:
+        return float(claim['solidity'])
+    if claim.get('confidence') is not None:
+        return (float(claim['confidence']) - 1) / 4
+    return 0.5
+
+
+def main(argv=None):
+    import matplotlib
+    matplotlib.use('Agg')
+    parser = argparse.ArgumentParser(description='Render epistemic status sheets for claims.')
+    parser.add_argument('claims', nargs='?', help='claims JSON (a list, or {"claims": [...]})')
+    parser.add_argument('-o', '--output', default='status.pdf',
+                        help='a .pdf, or a directory for PNG pages')
+    parser.add_argument('--columns', type=int, default=COLUMNS, help='panels per page')
+    parser.add_argument('--pitch', type=float, default=PITCH, help='inches between rows')
+    parser.add_argument('--dpi', type=int, default=DPI, help='resolution of PNG pages')
+    parser.add_argument('--random', type=int, metavar='N', help='N synthetic claims')
+    parser.add_argument('-j', '--jobs', type=int, help='encoding threads (default: cores)')
+    args = parser.parse_args(argv)
+
+    if args.random:
+        rng = np.random.default_rng(0)
+        values = rng.beta(4, 2.5, args.random)
+        labels = [f'c{i}  claim number {i} of a synthetic project' for i in range(args.random)]
+    elif args.claims:
+        from glyphs import load_claims
+        claims = load_claims(args.claims)
+        values = [claim_solidity(c) for c in claims]
+        labels = [f"{c['id']}  {c.get('statement', '')}".rstrip() for c in claims]
+    else:
+        parser.error('a claims file or --random is required')
+
+    start = time.perf_counter()
+    n = status_sheet(values, labels, args.output, args.columns, args.pitch, args.dpi,
+                     args.jobs)
+    print(f"{len(labels)} claims on {n} pages to {args.output} in "
+          f"{time.perf_counter() - start:.2f} s", file=sys.stderr)
+
+
+if __name__ == '__main__':
+    main()
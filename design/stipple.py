@@ -0,0 +1,67 @@
+"""
+Observational Patience — Stippling
+
+Dots accumulated as arrays and emitted as a single collection. A filament,
+a cluster, or a whole plate becomes one artist however dense the stippling,
+instead of one Line2D per dot.
+"""
+
+import matplotlib as mpl
+import numpy as np
+from matplotlib.colors import to_rgba
+
+
+class Stipple:
+    """Accumulator for stipple dots with per-dot size and alpha.
+
+    Sizes are marker sizes in points, as for ``ax.plot(..., '.')``.
+    """
+
+    def __init__(self):
+        self.clear()
+
+    def clear(self):
+        """Drop every accumulated dot"""
+        self._x, self._y, self._sizes, self._rgba = [], [], [], []
+
+    def __len__(self):
+        return sum(len(x) for x in self._x)
+
+    def add(self, x, y, sizes, alpha, color):
+        """Add dots; ``sizes`` and ``alpha`` may be scalars or per-dot arrays"""
+        x = np.atleast_1d(np.asarray(x, dtype=float))
+        y = np.atleast_1d(np.asarray(y, dtype=float))
+        if len(x) == 0:
+            return
+        rgba = np.tile(to_rgba(color), (len(x), 1))
+        rgba[:, 3] = alpha
+        self._x.append(x)
+        self._y.append(y)
+        self._sizes.append(np.broadcast_to(np.asarray(sizes, dtype=float), x.shape))
+        self._rgba.append(rgba)
+
+    def draw(self, ax, zorder=2, raster=None):
+        """Emit every accumulated dot as one collection, then reset.
+
+        With a RasterLayer, dots are splatted into it instead, one pass per
+        colour, and nothing is added to ``ax``.
+        """
+        if not self._x:
+            return None
+        x, y = np.concatenate(self._x), np.concatenate(self._y)
+        sizes = np.concatenate(self._sizes)
+        rgba = np.concatenate(self._rgba)
+        edge = mpl.rcParams['lines.markeredgewidth']
+        self.clear()
+        if raster is not None:
+            # A '.' marker of size s is a disc of diameter s / 2, stroked
+            colors, group = np.unique(rgba[:, :3], axis=0, return_inverse=True)
+            for i, color in enumerate(colors):
+                rows = group.ravel() == i
+                raster.dots(x[rows], y[rows], sizes[rows] / 4, color, rgba[rows, 3],
+                            stroke=edge)
+            return raster
+        # '.' markers are stroked with the face colour at the line marker
+        # edge width; keep that so dots look as they did under ax.plot
+        return ax.scatter(x, y, s=sizes ** 2, marker='.', c=rgba, edgecolors='face',
+                          linewidths=edge, zorder=zorder)
@@ -0,0 +1,314 @@
+#!/usr/bin/env python3
+"""
+Observational Patience — Compact SVG
+
+Vector export for the plates. Matplotlib's SVG writes every stipple dot
+as its own marker definition, every curve at full float precision and
+every style inline. This rewrites that output: polylines are simplified
+to a pixel tolerance, coordinates quantized and written relative,
+identical marker definitions shared between their ``<use>`` sites,
+styles collected into classes, unused ids dropped, and opaque paths of
+one style merged.
+
+    python design/svg.py laboratory -o laboratory-mode.svg
+"""
+
+import argparse
+import importlib
+import io
+import math
+import re
+import sys
+import xml.etree.ElementTree as ET
+from collections import Counter
+from pathlib import Path
+
+import numpy as np
+
+DESIGN_DIR = Path(__file__).parent
+SVG = 'http://www.w3.org/2000/svg'
+XLINK = 'http://www.w3.org/1999/xlink'
+HREF = f'{{{XLINK}}}href'
+TOLERANCE = 0.5     # simplification tolerance, in pixels at the plate's DPI
+
+ET.register_namespace('', SVG)
+ET.register_namespace('xlink', XLINK)
+
+_TOKEN = re.compile(r'[MLQCZmlqcz]|[-+]?(?:\d+\.?\d*|\.\d+)(?:[eE][-+]?\d+)?')
+_ARITY = {'M': 2, 'L': 2, 'Q': 4, 'C': 6, 'Z': 0}
+_REF = re.compile(r'url\(#([^)]+)\)')
+
+
+def _tag(el):
+    return el.tag.rsplit('}', 1)[-1]
+
+
+def _simplify(points, tolerance):
+    """Ramer-Douglas-Peucker: indices of the points to keep"""
+    keep = np.zeros(len(points), dtype=bool)
+    keep[[0, -1]] = True
+    stack = [(0, len(points) - 1)]
+    while stack:
+        i, j = stack.pop()
+        if j - i < 2:
+            continue
+        a, b = points[i], points[j]
+        ab = b - a
+        rel = points[i + 1:j] - a
+        norm = math.hypot(*ab)
+        if norm:
+            dist = np.abs(rel[:, 0] * ab[1] - rel[:, 1] * ab[0]) / norm
+        else:
+            dist = np.hypot(rel[:, 0], rel[:, 1])
+        k = int(np.argmax(dist))
+        if dist[k] > tolerance:
+            keep[i + 1 + k] = True
+            stack += [(i, i + 1 + k), (i + 1 + k, j)]
+    return np.flatnonzero(keep)
+
+
+def _number(n, decimals):
+    """Shortest spelling of n, rounded to ``decimals``"""
+    text = f'{n:.{decimals}f}'.rstrip('0').rstrip('.') if decimals else f'{n:.0f}'
+    if text in ('-0', ''):
+        return '0'
+    return text.replace('0.', '.', 1) if text.startswith(('0.', '-0.')) else text
+
+
+def compact_path(d, tolerance, decimals):
+    """Rewrite absolute M/L/Q/C/Z path data as simplified relative data"""
+    tokens = _TOKEN.findall(d)
+    commands, i = [], 0
+    while i < len(tokens):
+        cmd = tokens[i].upper()
+        n = _ARITY[cmd]
+        commands.append((cmd, [float(t) for t in tokens[i + 1:i + 1 + n]]))
+        i += 1 + n
+
+    # Simplify runs of line-tos together with the point they start from
+    out, run, last = [], [], None
+    for cmd, args in commands + [('END', [])]:
+        if cmd == 'L':
+            run.append(args)
+            continue
+        if run:
+            pts = np.array([last] + run)
+            kept = _simplify(pts, tolerance)[1:]
+            out += [('L', list(pts[k])) for k in kept]
+            last, run = list(pts[-1]), []
+        if cmd != 'END':
+            out.append((cmd, args))
+            last = args[-2:] if args else last
+
+    # Quantize to integers of 10**-decimals, then difference
+    scale = 10 ** decimals
+    tokens, prev, x, y, start = [], None, 0, 0, (0, 0)
+    for cmd, args in out:
+        if cmd == 'Z':
+            tokens.append('z')
+            x, y, prev = *start, None
+            continue
+        q = [round(a * scale) for a in args]
+        letter = cmd.lower()
+        if letter != prev or letter == 'm':
+            tokens.append(letter)
+        tokens += [_number((v - (y if k % 2 else x)) / scale, decimals)
+                   for k, v in enumerate(q)]
+        prev = 'l' if letter == 'm' else letter     # line-tos may follow m implicitly
+        x, y = q[-2:]
+        if cmd == 'M':
+            start = (x, y)
+    return _join(tokens)
+
+
+def _join(tokens):
+    """Concatenate path tokens, spacing only where numbers would run together"""
+    text = ''
+    for token in tokens:
+        if text and token[0] not in '-abcdefghijklmnopqrstuvwxyz' and text[-1] not in 'mlqcz':
+            last = re.split(r'[-\sa-z]', text)[-1]
+            if not (token[0] == '.' and '.' in last):
+                text += ' '
+        text += token
+    return text
+
+
+def compact_svg(data, dpi=300, tolerance=TOLERANCE):
+    """Compact matplotlib SVG ``data``; returns the optimized document as bytes.
+
+    ``tolerance`` is in pixels at ``dpi``; coordinates are kept to a
+    quarter of it.
+    """
+    tol = tolerance * 72 / dpi
+    decimals = max(0, math.ceil(-math.log10(tol / 4)))
+    root = ET.fromstring(data)
+    for el in list(root):
+        if _tag(el) == 'metadata':
+            root.remove(el)
+
+    # Drop ids nobody references, which frees the artists' wrapper groups
+    text = data.decode() if isinstance(data, bytes) else data
+    used = set(_REF.findall(text)) | set(re.findall(r'href="#([^"]+)"', text))
+    for el in root.iter():
+        if el.get('id') is not None and el.get('id') not in used:
+            del el.attrib['id']
+    _unwrap(root)
+
+    # Merge runs of opaque sibling paths that differ only in their data.
+    # Under the nonzero rule, overlapping filled subpaths of opposite
+    # winding would cut holes, so filled paths join only if disjoint.
+    for el in root.iter():
+        merged, boxes = None, []
+        for child in list(el):
+            mergeable = (_tag(child) == 'path' and 'id' not in child.attrib
+                         and 'transform' not in child.attrib
+                         and not re.search(r'opacity: (?!1\b)', child.get('style', '')))
+            filled = mergeable and not re.search(r'fill: ?none', child.get('style', ''))
+            box = _bbox(child.get('d', '')) if filled else None
+            if (mergeable and merged is not None
+                    and {k: v for k, v in child.attrib.items() if k != 'd'}
+                    == {k: v for k, v in merged.attrib.items() if k != 'd'}
+                    and not any(_overlap(box, b) for b in boxes)):
+                merged.set('d', merged.get('d') + ' ' + child.get('d'))
+                el.remove(child)
+            else:
+                merged, boxes = (child if mergeable else None), []
+            if box is not None:
+                boxes.append(box)
+
+    for el in root.iter():
+        if _tag(el) == 'path' and 'd' in el.attrib:
+            el.set('d', compact_path(el.get('d'), tol, decimals))
+        elif _tag(el) == 'use':
+            for attr in ('x', 'y'):
+                if attr in el.attrib:
+                    el.set(attr, _number(float(el.get(attr)), decimals))
+
+    # Share marker definitions that quantized to the same shape
+    alias, seen = {}, {}
+    for defs in [el for el in root.iter() if _tag(el) == 'defs']:
+        for el in list(defs):
+            if _tag(el) != 'path' or 'id' not in el.attrib:
+                continue
+            signature = (el.get('d'), el.get('style'))
+            if signature in seen:
+                alias[el.get('id')] = seen[signature]
+                defs.remove(el)
+            else:
+                seen[signature] = el.get('id')
+
+    # Short ids, with every reference following
+    names = {}
+    for el in root.iter():
+        if el.get('id') is not None:
+            names[el.get('id')] = _short(len(names))
+            el.set('id', names[el.get('id')])
+    names.update({old: names[new] for old, new in alias.items()})
+    for el in root.iter():
+        for key, value in el.attrib.items():
+            if key == HREF and value[1:] in names:
+                el.set(key, '#' + names[value[1:]])
+            elif 'url(#' in value:
+                el.set(key, _REF.sub(lambda m: f'url(#{names[m.group(1)]})', value))
+
+    # Styles become classes, the most used getting the shortest names
+    def squeeze(style):
+        style = re.sub(r'\s*([:;])\s*', r'\1', style).strip(';')
+        return re.sub(r':0\.(?=\d)', ':.', style)
+
+    styles = Counter(squeeze(el.get('style')) for el in root.iter() if el.get('style'))
+    classes = {s: _short(i) for i, (s, _) in enumerate(styles.most_common())}
+    for el in root.iter():
+        if el.get('style'):
+            el.set('class', classes[squeeze(el.attrib.pop('style'))])
+    sheet = next((el for el in root.iter() if _tag(el) == 'style'), None)
+    if sheet is None:
+        sheet = ET.Element(f'{{{SVG}}}style')
+        root.insert(0, sheet)
+    rules = ''.join(f'.{c}{{{s}}}' for s, c in classes.items())
+    sheet.text = re.sub(r'\s*([{};:])\s*', r'\1', sheet.text or '').strip() + rules
+
+    # Strip layout whitespace, keeping it inside text
+    parent = {c: p for p in root.iter() for c in p}
+    for el in root.iter():
+        if el in parent and _tag(parent[el]) != 'text':
+            el.tail = None
+        if _tag(el) not in ('text', 'tspan', 'style') and el.text and not el.text.strip():
+            el.text = None
+    return ET.tostring(root, xml_declaration=True, encoding='utf-8')
+
+
+def _bbox(d):
+    """(x0, y0, x1, y1) around every point of absolute path data, control points included"""
+    numbers = [float(t) for t in _TOKEN.findall(d) if t not in _ARITY and t.upper() not in _ARITY]
+    xs, ys = numbers[0::2], numbers[1::2]
+    return (min(xs), min(ys), max(xs), max(ys)) if xs else None
+
+
+def _overlap(a, b):
+    if a is None or b is None:
+        return False
+    return a[0] <= b[2] and b[0] <= a[2] and a[1] <= b[3] and b[1] <= a[3]
+
+
+def _unwrap(el):
+    """Splice the children of attribute-less groups into their parents"""
+    for i, child in reversed(list(enumerate(el))):
+        _unwrap(child)
+        if _tag(child) == 'g' and not child.attrib:
+            el[i:i + 1] = list(child)
+
+
+def _short(i):
+    """Letters-only name for the i-th id or class: a, b, ..., z, aa, ab, ..."""
+    name = ''
+    while True:
+        name = chr(ord('a') + i % 26) + name
+        i = i // 26 - 1
+        if i < 0:
+            return name
+
+
+def save_svg(fig, path, dpi=300, tolerance=TOLERANCE, text=False):
+    """Save ``fig`` as a compact SVG; ``text`` keeps text as live text"""
+    import matplotlib.pyplot as plt
+    buffer = io.BytesIO()
+    with plt.rc_context({'svg.fonttype': 'none' if text else 'path',
+                         'svg.hashsalt': 'observational-patience'}):
+        fig.savefig(buffer, format='svg', bbox_inches='tight',
+                    facecolor=fig.get_facecolor())
+    data = compact_svg(buffer.getvalue(), dpi, tolerance)
+    Path(path).write_bytes(data)
+    return len(buffer.getvalue()), len(data)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description='Export a plate as compact SVG.')
+    parser.add_argument('plate')
+    parser.add_argument('-o', '--output', help='output SVG (default: the plate OUTPUT as .svg)')
+    parser.add_argument('--tolerance', type=float, default=TOLERANCE,
+                        help='simplification tolerance in pixels at the plate DPI')
+    parser.add_argument('--text', action='store_true',
+                        help='keep text as text rather than outlines')
+    parser.add_argument('--dpi', type=int,
+                        help='output resolution curves are sampled for (default: the plate DPI)')
+    args = parser.parse_args(argv)
+
+    import matplotlib
+    matplotlib.use('Agg')
+    import matplotlib.pyplot as plt
+    if str(DESIGN_DIR) not in sys.path:
+        sys.path.insert(0, str(DESIGN_DIR))
+    import lod
+    module = importlib.import_module(f'create_{args.plate}')
+    path = Path(args.output or DESIGN_DIR / Path(module.OUTPUT).with_suffix('.svg'))
+    dpi = args.dpi or module.DPI
+    with lod.output_dpi(dpi):
+        fig = module.create_figure()
+    raw, size = save_svg(fig, path, dpi, args.tolerance, args.text)
+    plt.close('all')
+    print(f"Created {path.name} ({size / 1024:.0f} KB, {raw / 1024:.0f} KB before compaction)")
+
+
+if __name__ == '__main__':
+    main()
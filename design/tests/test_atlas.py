@@ -0,0 +1,127 @@
+import json
+
+import numpy as np
+import pytest
+from PIL import Image
+
+from atlas import Sheet, build_atlas, collect_sprites
+
+
+def _sprite(path, w, h, seed, margin=3):
+    """A random opaque block inside a transparent margin"""
+    rng = np.random.default_rng(seed)
+    pixels = np.zeros((h + 2 * margin, w + 2 * margin, 4), dtype=np.uint8)
+    pixels[margin:margin + h, margin:margin + w, :3] = rng.integers(0, 256, (h, w, 3))
+    pixels[margin:margin + h, margin:margin + w, 3] = 255
+    Image.fromarray(pixels).save(path)
+    return path
+
+
+@pytest.fixture
+def sprites(tmp_path):
+    src = tmp_path / 'src'
+    src.mkdir()
+    rng = np.random.default_rng(0)
+    for i in range(40):
+        _sprite(src / f's{i:02}.png', *rng.integers(4, 40, 2), seed=i)
+    return src
+
+
+def _manifest(out):
+    return json.loads((out / 'atlas.json').read_text())
+
+
+def _check(sprites, out):
+    """Every sprite reads back from its sheet, and no two slots overlap"""
+    manifest = _manifest(out)
+    sheets = {s['file']: np.asarray(Image.open(out / s['file'])) for s in manifest['sheets']}
+    assert set(manifest['sprites']) == set(sprites)
+    for name, entry in manifest['sprites'].items():
+        source = np.asarray(Image.open(sprites[name]).convert('RGBA'))
+        tx, ty, sw, sh = entry['trim']
+        assert (sw, sh) == (source.shape[1], source.shape[0])
+        x, y, w, h = entry['rect']
+        assert np.array_equal(sheets[entry['file']][y:y + h, x:x + w],
+                              source[ty:ty + h, tx:tx + w])
+        assert entry['uv'][0] == x / manifest['settings']['size']
+    for index in range(len(manifest['sheets'])):
+        slots = [e['slot'] for e in manifest['sprites'].values() if e['sheet'] == index]
+        slots += manifest['sheets'][index]['free']
+        for i, (x0, y0, w0, h0) in enumerate(slots):
+            for x1, y1, w1, h1 in slots[i + 1:]:
+                assert x0 + w0 <= x1 or x1 + w1 <= x0 or y0 + h0 <= y1 or y1 + h1 <= y0
+
+
+def test_a_sheet_fills_shelves_and_reuses_gaps():
+    sheet = Sheet(100)
+    assert sheet.insert(60, 20) == [0, 0, 60, 20]
+    assert sheet.insert(30, 10) == [60, 0, 30, 10]     # fits the first shelf
+    assert sheet.insert(50, 30) == [0, 20, 50, 30]     # too tall for it: a new shelf
+    assert sheet.insert(20, 60) is None                # too tall for what is left
+    sheet.free.append([60, 0, 30, 10])
+    sheet.free.append([0, 0, 60, 20])
+    assert sheet.insert(25, 8) == [60, 0, 30, 10]      # the tightest gap, claimed whole
+    assert sheet.height == 50
+
+
+def test_sprites_are_trimmed_and_packed(sprites, tmp_path):
+    out = tmp_path / 'atlas'
+    found = collect_sprites([sprites])
+    assert build_atlas(found, out, size=128) == 40
+    assert len(_manifest(out)['sheets']) > 1
+    _check(found, out)
+    entry = _manifest(out)['sprites']['s00']
+    assert entry['trim'][:2] == [3, 3]
+    assert entry['rect'][:2] == [entry['slot'][0] + 2, entry['slot'][1] + 2]
+
+
+def test_an_unchanged_atlas_is_left_alone(sprites, tmp_path):
+    out = tmp_path / 'atlas'
+    found = collect_sprites([sprites])
+    build_atlas(found, out, size=128)
+    before = {p.name: p.stat().st_mtime_ns for p in out.glob('atlas-*.png')}
+    assert build_atlas(found, out, size=128) == 0
+    assert {p.name: p.stat().st_mtime_ns for p in out.glob('atlas-*.png')} == before
+
+
+def test_a_rebuild_repacks_only_what_changed(sprites, tmp_path):
+    out = tmp_path / 'atlas'
+    found = collect_sprites([sprites])
+    build_atlas(found, out, size=128)
+    first = _manifest(out)
+
+    _sprite(sprites / 's05.png', 10, 10, seed=99)       # smaller, so it fits its old slot
+    (sprites / 's07.png').unlink()
+    _sprite(sprites / 'new.png', 12, 6, seed=100)
+    found = collect_sprites([sprites])
+    assert build_atlas(found, out, size=128) == 2
+    second = _manifest(out)
+    _check(found, out)
+    for name in set(found) - {'s05', 'new'}:
+        assert second['sprites'][name]['slot'] == first['sprites'][name]['slot']
+        assert second['sprites'][name]['sheet'] == first['sprites'][name]['sheet']
+    assert len(second['sheets']) == len(first['sheets'])    # the changes went into gaps
+
+    full = tmp_path / 'full'
+    build_atlas(found, full, size=128, full=True)
+    _check(found, full)
+
+
+def test_gaps_past_the_limit_force_a_full_repack(sprites, tmp_path):
+    out = tmp_path / 'atlas'
+    found = collect_sprites([sprites])
+    build_atlas(found, out, size=128)
+    kept = dict(list(found.items())[:10])
+    assert build_atlas(kept, out, size=128) == 10
+    manifest = _manifest(out)
+    assert all(not sheet['free'] for sheet in manifest['sheets'])
+    assert len(list(out.glob('atlas-*.png'))) == len(manifest['sheets'])
+    _check(kept, out)
+
+
+def test_duplicate_names_are_refused(sprites, tmp_path):
+    other = tmp_path / 'other'
+    other.mkdir()
+    _sprite(other / 's01.png', 5, 5, seed=1)
+    with pytest.raises(ValueError, match="duplicate sprite name 's01'"):
+        collect_sprites([sprites, other])
@@ -0,0 +1,123 @@
+import itertools
+import sys
+from types import SimpleNamespace
+
+import pytest
+
+import cache
+from cache import RenderCache, cached_render, plate_key, plate_output
+
+PLATE = """\
+import numpy as np
+from helper import curve
+
+COLORS = {'ink': '#2A2520'}
+OUTPUT = 'demo-mode.png'
+DPI = 300
+
+
+def create_canvas():
+    np.random.seed(42)
+    curve(seed=7)
+"""
+
+
+@pytest.fixture
+def design(tmp_path, monkeypatch):
+    """A design directory holding a demo plate, its helper and a bystander"""
+    (tmp_path / 'create_demo.py').write_text(PLATE)
+    (tmp_path / 'helper.py').write_text('def curve(seed=0):\n    return seed\n')
+    (tmp_path / 'unrelated.py').write_text('X = 1\n')
+    monkeypatch.setattr(cache, 'DESIGN_DIR', tmp_path)
+    return tmp_path
+
+
+@pytest.fixture
+def clock(monkeypatch):
+    """Strictly increasing timestamps for the cache, so LRU order is exact"""
+    ticks = itertools.count(1000)
+    monkeypatch.setattr(cache, 'time', SimpleNamespace(time=lambda: float(next(ticks))))
+
+
+def test_key_follows_code_palette_seeds_and_options(design):
+    key = plate_key('demo')
+    assert key == plate_key('demo')
+    assert 'create_demo' not in sys.modules          # read from source, not imported
+
+    (design / 'unrelated.py').write_text('X = 2\n')
+    assert plate_key('demo') == key
+
+    edits = [
+        ('helper.py', 'return seed', 'return seed + 1'),
+        ('create_demo.py', "'#2A2520'", "'#2A2521'"),
+        ('create_demo.py', 'seed(42)', 'seed(43)'),
+        ('create_demo.py', 'seed=7', 'seed=8'),
+    ]
+    seen = {key}
+    for name, old, new in edits:
+        path = design / name
+        path.write_text(path.read_text().replace(old, new))
+        seen.add(plate_key('demo'))
+    assert len(seen) == len(edits) + 1
+
+    latest = plate_key('demo')
+    assert len({latest, plate_key('demo', dpi=150), plate_key('demo', format='pdf')}) == 3
+    assert plate_key('demo', dpi=300) == latest
+
+
+def test_output_comes_from_the_plate(design):
+    assert plate_output('demo') == design / 'demo-mode.png'
+
+
+def test_store_and_fetch(tmp_path, clock):
+    render = tmp_path / 'plate.png'
+    render.write_bytes(b'first render')
+    store = RenderCache(tmp_path / 'cache')
+    store.store('k1', render, 'demo')
+
+    assert not store.fetch('missing', render)
+    render.write_bytes(b'edited by hand')
+    assert store.fetch('k1', render)
+    assert render.read_bytes() == b'first render'
+
+    # The manifest outlives the process
+    assert RenderCache(tmp_path / 'cache').fetch('k1', tmp_path / 'copy.png')
+    assert (tmp_path / 'copy.png').read_bytes() == b'first render'
+
+
+def test_eviction_drops_the_least_recently_used(tmp_path, clock):
+    store = RenderCache(tmp_path / 'cache', max_bytes=25)
+    for key in ('a', 'b'):
+        src = tmp_path / f'{key}.png'
+        src.write_bytes(key.encode() * 10)
+        store.store(key, src)
+    assert store.fetch('a', tmp_path / 'out.png')      # b is now the oldest
+
+    src = tmp_path / 'c.png'
+    src.write_bytes(b'c' * 10)
+    store.store('c', src)
+    assert set(store.manifest['entries']) == {'a', 'c'}
+    assert sorted(p.name for p in (tmp_path / 'cache' / 'objects').iterdir()) == ['a.png',
+                                                                                  'c.png']
+    assert not RenderCache(tmp_path / 'cache').fetch('b', tmp_path / 'out.png')
+
+
+def test_cached_render_skips_unchanged_plates(design, tmp_path, clock):
+    renders = []
+
+    def create_canvas():
+        renders.append(1)
+        plate_output('demo').write_bytes(f'render {len(renders)}'.encode())
+
+    store = RenderCache(tmp_path / 'cache')
+    assert not cached_render('demo', create_canvas, cache=store)
+    plate_output('demo').unlink()
+    assert cached_render('demo', create_canvas, cache=store)
+    assert len(renders) == 1
+    assert plate_output('demo').read_bytes() == b'render 1'
+
+    assert not cached_render('demo', create_canvas, force=True, cache=store)
+    helper = design / 'helper.py'
+    helper.write_text(helper.read_text() + '\n# changed\n')
+    assert not cached_render('demo', create_canvas, cache=store)
+    assert len(renders) == 3
@@ -0,0 +1,121 @@
+import os
+
+import numpy as np
+import pytest
+
+import catalog
+from catalog import density_batches, density_grid, open_catalog, place
+
+
+@pytest.fixture(autouse=True)
+def cache_dir(tmp_path, monkeypatch):
+    monkeypatch.setattr(catalog, 'CACHE_DIR', tmp_path / 'cache')
+    return tmp_path / 'cache'
+
+
+def _galaxies(n=50_000, seed=0):
+    rng = np.random.default_rng(seed)
+    x = np.r_[np.clip(rng.normal(180, 40, n - 3), 1, 359), 0.0, 360.0, np.nan]
+    y = np.r_[np.clip(rng.normal(0, 20, n - 3), -89, 89), -90.0, 90.0, 5.0]
+    return x, y
+
+
+def _direct(x, y, shape, extent):
+    """The same grid from np.histogram2d, rows of y by columns of x"""
+    ok = np.isfinite(x) & np.isfinite(y)
+    grid, *_ = np.histogram2d(y[ok], x[ok], bins=(shape[1], shape[0]),
+                              range=(extent[2:], extent[:2]))
+    return grid.astype(np.int64)
+
+
+def test_a_structured_catalog_bins_as_a_histogram(tmp_path):
+    x, y = _galaxies()
+    records = np.zeros(len(x), dtype=[('ra', 'f8'), ('dec', 'f4'), ('z', 'f4')])
+    records['ra'], records['dec'] = x, y
+    np.save(tmp_path / 'survey.npy', records)
+
+    grid, extent = density_grid(tmp_path / 'survey.npy', shape=(64, 32), jobs=1)
+    assert extent == (0.0, 360.0, -90.0, 90.0)       # the catalog's own bounds
+    assert grid.shape == (32, 64)
+    assert grid.sum() == len(x) - 1                  # all but the NaN
+    np.testing.assert_array_equal(grid, _direct(x, records['dec'].astype(float),
+                                                (64, 32), extent))
+
+
+def test_columns_and_raw_records_bin_alike(tmp_path):
+    x, y = _galaxies()
+    np.save(tmp_path / 'columns.npy', np.column_stack([y, x]))
+    raw = np.zeros(len(x), dtype=[('a', 'f4'), ('b', 'f4')])
+    raw['a'], raw['b'] = x, y
+    raw.tofile(tmp_path / 'survey.bin')
+
+    extent = (100, 260, -30, 30)       # rows outside it are dropped
+    columns, _ = density_grid(tmp_path / 'columns.npy', (1, 0), (40, 20), extent, jobs=1)
+    np.testing.assert_array_equal(columns, _direct(x, y, (40, 20), extent))
+    records, _ = density_grid(tmp_path / 'survey.bin', ('a', 'b'), (40, 20), extent,
+                              dtype=raw.dtype, jobs=1)
+    np.testing.assert_array_equal(records, _direct(raw['a'].astype(float),
+                                                   raw['b'].astype(float), (40, 20), extent))
+    assert isinstance(open_catalog(tmp_path / 'columns.npy'), np.memmap)
+
+
+def test_chunks_and_workers_sum_to_the_same_grid(tmp_path, monkeypatch):
+    x, y = _galaxies()
+    np.save(tmp_path / 'columns.npy', np.column_stack([x, y]))
+    whole, extent = density_grid(tmp_path / 'columns.npy', (0, 1), (50, 50), cache=False, jobs=1)
+    monkeypatch.setattr(catalog, 'CHUNK', 4096)      # workers fork with it
+    for jobs in (1, 3):
+        grid, again = density_grid(tmp_path / 'columns.npy', (0, 1), (50, 50), cache=False,
+                                   jobs=jobs)
+        assert again == extent
+        np.testing.assert_array_equal(grid, whole)
+
+
+def test_grids_are_cached_until_the_catalog_changes(tmp_path, cache_dir, monkeypatch):
+    x, y = _galaxies()
+    path = tmp_path / 'columns.npy'
+    np.save(path, np.column_stack([x, y]))
+    first, _ = density_grid(path, (0, 1), (20, 20), jobs=1)
+    assert len(list((cache_dir / 'density').glob('*.npz'))) == 1
+
+    def unread(task):
+        raise AssertionError('the catalog was binned again')
+
+    with monkeypatch.context() as patch:
+        patch.setattr(catalog, '_bin', unread)
+        cached, _ = density_grid(path, (0, 1), (20, 20), jobs=1)
+    np.testing.assert_array_equal(cached, first)
+
+    np.save(path, np.column_stack([x[:1000], y[:1000]]))
+    stat = path.stat()
+    os.utime(path, ns=(stat.st_atime_ns, stat.st_mtime_ns + 1))
+    grid, _ = density_grid(path, (0, 1), (20, 20), jobs=1)
+    assert grid.sum() == 1000
+    assert len(list((cache_dir / 'density').glob('*.npz'))) == 2
+
+
+def test_a_window_keeps_the_extent_aspect():
+    assert place((0, 360, -90, 90), (0, 10, 0, 10)) == (0, 10, 2.5, 7.5)
+    assert place((0, 1, 0, 2), (2, 6, 0, 4)) == (3, 5, 0, 4)
+
+
+def test_dots_follow_the_density_cell_by_cell():
+    rng = np.random.default_rng(1)
+    grid = rng.integers(0, 50, (12, 16)) * (rng.uniform(size=(12, 16)) > 0.3)
+    window = (1.0, 5.0, 2.0, 5.0)
+    batches = list(density_batches(grid, window, 30_000, 'k', alpha=0.4, gamma=0.5,
+                                   seed=7, chunk=4000))
+    x = np.concatenate([b.x for b in batches])
+    y = np.concatenate([b.y for b in batches])
+    sizes = np.concatenate([b.sizes for b in batches])
+    assert len(x) == 30_000 and all(b.alpha == 0.4 and b.color == 'k' for b in batches)
+    assert np.all((sizes >= 0.2) & (sizes <= 0.6))
+
+    # Binned back, the dots are the multinomial draw over grid ** gamma
+    weights = grid.ravel() ** 0.5
+    expected = np.random.default_rng(7).multinomial(30_000, weights / weights.sum())
+    counts, *_ = np.histogram2d(y, x, bins=grid.shape, range=(window[2:], window[:2]))
+    np.testing.assert_array_equal(counts.ravel(), expected)
+    # Batches break between cells, so each is at most one cell over the chunk
+    assert len(batches) > 1 and max(map(len, batches)) <= 4000 + expected.max()
+    assert not list(density_batches(np.zeros((4, 4)), window, 100, 'k'))
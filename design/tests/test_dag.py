@@ -0,0 +1,80 @@
+import itertools
+
+import numpy as np
+import pytest
+
+from dag import DagLayout, inversions, layout, random_claims
+
+
+def brute_inversions(values):
+    return sum(a > b for a, b in itertools.combinations(values, 2))
+
+
+@pytest.mark.parametrize('n', [0, 1, 2, 3, 7, 16, 33, 100])
+def test_inversions_match_brute_force(n):
+    rng = np.random.default_rng(n)
+    for high in (3, n + 1):     # with many ties, then few
+        values = rng.integers(0, high, n)
+        assert inversions(values) == brute_inversions(values.tolist())
+
+
+def test_inversions_of_sorted_and_reversed():
+    assert inversions(np.arange(50)) == 0
+    assert inversions(np.arange(50)[::-1]) == 50 * 49 // 2
+
+
+def _check(dag, claims):
+    positions = dag.positions
+    assert set(positions) == {c['id'] for c in claims}
+    for claim in claims:
+        deps = [d for d in claim.get('depends_on') or () if d in positions]
+        tier = dag.tier[claim['id']]
+        assert tier == max((dag.tier[d] + 1 for d in deps), default=0)
+    for ids in dag.tiers.values():
+        ys = [dag.y[c] for c in ids]
+        # Top to bottom, at least dy apart
+        assert np.all(np.diff(ys) <= -dag.dy + 1e-9)
+
+
+def test_tiers_follow_dependencies():
+    claims = random_claims(300, seed=1)
+    dag = DagLayout()
+    dag.update(claims)
+    _check(dag, claims)
+
+
+def test_incremental_update_matches_a_valid_layout():
+    claims = random_claims(200, seed=2)
+    dag = DagLayout()
+    dag.update(claims)
+    edited = [dict(c) for c in claims]
+    edited[100]['depends_on'] = []
+    del edited[150]
+    edited.append({'id': 'new', 'depends_on': ['c3', 'c120']})
+    moved = dag.update(edited)
+    assert 'c100' in moved and 'new' in moved
+    _check(dag, edited)
+
+
+def test_unknown_dependencies_are_ignored():
+    assert layout([{'id': 'a', 'depends_on': ['ghost']}]) == {'a': (0.0, 0.0)}
+
+
+def test_cycle_raises():
+    with pytest.raises(ValueError, match='cycle'):
+        layout([{'id': 'a', 'depends_on': ['b']}, {'id': 'b', 'depends_on': ['a']}])
+
+
+def test_cycle_leaves_the_layout_unchanged():
+    claims = [{'id': 'a'}, {'id': 'b', 'depends_on': ['a']}, {'id': 'c', 'depends_on': ['b']}]
+    dag = DagLayout()
+    dag.update(claims)
+    before = dag.positions
+    cyclic = [{'id': 'a', 'depends_on': ['c']}, *claims[1:], {'id': 'd', 'depends_on': ['a']}]
+    for _ in range(2):      # the retry must fail the same way
+        with pytest.raises(ValueError, match='cycle'):
+            dag.update(cyclic)
+        assert dag.positions == before and len(dag) == 3
+    assert dag.update(claims) == set()
+    assert dag.update(claims + [{'id': 'd', 'depends_on': ['c']}]) == {'d'}
+    _check(dag, claims + [{'id': 'd', 'depends_on': ['c']}])
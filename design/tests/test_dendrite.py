@@ -0,0 +1,73 @@
+import matplotlib.pyplot as plt
+import numpy as np
+import pytest
+from matplotlib.collections import LineCollection
+
+from dendrite import draw_arbor, grow_dendrite
+
+
+def _chords(arbor):
+    return np.hypot(*(arbor.paths[:, -1] - arbor.paths[:, 0]).T)
+
+
+def test_a_root_runs_from_start_along_its_angle():
+    arbor = grow_dendrite((1.0, 2.0), 0.4, 1.5, max_depth=0, seed=3, n_smooth=31)
+    (path,) = arbor.paths
+    np.testing.assert_allclose(path[0], [1.0, 2.0])
+    np.testing.assert_allclose(path[-1], [1 + 1.5 * np.cos(0.4), 2 + 1.5 * np.sin(0.4)])
+    # The middle control point: half the length, bent at most 0.3 rad
+    offset = path[15] - path[0]
+    assert np.hypot(*offset) == pytest.approx(0.75)
+    assert abs(np.arctan2(offset[1], offset[0]) - 0.4) <= 0.3
+
+
+def test_levels_grow_from_the_level_before():
+    arbor = grow_dendrite((0.0, 0.0), [0.5, 2.0, 3.5], 1.0, max_depth=5, seed=7)
+    assert set(np.unique(arbor.depth)) == set(range(6))
+    assert np.all(np.diff(arbor.depth) >= 0)       # breadth first
+    for depth in range(1, 6):
+        children = arbor.paths[arbor.depth == depth]
+        parents = arbor.paths[arbor.depth == depth - 1]
+        # Every branch starts at a tip of the level above, which has at most two children
+        gap = np.hypot(*(children[:, None, 0] - parents[None, :, -1]).transpose(2, 0, 1))
+        nearest = gap.argmin(axis=1)
+        assert gap.min(axis=1).max() < 1e-12
+        assert np.bincount(nearest, minlength=len(parents)).max() <= 2
+        # ...and is 0.5-0.75 as long as its parent
+        ratio = _chords(arbor)[arbor.depth == depth] / _chords(arbor)[arbor.depth == depth - 1][
+            nearest]
+        assert np.all((ratio >= 0.5 - 1e-9) & (ratio <= 0.75 + 1e-9))
+    assert _chords(arbor).min() >= 0.08
+
+
+def test_widths_taper_and_spines_sprout_from_deep_branches():
+    arbor = grow_dendrite((0.0, 0.0), 1.0, 1.0, max_depth=4, base_width=2.0, seed=1)
+    np.testing.assert_allclose(arbor.widths, 2.0 * 0.7 ** arbor.depth)
+    np.testing.assert_allclose(arbor.alphas, 0.85)
+    assert len(arbor.spines)
+    np.testing.assert_allclose(np.hypot(*(arbor.spines[:, 1] - arbor.spines[:, 0]).T), 0.04)
+    deep = arbor.paths[arbor.depth > 1].reshape(-1, 2)
+    on_branch = np.hypot(*(arbor.spines[:, None, 0] - deep[None]).transpose(2, 0, 1)).min(axis=1)
+    assert on_branch.max() < 1e-12
+    assert len(arbor.spines) <= 3 * np.sum(arbor.depth > 1)
+
+
+def test_growth_is_seeded():
+    a, b = (grow_dendrite((0.0, 0.0), 1.0, 1.0, seed=5) for _ in range(2))
+    np.testing.assert_array_equal(a.paths, b.paths)
+    np.testing.assert_array_equal(a.spines, b.spines)
+    other = grow_dendrite((0.0, 0.0), 1.0, 1.0, seed=6)
+    assert a.paths.shape != other.paths.shape or not np.array_equal(a.paths, other.paths)
+
+
+def test_an_arbor_is_one_collection():
+    arbor = grow_dendrite((0.0, 0.0), [0.5, 2.5], 1.0, max_depth=4, seed=2)
+    fig, ax = plt.subplots()
+    coll = draw_arbor(ax, arbor, 'k')
+    assert list(ax.collections) == [coll] and isinstance(coll, LineCollection)
+    assert len(coll.get_segments()) == len(arbor) == len(arbor.paths) + len(arbor.spines)
+    np.testing.assert_allclose(coll.get_linewidths(),
+                               np.r_[arbor.widths, np.full(len(arbor.spines), 0.3)])
+    np.testing.assert_allclose(coll.get_colors()[:, 3],
+                               np.r_[arbor.alphas, np.full(len(arbor.spines), 0.5)])
+    plt.close(fig)
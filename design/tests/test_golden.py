@@ -0,0 +1,50 @@
+import numpy as np
+import pytest
+
+from golden import THRESHOLD, WINDOW, _box, _reduce, check, compare, regions
+
+
+def scene(h=240, w=320, seed=0):
+    """A smooth (3, h, w) image with some structure"""
+    y, x = np.mgrid[0:h, 0:w] / 40.0
+    rng = np.random.default_rng(seed)
+    planes = [0.5 + 0.3 * np.sin(x * a + y * b) for a, b in rng.uniform(0.5, 2, (3, 2))]
+    return np.stack(planes).astype(np.float32)
+
+
+def test_box_is_the_window_mean():
+    a = np.random.default_rng(0).random((2, 20, 15)).astype(np.float32)
+    box = _box(a)
+    assert box.shape == (2, 20 - WINDOW + 1, 15 - WINDOW + 1)
+    np.testing.assert_allclose(box[1, 4, 6], a[1, 4:4 + WINDOW, 6:6 + WINDOW].mean(), rtol=1e-5)
+
+
+def test_reduce_averages_blocks_and_drops_odd_edges():
+    a = np.arange(35, dtype=np.float32).reshape(1, 5, 7)
+    r = _reduce(a)
+    assert r.shape == (1, 2, 3)
+    assert r[0, 0, 0] == pytest.approx(a[0, :2, :2].mean())
+
+
+def test_identical_images_score_one():
+    a = scene()
+    score, heat = compare(a, a.copy())
+    assert score == pytest.approx(1.0)
+    assert heat.shape == a.shape[1:] and heat.max() == pytest.approx(0, abs=1e-6)
+    assert regions(heat) == []
+
+
+def test_a_changed_patch_is_found():
+    a = scene()
+    b = a.copy()
+    b[:, 100:130, 200:240] = 1 - b[:, 100:130, 200:240]
+    score, heat = compare(a, b)
+    assert score < THRESHOLD
+    (x0, y0, x1, y1), *_ = regions(heat)
+    assert x0 <= 200 and x1 >= 240 and y0 <= 100 and y1 >= 130
+
+
+def test_check_reports_missing_golden(tmp_path, monkeypatch):
+    monkeypatch.setattr('golden.GOLDEN_DIR', tmp_path)
+    passed, score, boxes, message = check('laboratory', tmp_path / 'render.png')
+    assert not passed and 'no golden' in message
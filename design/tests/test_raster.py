@@ -0,0 +1,154 @@
+import tracemalloc
+
+import matplotlib as mpl
+import matplotlib.pyplot as plt
+import numpy as np
+import pytest
+from matplotlib.collections import LineCollection
+
+from raster import RasterLayer
+from stipple import Stipple
+
+DPI = 100
+EDGE = mpl.rcParams['lines.markeredgewidth']
+
+
+def _axes(dpi=DPI):
+    fig = plt.figure(figsize=(3, 2), dpi=dpi, facecolor='white')
+    ax = fig.add_axes([0, 0, 1, 1])
+    ax.set_xlim(0, 3)
+    ax.set_ylim(0, 2)
+    ax.axis('off')
+    return fig, ax
+
+
+def _ink(fig):
+    """Total darkness of a figure drawn in black, in pixels' worth"""
+    fig.canvas.draw()
+    gray = np.asarray(fig.canvas.buffer_rgba())[..., 0].astype(float)
+    plt.close(fig)
+    return ((255 - gray) / 255).sum()
+
+
+def _layer():
+    return RasterLayer((0, 3, 0, 2), 300, 200, DPI)
+
+
+def test_a_disc_covers_its_area():
+    for radius, rel in ((3.0, 0.02), (6.0, 0.01), (12.0, 0.005)):    # points
+        layer = _layer()
+        layer.dots([1.5], [1.0], radius, 'k')
+        r = radius * DPI / 72
+        assert layer.rgba[..., 3].sum() == pytest.approx(np.pi * r * r, rel=rel)
+
+
+def test_a_sub_pixel_dot_keeps_its_true_area():
+    layer = _layer()
+    layer.dots([1.5], [1.0], 0.2, 'k')
+    r = 0.2 * DPI / 72
+    assert layer.rgba[..., 3].sum() == pytest.approx(np.pi * r * r, rel=1e-5)
+
+
+def test_overlaps_compound_as_repeated_over_in_any_order():
+    rng = np.random.default_rng(0)
+    x, y, alpha = rng.uniform(1, 2, 50), rng.uniform(0.5, 1.5, 50), rng.uniform(0.1, 0.9, 50)
+    forward, backward = _layer(), _layer()
+    forward.dots(x, y, 8.0, 'k', alpha)
+    backward.dots(x[::-1], y[::-1], 8.0, 'k', alpha[::-1])
+    np.testing.assert_allclose(forward.rgba, backward.rgba, atol=1e-6)
+
+    layer = _layer()
+    layer.dots([1.5, 1.5], [1.0, 1.0], 8.0, 'k', 0.5)
+    assert layer.rgba[100, 150, 3] == pytest.approx(0.75)
+
+
+@pytest.mark.parametrize('marker, shape, scale, tolerance', [
+    ('.', 'disc', 4, 0.05),
+    ('o', 'disc', 2, 0.05),
+    # The star's outline is offset along its edges rather than mitred at
+    # its points, so it lays down a little more ink than matplotlib's
+    ('*', 'star', 2, 0.20),
+])
+def test_markers_match_matplotlib(marker, shape, scale, tolerance):
+    for size in (4, 8, 16):
+        fig, ax = _axes()
+        ax.plot([1.5], [1.0], marker, color='k', markersize=size)
+        drawn = _ink(fig)
+        fig, ax = _axes()
+        layer = RasterLayer.for_axes(ax, DPI)
+        layer.dots([1.5], [1.0], size / scale, 'k', shape=shape, stroke=EDGE)
+        layer.draw(ax)
+        assert _ink(fig) == pytest.approx(drawn, rel=tolerance)
+
+
+def test_a_straight_stroke_covers_its_capsule():
+    layer = _layer()
+    layer.lines(np.array([[[0.5, 1.0], [2.5, 1.0]]]), [6.0], 'k')
+    r, length = 3.0 * DPI / 72, 2.0 * DPI
+    assert layer.rgba[..., 3].sum() == pytest.approx(2 * r * length + np.pi * r * r, rel=0.01)
+
+
+def test_lines_match_a_line_collection():
+    rng = np.random.default_rng(1)
+    paths = np.cumsum(rng.normal(0, 0.08, (30, 12, 2)), axis=1) + rng.uniform(0.5, 2, (30, 1, 2))
+    widths = rng.uniform(0.5, 3, 30)
+    fig, ax = _axes()
+    ax.add_collection(LineCollection(list(paths), linewidths=widths, colors='k',
+                                     capstyle='round'))
+    drawn = _ink(fig)
+    fig, ax = _axes()
+    layer = RasterLayer.for_axes(ax, DPI)
+    layer.lines(paths, widths, 'k')
+    layer.draw(ax)
+    assert _ink(fig) == pytest.approx(drawn, rel=0.05)
+
+
+def test_a_stipple_splats_into_the_layer():
+    rng = np.random.default_rng(2)
+    dots = (rng.uniform(0.2, 2.8, 400), rng.uniform(0.2, 1.8, 400), rng.uniform(1, 6, 400))
+    fig, ax = _axes()
+    stipple = Stipple()
+    stipple.add(*dots, 1.0, 'k')
+    stipple.draw(ax)
+    drawn = _ink(fig)
+
+    fig, ax = _axes()
+    layer = RasterLayer.for_axes(ax, DPI)
+    stipple.add(*dots, 1.0, 'k')
+    assert stipple.draw(ax, raster=layer) is layer
+    assert not ax.collections
+    layer.draw(ax)
+    assert len(ax.images) == 1
+    assert _ink(fig) == pytest.approx(drawn, rel=0.05)
+
+
+def test_the_layer_becomes_one_cropped_image():
+    fig, ax = _axes()
+    layer = RasterLayer.for_axes(ax, DPI)
+    assert layer.draw(ax) is None
+    layer.dots([1.0], [1.0], 5.0, 'red', 0.5)
+    image = layer.draw(ax)
+    assert (ax.get_xlim(), ax.get_ylim()) == ((0, 3), (0, 2))
+    x0, x1, y0, y1 = image.get_extent()
+    assert 0.85 < x0 < 1.0 < x1 < 1.15 and 0.85 < y0 < 1.0 < y1 < 1.15
+    pixels = image.get_array()
+    centre = pixels[pixels.shape[0] // 2, pixels.shape[1] // 2]
+    assert tuple(centre) == (255, 0, 0, 128)      # straight, not premultiplied, alpha
+    plt.close(fig)
+
+
+def test_a_batch_accumulates_over_its_own_window():
+    # A poster-sized layer: its buffer is allocated, but never touched
+    layer = RasterLayer((0, 30, 0, 20), 6000, 4000, 600)
+    rng = np.random.default_rng(3)
+    tracemalloc.start()
+    try:
+        layer.dots(rng.uniform(1, 2, 2000), rng.uniform(1, 2, 2000), 1.0, 'k', 0.5)
+        layer.lines(np.array([[[1.0, 1.0], [2.0, 1.5]]]), [2.0], 'k')
+        layer.dots([-5.0], [-5.0], 1.0, 'k')          # off the layer altogether
+        peak = tracemalloc.get_traced_memory()[1]
+    finally:
+        tracemalloc.stop()
+    assert peak < 100 * 2**20         # a buffer over the whole layer is 190 MB
+    rows, cols = np.nonzero(layer.rgba[..., 3])
+    assert rows.min() > 3580 and rows.max() < 3820 and cols.min() > 180 and cols.max() < 420
@@ -0,0 +1,36 @@
+import json
+
+from PIL import Image
+
+from responsive import available_formats, derive, pyramid, write_manifest
+
+
+def test_pyramid_skips_widths_above_the_master():
+    levels = pyramid(Image.new('RGB', (1000, 500)), widths=(2400, 800, 400))
+    assert sorted(levels) == [400, 800]
+    assert levels[800].size == (800, 400)
+
+
+def test_small_master_is_its_own_level():
+    master = Image.new('RGB', (200, 100))
+    levels = pyramid(master)
+    assert list(levels) == [200]
+    assert levels[200].size == (200, 100)
+
+
+def test_derive_from_a_small_master(tmp_path):
+    master = tmp_path / 'small.png'
+    Image.new('RGB', (200, 100), 'white').save(master)
+    entry = derive('small', master, tmp_path / 'out', formats=('webp', 'png'), jobs=1)
+    assert entry['width'] == 200
+    assert entry['fallback'] == {'src': '/plates/small-200.png',
+                                 'srcset': '/plates/small-200.png 200w'}
+    assert set(entry['bytes']) == {f'small-200.{f}' for f in available_formats(('webp', 'png'))}
+    for name in entry['bytes']:
+        assert (tmp_path / 'out' / name).exists()
+
+
+def test_manifest_merges_entries(tmp_path):
+    write_manifest({'b': {'width': 1}}, tmp_path)
+    path = write_manifest({'a': {'width': 2}}, tmp_path)
+    assert list(json.loads(path.read_text())) == ['a', 'b']
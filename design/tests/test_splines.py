@@ -0,0 +1,38 @@
+import numpy as np
+import pytest
+from scipy.interpolate import make_interp_spline
+
+from splines import smooth_curve, smooth_curves
+
+
+def natural(points, n_smooth):
+    t = np.linspace(0, 1, len(points))
+    return make_interp_spline(t, points, k=3, bc_type='natural')(np.linspace(0, 1, n_smooth))
+
+
+@pytest.mark.parametrize('k', [3, 4, 5, 8])
+def test_matches_scipy_natural_spline(k):
+    points = np.random.default_rng(k).normal(size=(50, k, 2))
+    curves = smooth_curves(points, n_smooth=37)
+    assert curves.shape == (50, 37, 2)
+    for p, curve in zip(points, curves):
+        np.testing.assert_allclose(curve, natural(p, 37), atol=1e-9)
+
+
+def test_ragged_rows_follow_their_own_counts():
+    rng = np.random.default_rng(0)
+    counts = np.array([3, 5, 4, 2, 5])
+    points = rng.normal(size=(len(counts), 5, 2))
+    curves = smooth_curves(points, n_smooth=20, counts=counts)
+    for p, count, curve in zip(points, counts, curves):
+        if count == 2:
+            expected = p[0] + np.linspace(0, 1, 20)[:, None] * (p[1] - p[0])
+        else:
+            expected = natural(p[:count], 20)
+        np.testing.assert_allclose(curve, expected, atol=1e-9)
+
+
+def test_curve_passes_through_its_ends():
+    x, y = smooth_curve([(0, 0), (1, 2), (3, 1)], n_smooth=11)
+    assert (x[0], y[0]) == pytest.approx((0, 0))
+    assert (x[-1], y[-1]) == pytest.approx((3, 1))
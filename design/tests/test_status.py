@@ -0,0 +1,58 @@
+import numpy as np
+import pytest
+from matplotlib.colors import to_rgba_array
+
+from create_blended import BAR_HEIGHT, COLORS, solidity_colors, status_bars
+from status import (ELLIPSIS, claim_solidity, clip, pages, rows_per_panel, set_labels,
+                    status_sheet)
+
+RED, YELLOW, GREEN = to_rgba_array([COLORS['red'], COLORS['yellow'], COLORS['green']])
+
+
+@pytest.mark.parametrize('value, color', [
+    (0.0, RED), (0.5, RED), (0.5001, YELLOW), (0.7, YELLOW), (0.7001, GREEN), (1.0, GREEN),
+])
+def test_threshold_edges(value, color):
+    np.testing.assert_array_equal(solidity_colors([value])[0], color)
+
+
+def test_status_bars_are_tracks_then_fills():
+    bars = status_bars([0.25, 1.0], x=1.0, y=[2.0, 3.0], width=4.0)
+    verts = np.array(bars.verts)
+    assert len(bars) == 4
+    np.testing.assert_allclose(np.ptp(verts[:, :, 0], axis=1), [4, 4, 1, 4])
+    np.testing.assert_allclose(np.ptp(verts[:, :, 1], axis=1), BAR_HEIGHT)
+    assert bars.alpha is None
+    np.testing.assert_allclose(bars.facecolor[:, 3], [0.5, 0.5, 0.6, 0.6])
+
+
+def test_clip_marks_cuts():
+    assert clip(['short', 'exactly10!', 'much too long'], 10) == [
+        'short', 'exactly10!', 'much too ' + ELLIPSIS]
+
+
+def test_pages_cover_every_claim_once():
+    ranges = pages(1000, rows=40, columns=3)
+    assert ranges[0] == (0, 120) and ranges[-1] == (960, 1000)
+    assert sum(hi - lo for lo, hi in ranges) == 1000
+
+
+def test_set_labels_places_glyphs_without_measuring():
+    left = set_labels(['ab', ' '], [0, 5], [1, 1], 1.0)
+    right = set_labels(['ab'], [10], [1], 1.0, ha='right')
+    assert len(left.vertices) == len(right.vertices) > 0
+    assert right.vertices[:, 0].max() <= 10
+    assert len(set_labels([], [], [], 1.0).vertices) == 0
+
+
+def test_claim_solidity_falls_back_on_confidence():
+    assert claim_solidity({'solidity': 0.3, 'confidence': 5}) == 0.3
+    assert claim_solidity({'confidence': 3}) == 0.5
+    assert claim_solidity({}) == 0.5
+
+
+def test_sheet_pages(tmp_path):
+    n = status_sheet(np.linspace(0, 1, 300), [f'c{i}' for i in range(300)], tmp_path,
+                     columns=2, pitch=0.2, dpi=30, jobs=1)
+    assert n == -(-300 // (2 * rows_per_panel(0.2)))
+    assert len(list(tmp_path.glob('status-*.png'))) == n
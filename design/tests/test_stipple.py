@@ -0,0 +1,96 @@
+import matplotlib.pyplot as plt
+import numpy as np
+from matplotlib.collections import PathCollection
+
+from stipple import Stipple
+
+
+def _pixels(draw, dpi=100):
+    fig = plt.figure(figsize=(2, 2), dpi=dpi)
+    ax = fig.add_axes([0, 0, 1, 1])
+    ax.set_xlim(0, 1)
+    ax.set_ylim(0, 1)
+    ax.axis('off')
+    draw(ax)
+    fig.canvas.draw()
+    pixels = np.asarray(fig.canvas.buffer_rgba())[..., :3].astype(int)
+    plt.close(fig)
+    return pixels
+
+
+def _dots(n=200, seed=0):
+    rng = np.random.default_rng(seed)
+    return (rng.uniform(0.05, 0.95, n), rng.uniform(0.05, 0.95, n),
+            rng.uniform(0.5, 4, n), rng.uniform(0.2, 1, n))
+
+
+def _per_dot(x, y, sizes, alpha):
+    def draw(ax):
+        for xi, yi, s, a in zip(x, y, sizes, alpha):
+            ax.plot(xi, yi, '.', color='#4A4540', markersize=s, alpha=a)
+    return draw
+
+
+def _stippled(x, y, sizes, alpha):
+    def draw(ax):
+        stipple = Stipple()
+        stipple.add(x, y, sizes, alpha, '#4A4540')
+        assert isinstance(stipple.draw(ax), PathCollection)
+        assert len(ax.collections) == 1 and not ax.lines
+    return draw
+
+
+def test_a_dot_draws_as_its_plot_marker_did():
+    for x, y, size, alpha in zip(*_dots(12)):
+        dot = ([x], [y], [size], [alpha])
+        assert np.array_equal(_pixels(_per_dot(*dot)), _pixels(_stippled(*dot)))
+
+
+def test_many_dots_lay_down_the_same_ink():
+    # One collection snaps its markers together rather than one by one,
+    # so dots may sit a pixel apart; their ink is the same
+    dots = _dots(400)
+    before = (255 - _pixels(_per_dot(*dots))).sum()
+    after = (255 - _pixels(_stippled(*dots))).sum()
+    assert abs(after - before) < 0.01 * before
+
+
+def test_adds_accumulate_until_drawn():
+    x, y, sizes, alpha = _dots(30)
+    stipple = Stipple()
+    stipple.add(x[:10], y[:10], 2.0, 0.5, 'red')
+    stipple.add([], [], 1.0, 1.0, 'blue')
+    stipple.add(x[10:], y[10:], sizes[10:], alpha[10:], 'blue')
+    assert len(stipple) == 30
+
+    fig, ax = plt.subplots()
+    coll = stipple.draw(ax)
+    np.testing.assert_allclose(coll.get_offsets(), np.column_stack([x, y]))
+    np.testing.assert_allclose(coll.get_sizes(), np.r_[np.full(10, 4.0), sizes[10:] ** 2])
+    colors = coll.get_facecolors()
+    np.testing.assert_allclose(colors[:10], np.tile([1, 0, 0, 0.5], (10, 1)))
+    np.testing.assert_allclose(colors[10:, :3], np.tile([0, 0, 1], (20, 1)))
+    np.testing.assert_allclose(colors[10:, 3], alpha[10:])
+
+    # Drawing empties the accumulator
+    assert len(stipple) == 0
+    assert stipple.draw(ax) is None
+    assert len(ax.collections) == 1
+    plt.close(fig)
+
+
+def test_plate_primitives_share_one_stipple():
+    import create_laboratory as lab
+
+    fig, ax = plt.subplots()
+    stipple = Stipple()
+    lab.draw_filament(ax, (1, 1), (4, 2), stipple=stipple)
+    after_filament = len(stipple)
+    lab.draw_cluster(ax, 4, 2, size=0.5, stipple=stipple)
+    assert 0 < after_filament < len(stipple)
+    # The dots wait in the stipple rather than becoming artists
+    assert not any(isinstance(c, PathCollection) for c in ax.collections)
+    n = len(stipple)
+    coll = stipple.draw(ax)
+    assert len(coll.get_offsets()) == n
+    plt.close(fig)
@@ -0,0 +1,84 @@
+import numpy as np
+import pytest
+
+from svg import _TOKEN, compact_path, compact_svg
+
+
+def absolute(d):
+    """Relative m/l/q/c/z data back to (command, points) with absolute points"""
+    arity = {'m': 2, 'l': 2, 'q': 4, 'c': 6, 'z': 0}
+    tokens = _TOKEN.findall(d)
+    out, x, y, start, cmd, i = [], 0.0, 0.0, (0.0, 0.0), None, 0
+    while i < len(tokens):
+        if tokens[i] in arity:
+            cmd = tokens[i]
+            i += 1
+            if cmd == 'z':
+                out.append(('Z', []))
+                x, y = start
+                continue
+        args = [float(t) for t in tokens[i:i + arity[cmd]]]
+        i += arity[cmd]
+        points = [(x + args[k], y + args[k + 1]) for k in range(0, len(args), 2)]
+        out.append((cmd.upper(), points))
+        x, y = points[-1]
+        if cmd == 'm':
+            start = (x, y)
+            cmd = 'l'   # coordinates after m are line-tos
+    return out
+
+
+def random_path(rng, n=40):
+    parts, commands = [], []
+    for _ in range(n):
+        kind = rng.choice(['L', 'L', 'Q', 'C'])
+        points = [tuple(p) for p in rng.uniform(-500, 500, ({'L': 1, 'Q': 2, 'C': 3}[kind], 2))]
+        commands.append((kind, points))
+    commands.insert(0, ('M', [tuple(rng.uniform(-500, 500, 2))]))
+    commands.append(('Z', []))
+    for kind, points in commands:
+        parts.append(kind + ' ' + ' '.join(f'{a:.6f} {b:.6f}' for a, b in points))
+    return ' '.join(parts), commands
+
+
+@pytest.mark.parametrize('seed', range(5))
+def test_round_trip_without_simplification(seed):
+    d, commands = random_path(np.random.default_rng(seed))
+    back = absolute(compact_path(d, 0, 3))
+    assert [c for c, _ in back] == [c for c, _ in commands]
+    for (_, got), (_, want) in zip(back, commands):
+        # Quantized to 10**-3, then differenced: no error accumulates
+        np.testing.assert_allclose(got, want, atol=5e-4 + 1e-9)
+
+
+def test_simplification_stays_within_tolerance():
+    x = np.linspace(0, 100, 400)
+    y = 3 * np.sin(x / 10)
+    d = f'M {x[0]} {y[0]} ' + ' '.join(f'L {a} {b}' for a, b in zip(x[1:], y[1:]))
+    back = absolute(compact_path(d, 0.5, 2))
+    kept = np.array([p[0] for _, p in back])
+    assert len(kept) < 60
+    assert kept[0] == pytest.approx((x[0], y[0]), abs=0.01)
+    assert kept[-1] == pytest.approx((x[-1], y[-1]), abs=0.01)
+    # Every dropped point lies within tolerance of the kept polyline
+    between = np.interp(x, kept[:, 0], kept[:, 1])
+    assert np.abs(between - y).max() <= 0.5 + 0.01
+
+
+def _svg(*paths):
+    body = ''.join(f'<path d="{d}" style="{style}"/>' for d, style in paths)
+    return f'<svg xmlns="http://www.w3.org/2000/svg"><g>{body}</g></svg>'.encode()
+
+
+def test_disjoint_fills_merge_but_overlapping_do_not():
+    fill = 'fill: #000000'
+    out = compact_svg(_svg(('M 0 0 L 10 0 L 10 10 L 0 10 z', fill),
+                           ('M 2 2 L 2 8 L 8 8 L 8 2 z', fill),
+                           ('M 20 20 L 30 20 L 30 30 z', fill)), dpi=72).decode()
+    assert out.count('<path') == 2
+
+
+def test_strokes_merge_even_when_they_cross():
+    stroke = 'fill: none; stroke: #000000'
+    out = compact_svg(_svg(('M 0 0 L 5 5', stroke), ('M 5 0 L 0 5', stroke)), dpi=72).decode()
+    assert out.count('<path') == 1
@@ -0,0 +1,91 @@
+import importlib
+import io
+
+import matplotlib.pyplot as plt
+import numpy as np
+import pytest
+from PIL import Image
+
+import tiles
+from tiles import PNGStream, canvas_extent, render_tile, render_tiled
+
+PLATE = """\
+import matplotlib.pyplot as plt
+import numpy as np
+from matplotlib.patches import Circle
+
+
+def create_figure():
+    fig = plt.figure(figsize=(3, 2), facecolor='#F6F2EA')
+    ax = fig.add_axes([0, 0, 1, 1])
+    ax.set_xlim(0, 3)
+    ax.set_ylim(0, 2)
+    ax.set_aspect('equal')
+    ax.axis('off')
+    rng = np.random.default_rng(0)
+    ax.plot([0.1, 2.9], [0.1, 1.9], color='#2A2520', linewidth=2)
+    ax.scatter(rng.uniform(0, 3, 300), rng.uniform(0, 2, 300), s=4, c='#5A7B7B')
+    ax.add_patch(Circle((1.5, 1.0), 0.6, facecolor='none', edgecolor='#9A7B35'))
+    ax.text(1.5, 0.3, 'seams', ha='center', fontsize=14)
+    return fig
+"""
+
+
+@pytest.fixture
+def plate(tmp_path, monkeypatch):
+    (tmp_path / 'create_tiletest.py').write_text(PLATE)
+    monkeypatch.syspath_prepend(str(tmp_path))
+    yield 'tiletest'
+    for key in [k for k in tiles._figures if 'tiletest' in k]:
+        del tiles._figures[key]
+
+
+def test_png_stream_round_trips_bands(tmp_path):
+    rng = np.random.default_rng(0)
+    pixels = rng.integers(0, 256, (10, 7, 3), dtype=np.uint8)
+    png = PNGStream(tmp_path / 'out.png', 7, 10, dpi=300)
+    for lo, hi in [(0, 3), (3, 4), (4, 10)]:
+        png.write(pixels[lo:hi])
+    png.close()
+    with Image.open(tmp_path / 'out.png') as image:
+        assert image.mode == 'RGB'
+        assert np.array_equal(np.asarray(image), pixels)
+        assert image.info['dpi'] == pytest.approx((300, 300), abs=0.01)
+
+
+def test_png_stream_refuses_a_short_image(tmp_path):
+    png = PNGStream(tmp_path / 'out.png', 4, 5)
+    png.write(np.zeros((3, 4, 3), dtype=np.uint8))
+    with pytest.raises(ValueError, match='3 of 5'):
+        png.close()
+
+
+def test_tiles_stitch_without_seams(plate, tmp_path):
+    dpi = 40
+    (x0, x1, y0, y1), (ux, uy) = canvas_extent(plate)
+    width, height = round((x1 - x0) / ux * dpi), round((y1 - y0) / uy * dpi)
+    *_, whole = render_tile(plate, dpi, 0, 0, width, height)
+
+    size = render_tiled(plate, tmp_path / 'tiled.png', dpi=dpi, tile=23, jobs=2)
+    assert size == (width, height) == (128, 88)      # the figure plus 0.1 in each side
+    with Image.open(tmp_path / 'tiled.png') as image:
+        tiled = np.asarray(image)
+    assert tiled.shape == whole.shape
+    # Each tile transforms the scene a little differently, so antialiased
+    # edges may round a level apart; anything at a seam would be far more
+    diff = np.abs(tiled.astype(int) - whole).max(axis=-1)
+    assert diff.max() <= 2 and np.mean(diff > 0) < 0.02
+    assert len(np.unique(whole.reshape(-1, 3), axis=0)) > 10     # something was drawn
+
+
+def test_the_canvas_is_what_savefig_would_write(plate):
+    dpi = 40
+    fig = importlib.import_module(f'create_{plate}').create_figure()
+    buf = io.BytesIO()
+    fig.savefig(buf, format='png', dpi=dpi, bbox_inches='tight', facecolor=fig.get_facecolor())
+    plt.close(fig)
+    buf.seek(0)
+    with Image.open(buf) as image:
+        saved = np.asarray(image)[..., :3].astype(int)
+    *_, whole = render_tile(plate, dpi, 0, 0, saved.shape[1], saved.shape[0])
+    assert np.mean(np.abs(saved - whole).max(axis=-1) > 2) < 0.01
@@ -0,0 +1,111 @@
+import numpy as np
+import pytest
+from scipy.sparse.csgraph import connected_components, minimum_spanning_tree, shortest_path
+from scipy.spatial.distance import cdist
+
+from web import branch_reach, build_web, chains, local_density, spanning_edges, voronoi_halos
+
+
+def _points(n=300, seed=0):
+    return np.random.default_rng(seed).uniform(0, 1, (n, 2))
+
+
+def _length(points, edges):
+    return np.hypot(*(points[edges[:, 1]] - points[edges[:, 0]]).T)
+
+
+def _graph(n, edges, weights=None):
+    dense = np.zeros((n, n))
+    dense[edges[:, 0], edges[:, 1]] = 1 if weights is None else weights
+    return dense + dense.T
+
+
+def test_density_counts_neighbours_within_the_kth():
+    points = _points()
+    dist = np.sort(cdist(points, points), axis=1)
+    np.testing.assert_allclose(local_density(points, k=8), 8 / (np.pi * dist[:, 8] ** 2))
+
+
+def test_the_spanning_tree_is_the_euclidean_one():
+    points = _points()
+    edges = spanning_edges(points, k=8)
+    assert len(edges) == len(points) - 1
+    assert connected_components(_graph(len(points), edges))[0] == 1
+    direct = minimum_spanning_tree(cdist(points, points)).sum()
+    assert _length(points, edges).sum() == pytest.approx(direct)
+
+
+def test_a_cutoff_splits_the_forest_at_wide_gaps():
+    points = _points()
+    cutoff = 0.05
+    edges = spanning_edges(points, k=8, cutoff=cutoff)
+    assert _length(points, edges).max() <= cutoff
+    pieces, _ = connected_components(cdist(points, points) <= cutoff)
+    assert connected_components(_graph(len(points), edges))[0] == pieces
+    assert len(edges) == len(points) - pieces
+
+
+def test_chains_cover_the_forest_between_junctions():
+    points = _points()
+    edges = spanning_edges(points, k=8, cutoff=0.06)
+    found = chains(len(points), edges)
+    degree = np.bincount(edges.ravel(), minlength=len(points))
+    walked = sorted(tuple(sorted(pair)) for c in found for pair in zip(c[:-1], c[1:]))
+    assert walked == sorted(map(tuple, np.sort(edges, axis=1)))
+    for chain in found:
+        assert degree[chain[0]] != 2 and degree[chain[-1]] != 2
+        assert np.all(degree[chain[1:-1]] == 2)
+
+
+def test_branch_reach_of_a_spur_and_a_spine():
+    # A spine 0-1-2-3-4 of unit links, with a spur 2-5 of 0.5 off its middle
+    points = np.array([[0, 0], [1, 0], [2, 0], [3, 0], [4, 0], [2, 0.5]], dtype=float)
+    edges = np.array([[0, 1], [1, 2], [2, 3], [3, 4], [2, 5]])
+    reach = branch_reach(len(points), edges, _length(points, edges))
+    assert reach[4] == pytest.approx(0.5)
+    assert reach[[0, 3]] == pytest.approx([1, 1])
+    assert reach.max() == pytest.approx(4)         # the whole tree, through both sides
+
+
+def test_a_tree_reaches_its_diameter():
+    # With links of one length the peeling's last edge or node is the centre
+    # of the tree's longest path, so the farthest reach is its diameter
+    points = _points()
+    edges = spanning_edges(points, k=8, cutoff=0.06)
+    reach = branch_reach(len(points), edges, np.ones(len(edges)))
+    graph = _graph(len(points), edges)
+    _, labels = connected_components(graph)
+    hops = shortest_path(graph, directed=False, unweighted=True)
+    trees = np.unique(labels[edges[:, 0]])
+    assert len(trees) > 10
+    for label in trees:
+        inside = labels == label
+        diameter = hops[np.ix_(inside, inside)].max()
+        assert reach[labels[edges[:, 0]] == label].max() == diameter
+
+
+def test_pruning_keeps_branches_that_reach_far_enough():
+    points = _points()
+    edges = spanning_edges(points, k=8)
+    lengths = _length(points, edges)
+    reach = branch_reach(len(points), edges, lengths)
+    web = build_web(points, k=8, prune=0.2)
+    kept = {tuple(sorted(pair)) for p in web.paths for pair in zip(map(tuple, p[:-1]),
+                                                                   map(tuple, p[1:]))}
+    expected = {tuple(sorted((tuple(points[i]), tuple(points[j]))))
+                for (i, j), r in zip(edges, reach) if r >= 0.2}
+    assert kept == expected
+
+
+def test_a_web_is_clusters_joined_by_halo_chains():
+    points = voronoi_halos(4000, (0, 10, 0, 6), seed=3)
+    web = build_web(points, sizes=(0.08, 0.15))
+    assert len(web) == len(web.paths) > 10
+    for (a, b), path in zip(web.edges, web.paths):
+        np.testing.assert_array_equal(path[[0, -1]], web.nodes[[a, b]])
+    assert len(np.unique(web.edges)) == len(web.nodes)
+    # Density is of the whole halo field around each cluster, not of the clusters
+    dist = np.sort(cdist(web.nodes, points), axis=1)
+    np.testing.assert_allclose(web.density, 8 / (np.pi * dist[:, 8] ** 2))
+    assert web.sizes.min() == pytest.approx(0.08) and web.sizes.max() == pytest.approx(0.15)
+    assert np.all(np.diff(web.sizes[np.argsort(web.density)]) >= -1e-12)
@@ -0,0 +1,153 @@
+#!/usr/bin/env python3
+"""
+Observational Patience — Tiled rendering
+
+Poster-scale rasterization. The canvas is cut into pixel-aligned tiles,
+each rendered in a worker process by narrowing the plate's axis limits to
+the tile's region, and the tiles are streamed into a PNG one band of rows
+at a time. Every worker builds the same scene, since plates seed each
+element deterministically. Only a band and the tiles in flight are ever
+held in memory.
+
+    python design/tiles.py laboratory --dpi 1200 -o laboratory-1200.png
+"""
+
+import argparse
+import importlib
+import os
+import struct
+import sys
+import zlib
+from concurrent.futures import ProcessPoolExecutor
+from pathlib import Path
+
+import numpy as np
+
+DESIGN_DIR = Path(__file__).parent
+PAD_INCHES = 0.1    # savefig's default pad around a tight bbox
+
+_figures = {}
+
+
+def _figure(plate, dpi=None):
+    """The plate's figure, detailed for ``dpi``, and its original geometry.
+
+    Built once per process and dpi.
+    """
+    if (plate, dpi) not in _figures:
+        import matplotlib
+        matplotlib.use('Agg')
+        if str(DESIGN_DIR) not in sys.path:
+            sys.path.insert(0, str(DESIGN_DIR))
+        import lod
+        with lod.output_dpi(dpi):
+            fig = importlib.import_module(f'create_{plate}').create_figure()
+        ax = fig.axes[0]
+        ax.set_aspect('auto')
+        _figures[plate, dpi] = fig, ax.get_xlim(), ax.get_ylim(), tuple(fig.get_size_inches())
+    return _figures[plate, dpi]
+
+
+def canvas_extent(plate, pad=PAD_INCHES, dpi=None):
+    """Data extent of the padded canvas and its data units per inch"""
+    _, (x0, x1), (y0, y1), (w, h) = _figure(plate, dpi)
+    ux, uy = (x1 - x0) / w, (y1 - y0) / h
+    return (x0 - pad * ux, x1 + pad * ux, y0 - pad * uy, y1 + pad * uy), (ux, uy)
+
+
+def render_tile(plate, dpi, col, row, width, height, pad=PAD_INCHES):
+    """Rasterize the pixel window at (col, row) of the full canvas, as RGB"""
+    fig, *_ = _figure(plate, dpi)
+    ax = fig.axes[0]
+    (left, _, _, top), (ux, uy) = canvas_extent(plate, pad, dpi)
+    fig.set_dpi(dpi)
+    fig.set_size_inches(width / dpi, height / dpi)
+    ax.set_position([0, 0, 1, 1])
+    ax.set_xlim(left + col / dpi * ux, left + (col + width) / dpi * ux)
+    ax.set_ylim(top - (row + height) / dpi * uy, top - row / dpi * uy)
+    fig.canvas.draw()
+    return col, row, np.asarray(fig.canvas.buffer_rgba())[..., :3].copy()
+
+
+class PNGStream:
+    """Minimal streaming PNG writer: 8-bit RGB, rows appended in bands"""
+
+    def __init__(self, path, width, height, dpi=None):
+        self.file = open(path, 'wb')
+        self.width, self.height, self.rows = width, height, 0
+        self.zlib = zlib.compressobj(6)
+        self.file.write(b'\x89PNG\r\n\x1a\n')
+        self._chunk(b'IHDR', struct.pack('>IIBBBBB', width, height, 8, 2, 0, 0, 0))
+        if dpi:
+            ppm = round(dpi / 0.0254)
+            self._chunk(b'pHYs', struct.pack('>IIB', ppm, ppm, 1))
+
+    def _chunk(self, kind, data):
+        self.file.write(struct.pack('>I', len(data)) + kind + data)
+        self.file.write(struct.pack('>I', zlib.crc32(kind + data) & 0xFFFFFFFF))
+
+    def write(self, band):
+        """Append an (h, width, 3) uint8 band; each row gets filter type 0"""
+        rows = np.zeros((len(band), self.width * 3 + 1), dtype=np.uint8)
+        rows[:, 1:] = band.reshape(len(band), -1)
+        data = self.zlib.compress(rows.tobytes())
+        if data:
+            self._chunk(b'IDAT', data)
+        self.rows += len(band)
+
+    def close(self):
+        self._chunk(b'IDAT', self.zlib.flush())
+        self._chunk(b'IEND', b'')
+        self.file.close()
+        if self.rows != self.height:
+            raise ValueError(f'wrote {self.rows} of {self.height} rows')
+
+
+def _in_order(pool, fn, specs, window, **kwargs):
+    """Map ``fn`` over ``specs`` in a pool, in order, with a bounded window"""
+    pending = []
+    for spec in specs:
+        pending.append(pool.submit(fn, *spec, **kwargs))
+        if len(pending) >= window:
+            yield pending.pop(0).result()
+    for future in pending:
+        yield future.result()
+
+
+def render_tiled(plate, path, dpi=600, tile=2048, jobs=None, pad=PAD_INCHES):
+    """Render a plate at ``dpi`` as tile x tile pieces stitched into one PNG"""
+    (x0, x1, y0, y1), (ux, uy) = canvas_extent(plate, pad)
+    width = round((x1 - x0) / ux * dpi)
+    height = round((y1 - y0) / uy * dpi)
+    specs = [(plate, dpi, col, row, min(tile, width - col), min(tile, height - row))
+             for row in range(0, height, tile) for col in range(0, width, tile)]
+    jobs = jobs or os.cpu_count() or 1
+
+    png = PNGStream(path, width, height, dpi)
+    with ProcessPoolExecutor(max_workers=jobs) as pool:
+        for col, _, pixels in _in_order(pool, render_tile, specs, 2 * jobs, pad=pad):
+            if col == 0:
+                band = np.empty((len(pixels), width, 3), dtype=np.uint8)
+            band[:, col:col + pixels.shape[1]] = pixels
+            if col + pixels.shape[1] == width:
+                png.write(band)
+    png.close()
+    return width, height
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description='Render a plate in parallel tiles.')
+    parser.add_argument('plate')
+    parser.add_argument('--dpi', type=int, default=600)
+    parser.add_argument('--tile', type=int, default=2048, help='tile size in pixels')
+    parser.add_argument('-j', '--jobs', type=int, help='worker processes (default: cores)')
+    parser.add_argument('-o', '--output', help='output PNG (default: <plate>-<dpi>.png)')
+    args = parser.parse_args(argv)
+
+    path = args.output or DESIGN_DIR / f'{args.plate}-{args.dpi}.png'
+    width, height = render_tiled(args.plate, path, args.dpi, args.tile, args.jobs)
+    print(f"Created {Path(path).name} ({width} x {height})")
+
+
+if __name__ == '__main__':
+    main()